@@ -0,0 +1,100 @@
+"""Compare the compressed SQL dump backup (V4) with the online snapshot (V3).
+
+Also times the unchanged-database short circuit of ``run_scheduled_backup``.
+
+Run from the project root:
+
+    python -m benchmarks.bench_backup
+
+The benchmark uses a temporary database and never touches ``data/``. Peak
+memory is measured with ``tracemalloc`` (Python-side buffers only).
+"""
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Tuple
+from unittest.mock import patch
+
+from cryptography.fernet import Fernet
+
+import database_manager
+
+ROWS: int = 50_000
+
+
+def _seed(db_path: Path) -> None:
+    conn = database_manager._connect_database(db_path)
+    try:
+        conn.executemany(
+            "INSERT INTO favorites (user_id, url, title) VALUES (?, ?, ?)",
+            (
+                (index % 500, f"https://youtu.be/bench{index}", f"Benchmark Song {index}" * 4)
+                for index in range(ROWS)
+            ),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _backup(mode: str) -> None:
+    outcome = asyncio.run(
+        database_manager.run_scheduled_backup(mode=mode, skip_unchanged=False)
+    )
+    assert outcome == database_manager.BACKUP_CREATED
+
+
+def _measure(mode: str) -> Tuple[float, float, float]:
+    # tracemalloc은 할당마다 비용이 커서 시간과 메모리를 따로 잽니다.
+    started = time.perf_counter()
+    _backup(mode)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    _backup(mode)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    size = database_manager.SQL_BACKUP_PATH.stat().st_size
+    return elapsed, peak / (1024 * 1024), size / (1024 * 1024)
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        data_dir = Path(temp_dir)
+        db_path = data_dir / "bench.db"
+        with patch.object(database_manager, "DATA_DIR", data_dir), \
+             patch.object(database_manager, "DB_PATH", db_path), \
+             patch.object(database_manager, "SQL_BACKUP_PATH", data_dir / "bench_backup.sql"), \
+             patch.dict(os.environ, {"DB_ENCRYPTION_KEY": Fernet.generate_key().decode("ascii")}):
+            database_manager._cipher_suite = None
+            database_manager._prepare_database_schema()
+            _seed(db_path)
+            db_size = db_path.stat().st_size / (1024 * 1024)
+
+            sql_time, sql_peak, sql_size = _measure("sql")
+            snapshot_time, snapshot_peak, snapshot_size = _measure("snapshot")
+
+            asyncio.run(database_manager.run_scheduled_backup(mode="snapshot"))
+            started = time.perf_counter()
+            outcome = asyncio.run(database_manager.run_scheduled_backup(mode="snapshot"))
+            unchanged_time = time.perf_counter() - started
+            assert outcome == database_manager.BACKUP_UNCHANGED
+            database_manager._cipher_suite = None
+
+    print(f"database size       : {db_size:10.1f} MiB")
+    print(
+        f"sql dump (V4, zlib) : {sql_time:10.2f} s  peak {sql_peak:8.1f} MiB"
+        f"  file {sql_size:6.1f} MiB"
+    )
+    print(
+        f"snapshot (V3)       : {snapshot_time:10.2f} s  peak {snapshot_peak:8.1f} MiB"
+        f"  file {snapshot_size:6.1f} MiB"
+    )
+    print(f"unchanged skip      : {unchanged_time * 1000:10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
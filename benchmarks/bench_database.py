@@ -0,0 +1,74 @@
+"""Compare per-call SQLite connections with the pooled database_manager path.
+
+Run from the project root:
+
+    python -m benchmarks.bench_database
+
+The benchmark uses a temporary database and never touches ``data/``.
+"""
+import asyncio
+import sqlite3
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+from unittest.mock import patch
+
+import database_manager
+
+OPERATIONS: int = 2000
+
+
+@contextmanager
+def _connection_per_call(read_only: bool = False) -> Iterator:
+    """Reproduce the previous helper behaviour: connect and configure every call."""
+    conn = database_manager._connect_database(read_only=read_only)
+    conn.row_factory = sqlite3.Row
+    with conn:
+        yield conn
+
+
+async def _leveling_message_cycle(operations: int) -> float:
+    """Run the get_user_data + update_user_xp pair that every chat message costs."""
+    started = time.perf_counter()
+    for index in range(operations):
+        user_id = index % 50
+        await database_manager.get_user_data(user_id, 1)
+        await database_manager.update_user_xp(user_id, 1, xp_added=5)
+    elapsed = time.perf_counter() - started
+    return (operations * 2) / elapsed
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        data_dir = Path(temp_dir)
+        with patch.object(database_manager, "DATA_DIR", data_dir), \
+             patch.object(database_manager, "DB_PATH", data_dir / "bench.db"), \
+             patch.object(
+                 database_manager,
+                 "SQL_BACKUP_PATH",
+                 data_dir / "missing.sql",
+             ):
+            database_manager._prepare_database_schema()
+
+            with patch.object(
+                database_manager,
+                "_pooled_connection",
+                _connection_per_call,
+            ):
+                before = asyncio.run(_leveling_message_cycle(OPERATIONS))
+
+            database_manager.open_connection_pool()
+            try:
+                after = asyncio.run(_leveling_message_cycle(OPERATIONS))
+            finally:
+                database_manager.close_connection_pool()
+
+    print(f"connection per call : {before:10.0f} ops/sec")
+    print(f"pooled connections  : {after:10.0f} ops/sec")
+    print(f"speedup             : {after / before:10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
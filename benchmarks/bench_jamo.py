@@ -0,0 +1,59 @@
+"""Compare the per-character jamo counter with the cached weight-table version.
+
+Run from the project root:
+
+    python -m benchmarks.bench_jamo
+"""
+import time
+from typing import Callable, Dict
+
+from cogs.leveling.leveling_core import calculate_jamo_length
+
+ROUNDS: int = 2000
+
+MESSAGES: Dict[str, str] = {
+    "짧은 채팅 (12자)": "오늘 저녁 뭐 먹을까요?",
+    "한글 문단 (~300자)": "디스코드 서버에서 음악을 듣다가 잠깐 자리를 비웠는데 돌아와 보니 대기열이 끝나 있었습니다. " * 6,
+    "영문 로그 (~4000자)": (
+        "2024-06-11 21:04:33 [ERROR] MusicAgent: playback failed url=https://youtu.be/abc123 "
+        "retry=3 reason='HTTP Error 403: Forbidden'\n"
+    ) * 40,
+    "붙여넣은 로그 (~4000자)": (
+        "2024-06-11 21:04:33 [ERROR] MusicAgent: 재생 실패 url=https://youtu.be/abc123 "
+        "retry=3 reason='HTTP Error 403: Forbidden'\n"
+    ) * 40,
+}
+
+
+def _loop_jamo_length(text: str) -> int:
+    """Reproduce the previous implementation: inspect one character at a time."""
+    length = 0
+    for char in text:
+        if 0xAC00 <= ord(char) <= 0xD7A3:
+            char_code = ord(char) - 0xAC00
+            length += 3 if char_code % 28 > 0 else 2
+        elif char.strip():
+            length += 1
+    return length
+
+
+def _messages_per_second(func: Callable[[str], int], text: str) -> float:
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        func(text)
+    return ROUNDS / (time.perf_counter() - started)
+
+
+def main() -> None:
+    for label, text in MESSAGES.items():
+        assert _loop_jamo_length(text) == calculate_jamo_length(text)
+        before = _messages_per_second(_loop_jamo_length, text)
+        after = _messages_per_second(calculate_jamo_length, text)
+        print(
+            f"{label:<22} loop {before:10.0f}/s  "
+            f"cached {after:10.0f}/s  speedup {after / before:6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Compare the per-level XP curve loop with the cached threshold table.
+
+Run from the project root:
+
+    python -m benchmarks.bench_leveling
+"""
+import time
+from typing import Callable, List
+
+from cogs.leveling import leveling_core
+from cogs.leveling.leveling_core import calculate_level_from_xp, get_required_xp
+
+TARGET_LEVELS: List[int] = [10, 50, 100, 200]
+LOOKUPS: int = 2000
+
+
+def _loop_level_from_xp(total_xp: int) -> int:
+    """Reproduce the previous implementation: evaluate the curve one level at a time."""
+    level = 1
+    while total_xp >= get_required_xp(level):
+        level += 1
+    return level
+
+
+def _lookups_per_second(func: Callable[[int], int], total_xp: int) -> float:
+    started = time.perf_counter()
+    for _ in range(LOOKUPS):
+        func(total_xp)
+    return LOOKUPS / (time.perf_counter() - started)
+
+
+def main() -> None:
+    leveling_core._xp_thresholds.clear()
+    for level in TARGET_LEVELS:
+        total_xp = get_required_xp(level) - 1
+        assert _loop_level_from_xp(total_xp) == calculate_level_from_xp(total_xp) == level
+
+        before = _lookups_per_second(_loop_level_from_xp, total_xp)
+        after = _lookups_per_second(calculate_level_from_xp, total_xp)
+        print(
+            f"Lv.{level:<4} loop {before:12.0f}/s  "
+            f"table {after:12.0f}/s  speedup {after / before:8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
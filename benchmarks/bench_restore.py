@@ -0,0 +1,100 @@
+"""Time the legacy per-line dump restore used for disaster recovery.
+
+Two dumps are restored: one with field-encrypted favorites/top songs (Fernet
+decryption dominates) and one plain dump that isolates parsing and inserting.
+
+Run from the project root:
+
+    python -m benchmarks.bench_restore
+
+The benchmark writes a field-encrypted legacy dump into a temporary
+directory, restores it through ``init_db`` and never touches ``data/``.
+"""
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Tuple
+from unittest.mock import patch
+
+from cryptography.fernet import Fernet
+
+import database_manager
+
+FAVORITES: int = 20_000
+PLAY_COUNTS: int = 20_000
+USERS: int = 20_000
+
+
+def _sql_text(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _write_legacy_dump(path: Path, cipher: Fernet, encrypted: bool) -> int:
+    """Write a dump shaped like the pre-envelope backups."""
+    protect = (lambda text: cipher.encrypt(text.encode()).decode()) if encrypted else str
+    with path.open("w", encoding="utf-8", newline="\n") as dump:
+        dump.write("BEGIN TRANSACTION;\n")
+        dump.write(
+            "CREATE TABLE favorites (user_id INTEGER, url TEXT, title TEXT, "
+            "PRIMARY KEY(user_id, url));\n"
+        )
+        dump.write(
+            "CREATE TABLE music_play_counts (guild_id INTEGER, url TEXT, "
+            "title TEXT, play_count INTEGER, PRIMARY KEY(guild_id, url));\n"
+        )
+        dump.write(
+            "CREATE TABLE users (user_id INTEGER, guild_id INTEGER, xp INTEGER, "
+            "level INTEGER, PRIMARY KEY(user_id, guild_id));\n"
+        )
+        for index in range(FAVORITES):
+            url = protect(f"https://youtu.be/fav{index}")
+            title = protect(f"Friend's Song {index}")
+            dump.write(
+                f'INSERT INTO "favorites" VALUES({index},{_sql_text(url)},{_sql_text(title)});\n'
+            )
+        for index in range(PLAY_COUNTS):
+            url = protect(f"https://youtu.be/top{index}")
+            title = protect(f"Top Song {index}")
+            dump.write(
+                f'INSERT INTO "music_play_counts" VALUES('
+                f"{index % 10},{_sql_text(url)},{_sql_text(title)},{index});\n"
+            )
+        for index in range(USERS):
+            dump.write(f'INSERT INTO "users" VALUES({index},1,{index * 3},{index % 40});\n')
+        dump.write("COMMIT;\n")
+    return FAVORITES + PLAY_COUNTS + USERS
+
+
+def _restore(data_dir: Path, key: str, encrypted: bool) -> Tuple[int, float]:
+    backup_path = data_dir / f"legacy_{encrypted}.sql"
+    rows = _write_legacy_dump(backup_path, Fernet(key.encode("ascii")), encrypted)
+    with patch.object(database_manager, "DB_PATH", data_dir / f"restored_{encrypted}.db"), \
+         patch.object(database_manager, "SQL_BACKUP_PATH", backup_path):
+        started = time.perf_counter()
+        database_manager._restore_database_from_sql()
+        return rows, time.perf_counter() - started
+
+
+def main() -> None:
+    key = Fernet.generate_key().decode("ascii")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        data_dir = Path(temp_dir)
+        with patch.object(database_manager, "DATA_DIR", data_dir), \
+             patch.dict(os.environ, {"DB_ENCRYPTION_KEY": key}):
+            database_manager._cipher_suite = None
+            results = {
+                "field-encrypted": _restore(data_dir, key, encrypted=True),
+                "plain": _restore(data_dir, key, encrypted=False),
+            }
+            database_manager._cipher_suite = None
+
+    for label, (rows, elapsed) in results.items():
+        print(
+            f"{label:16s}: {rows:8d} rows  {elapsed:6.2f} s"
+            f"  {rows / elapsed:10.0f} rows/sec"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,49 +1,148 @@
 import os
 import time
 import logging
-from typing import Optional, Dict
+from bisect import bisect_right
+from typing import Any, Awaitable, Callable, Optional, Dict, List
 
 import discord
-from discord.ext import commands
-from discord import app_commands
+from discord.ext import commands, tasks
+from discord import app_commands, ui
 
-from database_manager import get_user_data, update_user_xp, get_top_users
+from database_manager import (
+    add_user_xp,
+    buffer_user_xp,
+    flush_write_behind,
+    get_leaderboard_page,
+    get_period_leaderboard_page,
+    get_user_data,
+    get_user_rank,
+    prune_xp_rollups,
+    transaction,
+    update_user_level,
+    write_buffer,
+    VC_XP_PER_MIN,
+)
 
 logger: logging.Logger = logging.getLogger("LevelingCog")
 SUMMARY_CHANNEL_ID: int = int(os.getenv("SUMMARY_CHANNEL_ID", "0"))
 MASTER_USER_ID: int = int(os.getenv("MASTER_USER_ID", "0"))
-VC_XP_PER_MIN: int = 5
+LEADERBOARD_PAGE_SIZE: int = 10
+LEADERBOARD_PERIOD_LABELS: Dict[str, str] = {
+    "all": "전체",
+    "daily": "오늘",
+    "weekly": "이번 주",
+    "monthly": "이번 달",
+}
+MIN_VOICE_SECONDS: int = 60  # 1분을 채우지 않은 음성 세션은 경험치 없음 (악용 방지)
+VOICE_CHECKPOINT_MINUTES: float = float(os.getenv("VOICE_CHECKPOINT_MINUTES", "5"))
 
 # --- Helper Functions ---
+class _JamoWeightTable(dict):
+    """문자별 타수를 처음 만났을 때 한 번만 계산해 캐싱합니다."""
+
+    def __missing__(self, char: str) -> int:
+        code: int = ord(char)
+        # 한글 음절 (가-힣): 종성이 있으면 3타, 없으면 2타
+        if 0xAC00 <= code <= 0xD7A3:
+            weight: int = 3 if (code - 0xAC00) % 28 > 0 else 2
+        else:
+            # 공백 제외 다른 문자들 (숫자, 영어 등)은 1타
+            weight = 1 if char.strip() else 0
+        self[char] = weight
+        return weight
+
+_jamo_weights: _JamoWeightTable = _JamoWeightTable()
+
 def calculate_jamo_length(text: str) -> int:
-    length: int = 0
-    for char in text:
-        # 한글 음절 (가-힣)
-        if 0xAC00 <= ord(char) <= 0xD7A3:
-            char_code: int = ord(char) - 0xAC00
-            jong: int = char_code % 28
-            # 종성이 있으면 3타, 없으면 2타
-            length += 3 if jong > 0 else 2
-        elif char.strip(): # 공백 제외 다른 문자들 (숫자, 영어 등)
-            length += 1
-    return length
+    if text.isascii():
+        # 영문·숫자만 있는 메시지는 공백을 뺀 글자 수가 곧 타수입니다.
+        return len("".join(text.split()))
+    return sum(map(_jamo_weights.__getitem__, text))
 
 def get_required_xp(level: int) -> int:
     # 레벨업 요구량 곡선: 100 * (level ^ 1.8) + 10 * (1.1 ^ level)
     # 기존 유저 동의 하에 후반부 진입을 막기 위한 기하급수적 난이도 적용
     return int(100 * (level ** 1.8) + 10 * (1.1 ** level))
 
+# 레벨별 누적 요구 경험치 표: _xp_thresholds[level - 1] == get_required_xp(level)
+# 필요한 구간까지만 늘려가며, 곡선이 단조 증가하므로 이진 탐색으로 레벨을 찾습니다.
+_xp_thresholds: List[int] = []
+
+def _grow_thresholds_to_level(level: int) -> None:
+    while len(_xp_thresholds) < level:
+        _xp_thresholds.append(get_required_xp(len(_xp_thresholds) + 1))
+
+def _grow_thresholds_past_xp(total_xp: int) -> None:
+    while not _xp_thresholds or _xp_thresholds[-1] <= total_xp:
+        _xp_thresholds.append(get_required_xp(len(_xp_thresholds) + 1))
+
+def required_xp_for_level(level: int) -> int:
+    """get_required_xp와 같은 값을 표에서 꺼냅니다. (level >= 1)"""
+    _grow_thresholds_to_level(level)
+    return _xp_thresholds[level - 1]
+
 def calculate_level_from_xp(total_xp: int) -> int:
     """총 경험치를 기반으로 항상 정확한 현재 레벨을 역산합니다."""
-    level = 1
-    while total_xp >= get_required_xp(level):
-        level += 1
-    return level
+    _grow_thresholds_past_xp(total_xp)
+    return bisect_right(_xp_thresholds, total_xp) + 1
+
+def resolve_cached_level(text_xp: int, vc_seconds: int) -> int:
+    """DB에 누적된 텍스트 XP와 음성 체류 시간으로 캐시할 레벨을 계산합니다."""
+    return calculate_level_from_xp(text_xp + (vc_seconds // 60) * VC_XP_PER_MIN)
+
+class VoiceSession:
+    """음성 채널 체류 한 건의 유효 시간과 DB에 이미 정산한 시간을 추적합니다."""
+
+    __slots__ = ("guild_id", "joined_at", "is_muted_or_deafened", "last_state_change", "valid_duration", "settled_seconds")
+
+    def __init__(self, guild_id: int, is_muted_or_deafened: bool, now: float) -> None:
+        self.guild_id: int = guild_id
+        self.joined_at: float = now
+        self.is_muted_or_deafened: bool = is_muted_or_deafened
+        self.last_state_change: float = now
+        self.valid_duration: float = 0.0
+        self.settled_seconds: int = 0
+
+    def accumulate(self, now: float) -> None:
+        """마지막 상태 변경 이후 정상(비뮤트) 상태로 머문 시간을 누적합니다."""
+        if not self.is_muted_or_deafened:
+            self.valid_duration += now - self.last_state_change
+        self.last_state_change = now
+
+    def set_muted(self, is_muted_or_deafened: bool, now: float) -> None:
+        self.accumulate(now)
+        self.is_muted_or_deafened = is_muted_or_deafened
+
+    def take_unsettled_seconds(self) -> int:
+        """아직 DB에 반영하지 않은 유효 시간(초)을 꺼내 정산 완료로 표시합니다."""
+        valid_seconds: int = int(self.valid_duration)
+        if valid_seconds < MIN_VOICE_SECONDS:
+            return 0
+        unsettled: int = valid_seconds - self.settled_seconds
+        self.settled_seconds = valid_seconds
+        return unsettled
+
+def _is_muted_or_deafened(voice_state: Optional[discord.VoiceState]) -> bool:
+    if voice_state is None:
+        return False
+    return bool(voice_state.self_mute or voice_state.mute or voice_state.self_deaf or voice_state.deaf)
 
 class LevelingCog(commands.Cog):
     def __init__(self, bot: commands.Bot) -> None:
         self.bot: commands.Bot = bot
-        self.voice_sessions: Dict[int, dict] = {}  # user_id -> {"time": join_time_seconds, "guild_id": guild_id}
+        self.voice_sessions: Dict[int, VoiceSession] = {}  # user_id -> VoiceSession
+        # 메시지 XP는 쓰기 지연 버퍼로 모아 반영하므로, 반영 시 레벨 캐시 규칙을 알려줍니다.
+        write_buffer.level_resolver = resolve_cached_level
+
+    async def _grant_xp(self, user_id: int, guild_id: int, xp_added: int = 0, vc_sec_added: int = 0) -> int:
+        """XP를 한 번의 구문으로 반영하고, 반환된 누적치로 레벨업 여부를 판단합니다."""
+        # XP 반영과 레벨 캐시 갱신을 쓰기 잠금 한 번, 커밋 한 번으로 묶습니다.
+        async with transaction("grant_xp"):
+            row: Dict[str, int] = await add_user_xp(user_id, guild_id, xp_added, vc_sec_added)
+            new_level: int = resolve_cached_level(row["xp"], row["total_vc_seconds"])
+            if new_level > row["level"]:
+                await update_user_level(user_id, guild_id, new_level)
+        return new_level
 
     @commands.Cog.listener()
     async def on_ready(self) -> None:
@@ -54,59 +153,64 @@ class LevelingCog(commands.Cog):
                 for vc in guild.voice_channels:
                     for member in vc.members:
                         if not member.bot and member.id not in self.voice_sessions:
-                            self.voice_sessions[member.id] = {
-                                "time": time.time(),
-                                "guild_id": guild.id,
-                                "is_muted_or_deafened": member.voice.self_mute or member.voice.mute or member.voice.self_deaf or member.voice.deaf if member.voice else False,
-                                "last_state_change": time.time(),
-                                "valid_duration": 0.0
-                            }
+                            self.voice_sessions[member.id] = VoiceSession(
+                                guild.id, _is_muted_or_deafened(member.voice), time.time()
+                            )
                             recovered += 1
             if recovered > 0:
                 logger.info(f"[Leveling] 봇 재기동: {recovered}명의 음성 세션을 복구하여 추적을 시작합니다.")
         except Exception as e:
             logger.error(f"[Leveling] on_ready 세션 복구 중 오류 발생: {e}", exc_info=True)
 
+    async def cog_load(self) -> None:
+        self.voice_checkpoint_loop.start()
+        self.xp_rollup_retention_loop.start()
+
+    def _checkpoint_voice_sessions(self) -> int:
+        """진행 중인 세션의 미정산 음성 시간을 쓰기 지연 버퍼에 모읍니다."""
+        now: float = time.time()
+        queued: int = 0
+        for member_id, session in self.voice_sessions.items():
+            session.accumulate(now)
+            unsettled: int = session.take_unsettled_seconds()
+            if unsettled > 0:
+                buffer_user_xp(member_id, session.guild_id, 0, vc_sec_added=unsettled)
+                queued += 1
+        return queued
+
+    @tasks.loop(minutes=VOICE_CHECKPOINT_MINUTES)
+    async def voice_checkpoint_loop(self) -> None:
+        """정전·강제 종료 시 잃는 음성 XP를 줄이도록 주기적으로 한 트랜잭션에 정산합니다."""
+        try:
+            if self._checkpoint_voice_sessions() > 0:
+                await flush_write_behind()
+        except Exception as e:
+            logger.error(f"[Leveling] 음성 세션 중간 정산 중 오류 발생: {e}", exc_info=True)
+
+    @tasks.loop(hours=24)
+    async def xp_rollup_retention_loop(self) -> None:
+        """기간별 랭킹에 쓰이지 않는 오래된 일 단위 XP 집계를 정리합니다."""
+        try:
+            deleted: int = await prune_xp_rollups()
+            if deleted:
+                logger.info(f"[Leveling] 보존 기간이 지난 일별 XP 집계 {deleted}건을 정리했습니다.")
+        except Exception as e:
+            logger.error(f"[Leveling] 일별 XP 집계 정리 중 오류 발생: {e}", exc_info=True)
+
     async def cog_unload(self) -> None:
         """봇 종료 또는 언로드 시, 남아있는 음성 세션을 일괄 정산하여 기동 중 증발을 방지합니다."""
         try:
+            self.voice_checkpoint_loop.cancel()
+            self.xp_rollup_retention_loop.cancel()
             logger.info("[Leveling] 봇 종료 감지: 남아있는 음성 세션을 DB에 강제 정산합니다.")
-            for member_id, session_data in list(self.voice_sessions.items()):
-                join_time: float = session_data["time"]
-                guild_id: int = session_data["guild_id"]
-                
-                # 진행 중이던 상태 정산
-                if not session_data.get("is_muted_or_deafened", False):
-                    session_data["valid_duration"] += time.time() - session_data.get("last_state_change", join_time)
-                
-                duration_sec: int = int(session_data.get("valid_duration", 0.0))
-                
-                if duration_sec >= 60:
-                    user_data: Optional[Dict[str, any]] = await get_user_data(member_id, guild_id)
-                    current_level: int = user_data["level"] if user_data else 1
-                    current_text_xp: int = user_data["xp"] if user_data else 0
-                    current_vc_sec: int = user_data["total_vc_seconds"] if user_data else 0
-                    
-                    new_vc_sec: int = current_vc_sec + duration_sec
-                    total_xp: int = current_text_xp + (new_vc_sec // 60) * VC_XP_PER_MIN
-                    new_level: int = current_level
-                    
-                    # 레벨업 스케일 계산 (기동 중이므로 역할 부여는 생략, 레벨만 갱신)
-                    while total_xp >= get_required_xp(new_level):
-                        new_level += 1
-                    
-                    final_new_level: Optional[int] = new_level if new_level > current_level else None
-                    await update_user_xp(member_id, guild_id, xp_added=0, vc_sec_added=duration_sec, new_level=final_new_level)
-                
-                # 세션 삭제
-                self.voice_sessions.pop(member_id, None)
+            # 기동 중이므로 역할 부여는 생략하고, 모든 세션과 버퍼의 메시지 XP를 한 번에 반영합니다.
+            self._checkpoint_voice_sessions()
+            self.voice_sessions.clear()
+            await flush_write_behind()
             logger.info("[Leveling] 음성 세션 정산 및 안전 종료 완료.")
         except Exception as e:
             logger.error(f"[Leveling] cog_unload 정산 중 오류 발생: {e}", exc_info=True)
 
-
-
-
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message) -> None:
         try:
@@ -116,19 +220,8 @@ class LevelingCog(commands.Cog):
             # 모든 채널에서 경험치 작동하도록 변경
             xp_to_add: int = calculate_jamo_length(message.content)
             if xp_to_add > 0:
-                user_data: Optional[Dict[str, any]] = await get_user_data(message.author.id, message.guild.id)
-                current_level: int = user_data["level"] if user_data else 1
-                current_text_xp: int = user_data["xp"] if user_data else 0
-                current_vc_sec: int = user_data["total_vc_seconds"] if user_data else 0
-                    
-                total_xp: int = (current_text_xp + xp_to_add) + (current_vc_sec // 60) * VC_XP_PER_MIN
-                new_level: int = current_level
-                while total_xp >= get_required_xp(new_level):
-                    new_level += 1
-                
-                final_new_level: Optional[int] = new_level if new_level > current_level else None
-                
-                await update_user_xp(message.author.id, message.guild.id, xp_added=xp_to_add, new_level=final_new_level)
+                # 메시지마다 커밋하지 않고 버퍼에서 합산한 뒤 주기적으로 한 번에 반영합니다.
+                buffer_user_xp(message.author.id, message.guild.id, xp_to_add)
         except Exception as e:
             logger.error(f"[Leveling] on_message 처리 중 오류 발생: {e}", exc_info=True)
 
@@ -140,61 +233,32 @@ class LevelingCog(commands.Cog):
 
             # 방에 들어옴
             if not before.channel and after.channel:
-                is_muted_or_deafened = after.self_mute or after.mute or after.self_deaf or after.deaf
-                self.voice_sessions[member.id] = {
-                    "time": time.time(), 
-                    "guild_id": member.guild.id,
-                    "is_muted_or_deafened": is_muted_or_deafened,
-                    "last_state_change": time.time(),
-                    "valid_duration": 0.0
-                }
+                self.voice_sessions[member.id] = VoiceSession(
+                    member.guild.id, _is_muted_or_deafened(after), time.time()
+                )
             
             # 방 안에서 상태가 변경됨 (뮤트/데프 등)
             elif before.channel and after.channel and before.channel == after.channel:
-                if member.id in self.voice_sessions:
-                    session_data = self.voice_sessions[member.id]
-                    was_muted = session_data.get("is_muted_or_deafened", False)
-                    is_muted_now = after.self_mute or after.mute or after.self_deaf or after.deaf
-                    
-                    if was_muted != is_muted_now:
-                        # 정상 상태(unmuted)에서 뮤트 상태로 바뀐 경우: 그간의 시간 누적
-                        if not was_muted:
-                            session_data["valid_duration"] += time.time() - session_data["last_state_change"]
-                        
-                        # 상태 업데이트
-                        session_data["is_muted_or_deafened"] = is_muted_now
-                        session_data["last_state_change"] = time.time()
+                session = self.voice_sessions.get(member.id)
+                if session is not None:
+                    is_muted_now = _is_muted_or_deafened(after)
+                    if session.is_muted_or_deafened != is_muted_now:
+                        # 정상 상태에서 뮤트로 바뀐 경우 그간의 시간을 누적하고 상태를 갱신
+                        session.set_muted(is_muted_now, time.time())
             
             # 방에서 나감
             elif before.channel and not after.channel:
-                if member.id in self.voice_sessions:
-                    session_data: dict = self.voice_sessions.pop(member.id)
-                    
+                session = self.voice_sessions.pop(member.id, None)
+                if session is not None:
                     # 마지막으로 머물던 상태가 정상이었다면 그 시간도 누적
-                    if not session_data.get("is_muted_or_deafened", False):
-                        session_data["valid_duration"] += time.time() - session_data.get("last_state_change", session_data["time"])
-                        
-                    duration_sec: int = int(session_data.get("valid_duration", 0.0))
-                    
-                    # 1분을 채우지 않으면 경험치 스킵 (악용 방지)
-                    if duration_sec < 60:
+                    session.accumulate(time.time())
+
+                    # 중간 정산분을 제외한 나머지만 반영 (1분 미만 세션은 스킵)
+                    unsettled: int = session.take_unsettled_seconds()
+                    if unsettled <= 0:
                         return
 
-                    user_data: Optional[Dict[str, any]] = await get_user_data(member.id, member.guild.id)
-                    current_level: int = user_data["level"] if user_data else 1
-                    current_text_xp: int = user_data["xp"] if user_data else 0
-                    current_vc_sec: int = user_data["total_vc_seconds"] if user_data else 0
-                    
-                    new_vc_sec: int = current_vc_sec + duration_sec
-                    total_xp: int = current_text_xp + (new_vc_sec // 60) * VC_XP_PER_MIN
-                    new_level: int = current_level
-                    
-                    while total_xp >= get_required_xp(new_level):
-                        new_level += 1
-                    
-                    final_new_level: Optional[int] = new_level if new_level > current_level else None
-                    
-                    await update_user_xp(member.id, member.guild.id, xp_added=0, vc_sec_added=duration_sec, new_level=final_new_level)
+                    await self._grant_xp(member.id, member.guild.id, vc_sec_added=unsettled)
         except Exception as e:
             logger.error(f"[Leveling] on_voice_state_update 처리 중 오류 발생: {e}", exc_info=True)
 
@@ -215,7 +279,9 @@ class LevelingCog(commands.Cog):
                 else:
                     pass  # 다른 유저가 조회했을 때 거부 반응을 주지 않고 조용히 자신의 정보 카드를 반환
 
+            await flush_write_behind()
             user_data: Optional[Dict[str, any]] = await get_user_data(target_user.id, interaction.guild.id)
+            rank_info: Optional[Dict[str, int]] = await get_user_rank(target_user.id, interaction.guild.id)
             
             text_xp: int = user_data["xp"] if user_data else 0
             vc_seconds: int = user_data["total_vc_seconds"] if user_data else 0
@@ -226,8 +292,8 @@ class LevelingCog(commands.Cog):
             # DB 캐시된 레벨이 아니라 수식에서 정확한 현재 레벨을 추출합니다. (과거 소급 뻥튀기 방어)
             real_level: int = calculate_level_from_xp(total_xp)
             
-            curr_req_xp: int = get_required_xp(real_level - 1) if real_level > 1 else 0
-            next_req_xp: int = get_required_xp(real_level)
+            curr_req_xp: int = required_xp_for_level(real_level - 1) if real_level > 1 else 0
+            next_req_xp: int = required_xp_for_level(real_level)
             
             # 진행도 바 계산 (10칸)
             progress_total: int = next_req_xp - curr_req_xp
@@ -243,6 +309,8 @@ class LevelingCog(commands.Cog):
             embed: discord.Embed = discord.Embed(title=f"👤 {target_user.display_name}님의 정보", color=0x3498DB)
             embed.add_field(name="현재 레벨", value=f"**Lv.{real_level}**", inline=True)
             embed.add_field(name="총 누적 경험치", value=f"**{total_xp:,} XP**", inline=True)
+            if rank_info:
+                embed.add_field(name="서버 순위", value=f"**{rank_info['rank']}위** / {rank_info['ranked_users']}명", inline=True)
             embed.add_field(name="경험치 상세", value=f"💬 텍스트: {text_xp:,} XP\n🎙️ 음성: {voice_xp:,} XP", inline=False)
             
             # 진행도 표기를 RPG 게임 포맷(현재/목표치)으로 개선
@@ -260,36 +328,34 @@ class LevelingCog(commands.Cog):
                 await interaction.followup.send("명령어 처리 중 오류가 발생했습니다.", ephemeral=True)
 
 
-    @app_commands.command(name="랭킹", description="서버 내 경험치 랭킹 TOP 10을 확인합니다.")
-    async def leaderboard(self, interaction: discord.Interaction, ephemeral: bool = False) -> None:
+    @app_commands.command(name="랭킹", description="서버 내 경험치 랭킹을 페이지별로 확인합니다.")
+    @app_commands.describe(period="랭킹 집계 기간 (기본: 전체)")
+    @app_commands.choices(period=[
+        app_commands.Choice(name=label, value=value)
+        for value, label in LEADERBOARD_PERIOD_LABELS.items()
+    ])
+    async def leaderboard(self, interaction: discord.Interaction, period: str = "all", ephemeral: bool = False) -> None:
         try:
             await interaction.response.defer(ephemeral=ephemeral)
             if not interaction.guild:
                 await interaction.followup.send("이 명령어는 서버 내에서만 사용할 수 있습니다.", ephemeral=ephemeral)
                 return
 
-            top_users: list[Dict[str, any]] = await get_top_users(interaction.guild.id)
-                
-            embed: discord.Embed = discord.Embed(title=f"🏆 {interaction.guild.name} 랭킹 TOP 10", color=0xF1C40F)
-            description: str = ""
-            
-            if not top_users:
-                description = "이 서버에 경험치가 기록된 유저가 없습니다."
-            else:
-                for idx, row in enumerate(top_users):
-                    member: Optional[discord.Member] = interaction.guild.get_member(row["user_id"])
-                    name: str = member.display_name if member else f"알 수 없는 유저 ({row['user_id']})"
-                    
-                    medal: str = "🏅"
-                    if idx == 0: medal = "🥇"
-                    elif idx == 1: medal = "🥈"
-                    elif idx == 2: medal = "🥉"
-                    
-                    real_level: int = calculate_level_from_xp(row['total_xp'])
-                    description += f"{medal} **{idx+1}위** | {name} - **Lv.{real_level}** ({row['total_xp']:,} XP)\n\n"
-            
-            embed.description = description
-            await interaction.followup.send(embed=embed)
+            guild: discord.Guild = interaction.guild
+
+            async def fetch_page(page: int) -> Dict[str, Any]:
+                await flush_write_behind()
+                if period == "all":
+                    return await get_leaderboard_page(guild.id, page=page, page_size=LEADERBOARD_PAGE_SIZE)
+                return await get_period_leaderboard_page(guild.id, period, page=page, page_size=LEADERBOARD_PAGE_SIZE)
+
+            title: str = f"🏆 {guild.name} 랭킹"
+            if period != "all":
+                title += f" ({LEADERBOARD_PERIOD_LABELS[period]})"
+            # 기간 랭킹의 XP는 해당 기간 획득량이므로 누적 레벨은 표시하지 않습니다.
+            view = LeaderboardView(interaction.user.id, guild, title, fetch_page, show_level=period == "all")
+            embed: discord.Embed = await view.load_page(0)
+            await interaction.followup.send(embed=embed, view=view)
         except Exception as e:
             logger.error(f"[Leveling] leaderboard 명령어 실행 중 오류 발생: {e}", exc_info=True)
             if not interaction.response.is_done():
@@ -298,6 +364,84 @@ class LevelingCog(commands.Cog):
                 await interaction.followup.send("랭킹 정보를 불러오는 중 오류가 발생했습니다.")
 
 
+class LeaderboardView(ui.View):
+    """랭킹을 한 페이지씩 DB에서 불러와 이전/다음 버튼으로 넘겨 보는 뷰"""
+
+    def __init__(
+        self,
+        owner_id: int,
+        guild: discord.Guild,
+        title: str,
+        fetch_page: Callable[[int], Awaitable[Dict[str, Any]]],
+        show_level: bool = True,
+    ) -> None:
+        super().__init__(timeout=180)
+        self.owner_id: int = owner_id
+        self.guild: discord.Guild = guild
+        self.title: str = title
+        self.fetch_page: Callable[[int], Awaitable[Dict[str, Any]]] = fetch_page
+        self.show_level: bool = show_level
+        self.page: int = 0
+        self.page_count: int = 1
+
+    async def load_page(self, page: int) -> discord.Embed:
+        data: Dict[str, Any] = await self.fetch_page(page)
+        self.page = page
+        self.page_count = max(1, -(-data["total_users"] // data["page_size"]))
+        self.previous_page.disabled = self.page <= 0
+        self.next_page.disabled = self.page >= self.page_count - 1
+        return self.build_embed(data)
+
+    def build_embed(self, data: Dict[str, Any]) -> discord.Embed:
+        embed: discord.Embed = discord.Embed(title=self.title, color=0xF1C40F)
+        rows: List[Dict[str, Any]] = data["rows"]
+        if not rows:
+            if self.show_level:
+                embed.description = "이 서버에 경험치가 기록된 유저가 없습니다."
+            else:
+                embed.description = "이 기간에 경험치가 기록된 유저가 없습니다."
+            return embed
+
+        description: str = ""
+        start_rank: int = data["page"] * data["page_size"] + 1
+        for rank, row in enumerate(rows, start=start_rank):
+            member: Optional[discord.Member] = self.guild.get_member(row["user_id"])
+            name: str = member.display_name if member else f"알 수 없는 유저 ({row['user_id']})"
+
+            medal: str = "🏅"
+            if rank == 1: medal = "🥇"
+            elif rank == 2: medal = "🥈"
+            elif rank == 3: medal = "🥉"
+
+            if self.show_level:
+                real_level: int = calculate_level_from_xp(row['total_xp'])
+                description += f"{medal} **{rank}위** | {name} - **Lv.{real_level}** ({row['total_xp']:,} XP)\n\n"
+            else:
+                description += f"{medal} **{rank}위** | {name} - **{row['total_xp']:,} XP**\n\n"
+
+        embed.description = description
+        embed.set_footer(text=f"{self.page + 1} / {self.page_count} 페이지 | 총 {data['total_users']}명")
+        return embed
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.owner_id:
+            await interaction.response.send_message("랭킹을 연 사람만 페이지를 넘길 수 있습니다.", ephemeral=True)
+            return False
+        return True
+
+    async def _show_page(self, interaction: discord.Interaction, page: int) -> None:
+        embed: discord.Embed = await self.load_page(page)
+        await interaction.response.edit_message(embed=embed, view=self)
+
+    @ui.button(label="이전", emoji="◀️", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: ui.Button) -> None:
+        await self._show_page(interaction, max(0, self.page - 1))
+
+    @ui.button(label="다음", emoji="▶️", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: ui.Button) -> None:
+        await self._show_page(interaction, min(self.page_count - 1, self.page + 1))
+
+
 async def setup(bot: commands.Bot) -> None:
     await bot.add_cog(LevelingCog(bot))
 
@@ -6,12 +6,15 @@ import asyncio
 import subprocess
 from logging.handlers import TimedRotatingFileHandler
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 import discord
+from discord import app_commands
 from discord.ext import commands
 from dotenv import load_dotenv
 
+from database_manager import SLOW_QUERY_LOGGER_NAME, get_db_latency_stats, get_query_cache_stats
+
 # --- 현재 파일 위치를 기준으로 봇 루트 디렉토리 산출 ---
 BASE_DIR: Path = Path(__file__).resolve().parent.parent.parent
 
@@ -35,6 +38,95 @@ PROJECT_LOGGER_NAMES = (
     "WatchServer",
     "cogs",
 )
+# /db통계 응답에 보여줄 최대 호출 지점 수 (누적 실행 시간 순)
+DB_STATS_MAX_CALL_SITES: int = 15
+
+
+def _format_cache_lines(caches: Dict[str, Dict[str, int]]) -> List[str]:
+    """Return one hit/miss line per cache, with cache-specific counters appended."""
+    lines: List[str] = [f"{'cache':<16} {'entries':>7} {'hits':>7} {'misses':>7} {'hit%':>5}"]
+    for name, cache in caches.items():
+        lookups = cache["hits"] + cache["misses"]
+        hit_rate = cache["hits"] * 100 / lookups if lookups else 0.0
+        extras = " ".join(
+            f"{key}={value}"
+            for key, value in cache.items()
+            if key not in ("entries", "hits", "misses")
+        )
+        lines.append(
+            f"{name[:16]:<16} {cache['entries']:>7} {cache['hits']:>7} {cache['misses']:>7} "
+            f"{hit_rate:>5.1f} {extras}".rstrip()
+        )
+    return lines
+
+
+def format_db_latency_report(
+    stats: Dict[str, Dict[str, Any]],
+    caches: Optional[Dict[str, Dict[str, int]]] = None,
+) -> str:
+    """Render per-call-site DB percentiles as a Discord code block under 2000 characters."""
+    if not stats and not caches:
+        return "아직 기록된 DB 호출이 없습니다."
+
+    lines: List[str] = []
+    # 캐시 적중률은 짧으므로 호출 지점 목록이 잘리더라도 보이도록 앞에 둡니다.
+    if caches:
+        lines.extend(_format_cache_lines(caches))
+        lines.append("")
+    lines.append(
+        f"{'call site':<28} {'calls':>6} {'wait p50/p99':>13} {'exec p50/p95/p99':>18} {'rows p95':>8} {'slow':>5}"
+    )
+    busiest = sorted(stats.items(), key=lambda item: item[1]["total_exec_ms"], reverse=True)
+    for call_site, site in busiest[:DB_STATS_MAX_CALL_SITES]:
+        wait, run, rows = site["lock_wait_ms"], site["exec_ms"], site["rows"]
+        lines.append(
+            f"{call_site[:28]:<28} {site['calls']:>6} "
+            f"{wait['p50']:>6.1f}/{wait['p99']:<6.1f} "
+            f"{run['p50']:>6.1f}/{run['p95']:.1f}/{run['p99']:<6.1f} "
+            f"{rows['p95']:>8.0f} {site['slow_calls']:>5}"
+        )
+    if len(busiest) > DB_STATS_MAX_CALL_SITES:
+        lines.append(f"... 외 {len(busiest) - DB_STATS_MAX_CALL_SITES}개 호출 지점")
+
+    header = "**[ DB 지연 통계 ]** (단위: ms, 봇 시작 이후 누적)\n"
+    body = "\n".join(lines)
+    # 디스코드 메시지 길이 제한(2000자)을 넘지 않도록 자릅니다.
+    body = body[:2000 - len(header) - 8]
+    return f"{header}```\n{body}\n```"
+
+
+def format_music_stats_report(
+    pool_stats: Dict[str, Any],
+    track_gaps: Optional[Dict[str, Dict[str, float]]] = None,
+) -> str:
+    """Render extraction pool queue depth, per-priority waits and track gaps as a code block."""
+    lines: List[str] = [
+        f"mode={pool_stats['mode']} workers={pool_stats['workers']} "
+        f"queue={pool_stats['queue_depth']} running={pool_stats['running']}",
+        f"{'priority':<12} {'done':>6} {'fail':>5} {'cancel':>6} {'esc':>4} {'wait p50/p95':>14} {'run p50/p95':>14}",
+    ]
+    for priority, stats in pool_stats["by_priority"].items():
+        lines.append(
+            f"{priority:<12} {stats['completed']:>6} {stats['failed']:>5} {stats['cancelled']:>6} "
+            f"{stats['escalated']:>4} "
+            f"{stats['wait_p50_ms']:>6.0f}/{stats['wait_p95_ms']:<7.0f} "
+            f"{stats['run_p50_ms']:>6.0f}/{stats['run_p95_ms']:<7.0f}"
+        )
+    # 곡이 끝나고 다음 곡 소리가 나기까지의 공백입니다. (서버별 최근 기록)
+    gaps = {guild: gap for guild, gap in (track_gaps or {}).items() if gap["count"]}
+    if gaps:
+        lines.append("")
+        lines.append(f"{'track gap':<20} {'count':>5} {'avg':>7} {'p95':>7} {'max':>7} {'last':>7}")
+        for guild, gap in gaps.items():
+            lines.append(
+                f"{guild[:20]:<20} {gap['count']:>5} {gap['avg_ms']:>7.0f} "
+                f"{gap['p95_ms']:>7.0f} {gap['max_ms']:>7.0f} {gap['last_ms']:>7.0f}"
+            )
+
+    header = "**[ 음악 추출 통계 ]** (단위: ms, 최근 200건)\n"
+    body = "\n".join(lines)
+    body = body[:2000 - len(header) - 8]
+    return f"{header}```\n{body}\n```"
 
 
 class WatchSessionControlView(discord.ui.View):
@@ -330,6 +422,25 @@ class LogAgentCog(commands.Cog, name="LogAgent"):
             setattr(console_handler, OWNED_HANDLER_ATTRIBUTE, True)
             logger.addHandler(console_handler)
 
+            # 6. [느린 쿼리 핸들러] 느린 DB 호출은 system.log와 디스코드 채널 대신 전용 파일에 남깁니다.
+            slow_query_logger: logging.Logger = logging.getLogger(SLOW_QUERY_LOGGER_NAME)
+            for handler in list(slow_query_logger.handlers):
+                if getattr(handler, OWNED_HANDLER_ATTRIBUTE, False):
+                    slow_query_logger.removeHandler(handler)
+                    handler.close()
+            slow_query_handler: TimedRotatingFileHandler = TimedRotatingFileHandler(
+                filename=str(LOG_DIR / "slow_query.log"),
+                when="midnight",
+                interval=1,
+                backupCount=7,
+                encoding="utf-8"
+            )
+            slow_query_handler.setFormatter(standard_formatter)
+            setattr(slow_query_handler, OWNED_HANDLER_ATTRIBUTE, True)
+            slow_query_logger.addHandler(slow_query_handler)
+            slow_query_logger.setLevel(logging.WARNING)
+            slow_query_logger.propagate = False
+
             logging.getLogger("MyBot").info(
                 "✅ 로깅 시스템 초기화 완료 (File + Console)"
             )
@@ -338,6 +449,36 @@ class LogAgentCog(commands.Cog, name="LogAgent"):
             sys.stderr.write("[LogAgentCog] 로깅 시스템 초기화 중 심각한 오류 발생\\n")
             traceback.print_exc(file=sys.stderr)
 
+    @app_commands.command(name="db통계", description="[어드민 전용] DB 호출 지점별 대기/실행 시간과 음악 추출 대기열을 확인합니다.")
+    async def db_stats(self, interaction: discord.Interaction) -> None:
+        if interaction.user.id != MASTER_USER_ID:
+            await interaction.response.send_message("이 명령어를 사용할 권한이 없습니다.", ephemeral=True)
+            return
+
+        caches: Dict[str, Dict[str, int]] = {
+            f"db.{name}": cache for name, cache in get_query_cache_stats().items()
+        }
+        music_cog = interaction.client.get_cog('MusicAgentCog')
+        if music_cog:
+            from cogs.music.music_utils import extraction_cache
+            caches["ytdl.extract"] = extraction_cache.stats()
+        await interaction.response.send_message(
+            format_db_latency_report(get_db_latency_stats(), caches),
+            ephemeral=True,
+        )
+
+        # 음악 기능이 켜져 있으면 yt-dlp 추출 워커의 대기열과 곡 사이 공백도 함께 보여 줍니다.
+        if music_cog:
+            from cogs.music.music_utils import extraction_pool
+            track_gaps = {
+                state.guild.name: state.get_track_gap_stats()
+                for state in music_cog.music_states.values()
+            }
+            await interaction.followup.send(
+                format_music_stats_report(extraction_pool.stats(), track_gaps),
+                ephemeral=True,
+            )
+
     @commands.Cog.listener()
     async def on_ready(self) -> None:
         """
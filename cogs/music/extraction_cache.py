@@ -0,0 +1,192 @@
+import asyncio
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from .extraction_pool import ExtractionPriority
+
+# 스트림 URL이 없는 결과(검색 메타데이터 등)를 보관하는 시간입니다.
+YTDL_CACHE_TTL_SECONDS: float = float(os.getenv("YTDL_CACHE_TTL_SECONDS", "1800"))
+YTDL_CACHE_ENTRIES: int = max(1, int(os.getenv("YTDL_CACHE_ENTRIES", "512")))
+# 재생 도중 FFmpeg가 같은 URL로 재연결할 수 있도록 만료 전에 여유를 둡니다.
+STREAM_URL_SAFETY_SECONDS: float = 900.0
+
+# googlevideo URL은 ?expire=<epoch> 또는 /expire/<epoch>/ 형태로 만료 시각을 담습니다.
+_PATH_EXPIRE_PATTERN: re.Pattern = re.compile(r"/expire/(\d+)(?:/|$)")
+
+Extractor = Callable[[str, bool, ExtractionPriority], Awaitable[Optional[Dict[str, Any]]]]
+
+
+def stream_url_expiry(url: Optional[str]) -> Optional[float]:
+    """Return the epoch time a googlevideo stream URL stops working, if it says."""
+    if not url:
+        return None
+    parts = urlsplit(url)
+    if not parts.hostname or not parts.hostname.endswith("googlevideo.com"):
+        return None
+    values = parse_qs(parts.query).get("expire")
+    if values and values[0].isdigit():
+        return float(values[0])
+    match = _PATH_EXPIRE_PATTERN.search(parts.path)
+    return float(match.group(1)) if match else None
+
+
+def _iter_infos(info: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield info
+    for entry in info.get("entries") or ():
+        if entry:
+            yield entry
+
+
+def _consume_exception(task: asyncio.Task) -> None:
+    # 모든 호출자가 취소된 뒤 실패해도 "예외가 회수되지 않음" 경고를 남기지 않습니다.
+    if not task.cancelled():
+        task.exception()
+
+
+class ExtractionCache:
+    """Cache yt-dlp ``extract_info`` results and coalesce identical lookups.
+
+    Results carrying googlevideo stream URLs expire shortly before the earliest
+    ``expire`` timestamp among them; other results live for ``metadata_ttl``.
+    Cached dicts are shared between callers and must not be mutated.
+
+    When the extractor returns an awaitable with ``escalate(priority)`` (an
+    ``ExtractionJob``), a higher-priority caller joining an in-flight lookup
+    moves that job ahead instead of waiting behind its original priority.
+    """
+
+    def __init__(
+        self,
+        extractor: Extractor,
+        max_entries: int = YTDL_CACHE_ENTRIES,
+        metadata_ttl: float = YTDL_CACHE_TTL_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._extractor: Extractor = extractor
+        self._max_entries: int = max_entries
+        self._metadata_ttl: float = metadata_ttl
+        self._clock: Callable[[], float] = clock
+        self._entries: "OrderedDict[Tuple[str, bool], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, bool], asyncio.Future] = {}
+        self._inflight_jobs: Dict[Tuple[str, bool], Tuple[Awaitable[Optional[Dict[str, Any]]], ExtractionPriority]] = {}
+        self.hits: int = 0
+        self.misses: int = 0
+        self.coalesced: int = 0
+        self.escalated: int = 0
+        self.expired: int = 0
+
+    def _lookup(self, key: Tuple[str, bool]) -> Optional[Dict[str, Any]]:
+        cached = self._entries.get(key)
+        if cached is None:
+            return None
+        expires_at, info = cached
+        if expires_at <= self._clock():
+            del self._entries[key]
+            self.expired += 1
+            return None
+        self._entries.move_to_end(key)
+        return info
+
+    def _expires_at(self, info: Dict[str, Any]) -> float:
+        now = self._clock()
+        expiries = [
+            expiry
+            for item in _iter_infos(info)
+            if (expiry := stream_url_expiry(item.get("url"))) is not None
+        ]
+        if not expiries:
+            return now + self._metadata_ttl
+        return min(expiries) - STREAM_URL_SAFETY_SECONDS
+
+    def _put(self, key: Tuple[str, bool], expires_at: float, info: Dict[str, Any]) -> None:
+        self._entries[key] = (expires_at, info)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def _store(self, key: Tuple[str, bool], info: Dict[str, Any]) -> None:
+        expires_at = self._expires_at(info)
+        if expires_at <= self._clock():
+            return
+        self._put(key, expires_at, info)
+        # 검색·재생목록 결과의 각 곡도 영상 URL로 찾을 수 있게 등록해 재생 시 다시 추출하지 않습니다.
+        query, process = key
+        for item in _iter_infos(info):
+            webpage_url = item.get("webpage_url")
+            if item is info and webpage_url == query:
+                continue
+            if webpage_url and item.get("url") and "entries" not in item:
+                self._put((webpage_url, process), self._expires_at(item), item)
+
+    async def extract(
+        self,
+        query: str,
+        process: bool = True,
+        priority: ExtractionPriority = ExtractionPriority.INTERACTIVE,
+    ) -> Optional[Dict[str, Any]]:
+        """Return ``extract_info(query, download=False, process=process)``, cached."""
+        key = (query, process)
+        info = self._lookup(key)
+        if info is not None:
+            self.hits += 1
+            return info
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            self._escalate(key, priority)
+        else:
+            self.misses += 1
+            job = self._extractor(query, process, priority)
+            self._inflight_jobs[key] = (job, priority)
+            # 호출자가 취소되어도 같은 추출을 기다리는 다른 호출자에게 결과가 가도록 별도 작업으로 실행합니다.
+            pending = asyncio.get_running_loop().create_task(self._resolve(key, job))
+            pending.add_done_callback(_consume_exception)
+            self._inflight[key] = pending
+        return await asyncio.shield(pending)
+
+    def _escalate(self, key: Tuple[str, bool], priority: ExtractionPriority) -> None:
+        # 자동 재생·일괄 추가로 대기 중인 추출에 /재생 요청이 합류하면 그 우선순위로 앞당깁니다.
+        job, current = self._inflight_jobs[key]
+        if priority >= current:
+            return
+        self._inflight_jobs[key] = (job, priority)
+        escalate = getattr(job, "escalate", None)
+        if escalate is not None and escalate(priority):
+            self.escalated += 1
+
+    async def _resolve(
+        self,
+        key: Tuple[str, bool],
+        job: Awaitable[Optional[Dict[str, Any]]],
+    ) -> Optional[Dict[str, Any]]:
+        try:
+            info = await job
+            if info:
+                self._store(key, info)
+            return info
+        finally:
+            del self._inflight[key]
+            del self._inflight_jobs[key]
+
+    def invalidate(self, query: str) -> None:
+        for process in (True, False):
+            self._entries.pop((query, process), None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "escalated": self.escalated,
+            "expired": self.expired,
+        }
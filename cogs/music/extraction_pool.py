@@ -0,0 +1,277 @@
+import asyncio
+import itertools
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from enum import IntEnum
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+# 추출 전용 워커 수와 방식입니다. process는 CPU를 많이 쓰는 추출이 봇 프로세스의 GIL을
+# 점유하지 않게 하지만 작업 함수와 결과가 pickle 가능해야 합니다.
+MUSIC_EXTRACT_WORKERS: int = max(1, int(os.getenv("MUSIC_EXTRACT_WORKERS", "2")))
+MUSIC_EXTRACT_MODE: str = os.getenv("MUSIC_EXTRACT_MODE", "thread").strip().lower()
+_LATENCY_SAMPLES: int = 200
+# 종료 시 실행 중인 추출이 끝나기를 기다리는 최대 시간입니다.
+SHUTDOWN_JOIN_SECONDS: float = 5.0
+
+
+class ExtractionPriority(IntEnum):
+    """Lower values are extracted first."""
+
+    INTERACTIVE = 0  # /재생 요청, 지금 재생할 곡, 단일 곡 버튼
+    PREFETCH = 1  # 다음 곡 미리 추출
+    BULK = 2  # 즐겨찾기 일괄 추가, 재생목록 나머지 곡
+    AUTOPLAY = 3  # 자동 재생 후보 검색
+
+
+# 워커(스레드 또는 자식 프로세스)마다 자기 YoutubeDL을 하나씩 가집니다.
+_worker_state = threading.local()
+
+
+def _init_worker(factory: Callable[[], Any]) -> None:
+    _worker_state.ydl = factory()
+
+
+def _run_job(factory: Callable[[], Any], fn: Callable[..., Any], args: Tuple[Any, ...]) -> Any:
+    ydl = getattr(_worker_state, "ydl", None)
+    if ydl is None:
+        _init_worker(factory)
+        ydl = _worker_state.ydl
+    return fn(ydl, *args)
+
+
+class ExtractionJob:
+    """A queued pool job; await it for the result or ``escalate`` it while it waits."""
+
+    __slots__ = ("fn", "args", "priority", "future", "enqueued_at", "claimed", "_pool")
+
+    def __init__(
+        self,
+        pool: "ExtractionPool",
+        fn: Callable[..., Any],
+        args: Tuple[Any, ...],
+        priority: ExtractionPriority,
+    ) -> None:
+        self.fn = fn
+        self.args = args
+        self.priority = priority
+        self.future: Future = Future()
+        self.enqueued_at: float = time.perf_counter()
+        self.claimed: bool = False
+        self._pool = pool
+
+    def escalate(self, priority: ExtractionPriority) -> bool:
+        """Move a job that has not started ahead to ``priority``; return whether it moved."""
+        return self._pool._escalate(self, priority)
+
+    def __await__(self):
+        # 기다리던 호출이 취소되면 Future도 취소되어 아직 대기 중인 작업은 건너뜁니다.
+        return asyncio.wrap_future(self.future).__await__()
+
+
+class _PriorityStats:
+    def __init__(self) -> None:
+        self.submitted: int = 0
+        self.escalated: int = 0
+        self.completed: int = 0
+        self.failed: int = 0
+        self.cancelled: int = 0
+        self.wait_ms: Deque[float] = deque(maxlen=_LATENCY_SAMPLES)
+        self.run_ms: Deque[float] = deque(maxlen=_LATENCY_SAMPLES)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "submitted": self.submitted,
+            "escalated": self.escalated,
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "wait_p50_ms": _percentile(self.wait_ms, 50),
+            "wait_p95_ms": _percentile(self.wait_ms, 95),
+            "run_p50_ms": _percentile(self.run_ms, 50),
+            "run_p95_ms": _percentile(self.run_ms, 95),
+        }
+
+
+def _percentile(samples: Deque[float], percent: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+class ExtractionPool:
+    """Run yt-dlp jobs on dedicated workers, highest priority first.
+
+    ``fn(ydl, *args)`` runs with the worker's own ``YoutubeDL`` from ``factory``.
+    In process mode ``factory``, ``fn``, its arguments and result must be picklable.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        workers: int = MUSIC_EXTRACT_WORKERS,
+        mode: str = MUSIC_EXTRACT_MODE,
+    ) -> None:
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown extraction mode: {mode!r}")
+        self.factory: Callable[[], Any] = factory
+        self.workers: int = workers
+        self.mode: str = mode
+        self._queue: "queue.PriorityQueue[Tuple[int, int, Optional[ExtractionJob]]]" = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._threads: List[threading.Thread] = []
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats: Dict[ExtractionPriority, _PriorityStats] = {
+            priority: _PriorityStats() for priority in ExtractionPriority
+        }
+        self._running: int = 0
+        # 우선순위를 올린 작업의 이전 항목은 큐에 남아 있다가 꺼낼 때 건너뜁니다.
+        self._stale_entries: int = 0
+
+    def _ensure_started(self) -> None:
+        # 봇이 음악 기능을 처음 쓸 때 워커를 띄워 import만으로 스레드·프로세스가 생기지 않게 합니다.
+        with self._start_lock:
+            if self._threads:
+                return
+            if self.mode == "process":
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    initializer=_init_worker,
+                    initargs=(self.factory,),
+                )
+            for index in range(self.workers):
+                thread = threading.Thread(
+                    target=self._worker_loop,
+                    name=f"music-extract-{index}",
+                    daemon=True,
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def _worker_loop(self) -> None:
+        while True:
+            _, _, job = self._queue.get()
+            if job is None:
+                return
+            with self._stats_lock:
+                if job.claimed:
+                    self._stale_entries -= 1
+                    continue
+                job.claimed = True
+            stats = self._stats[job.priority]
+            if not job.future.set_running_or_notify_cancel():
+                with self._stats_lock:
+                    stats.cancelled += 1
+                continue
+
+            started = time.perf_counter()
+            with self._stats_lock:
+                stats.wait_ms.append((started - job.enqueued_at) * 1000)
+                self._running += 1
+            failed = False
+            try:
+                if self._process_pool is not None:
+                    result = self._process_pool.submit(_run_job, self.factory, job.fn, job.args).result()
+                else:
+                    result = _run_job(self.factory, job.fn, job.args)
+            except BaseException as e:
+                failed = True
+                job.future.set_exception(e)
+            else:
+                job.future.set_result(result)
+            finally:
+                with self._stats_lock:
+                    self._running -= 1
+                    stats.run_ms.append((time.perf_counter() - started) * 1000)
+                    if failed:
+                        stats.failed += 1
+                    else:
+                        stats.completed += 1
+
+    def submit(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        priority: ExtractionPriority = ExtractionPriority.INTERACTIVE,
+    ) -> ExtractionJob:
+        """Queue ``fn(ydl, *args)`` and return the awaitable job."""
+        self._ensure_started()
+        job = ExtractionJob(self, fn, args, priority)
+        with self._stats_lock:
+            self._stats[priority].submitted += 1
+        self._queue.put((int(priority), next(self._sequence), job))
+        return job
+
+    async def run(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        priority: ExtractionPriority = ExtractionPriority.INTERACTIVE,
+    ) -> Any:
+        """Queue ``fn(ydl, *args)`` and await its result; cancelling drops a queued job."""
+        return await self.submit(fn, *args, priority=priority)
+
+    def _escalate(self, job: ExtractionJob, priority: ExtractionPriority) -> bool:
+        with self._stats_lock:
+            if job.claimed or priority >= job.priority:
+                return False
+            self._stats[job.priority].escalated += 1
+            job.priority = priority
+            self._stale_entries += 1
+            # PriorityQueue는 순서를 바꿀 수 없으므로 같은 작업을 높은 우선순위로 한 번 더 넣습니다.
+            self._queue.put((int(priority), next(self._sequence), job))
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "mode": self.mode,
+                "workers": self.workers,
+                "queue_depth": self._queue.qsize() - self._stale_entries,
+                "running": self._running,
+                "by_priority": {
+                    priority.name.lower(): stats.to_dict()
+                    for priority, stats in self._stats.items()
+                },
+            }
+
+    def shutdown(self, timeout: float = SHUTDOWN_JOIN_SECONDS) -> None:
+        """Cancel queued jobs and stop the workers, waiting up to ``timeout`` for running ones."""
+        with self._start_lock:
+            threads, self._threads = self._threads, []
+            # 대기 중인 작업(재생목록 나머지, 일괄 추가 등)은 기다리지 않고 취소합니다.
+            while True:
+                try:
+                    _, _, job = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is None:
+                    continue
+                with self._stats_lock:
+                    if job.claimed:
+                        self._stale_entries -= 1
+                        continue
+                    job.claimed = True
+                    self._stats[job.priority].cancelled += 1
+                job.future.cancel()
+            for _ in threads:
+                # 어떤 작업보다 먼저 꺼내지도록 가장 높은 우선순위로 멈춤 신호를 넣습니다.
+                self._queue.put((-1, next(self._sequence), None))
+            deadline = time.monotonic() + timeout
+            for thread in threads:
+                thread.join(max(0.0, deadline - time.monotonic()))
+            if any(thread.is_alive() for thread in threads):
+                logger.warning("Extraction workers still running after shutdown timeout; leaving them as daemons.")
+            if self._process_pool is not None:
+                # 실행 중인 추출을 기다리지 않고, 아직 시작하지 않은 자식 프로세스 작업은 취소합니다.
+                self._process_pool.shutdown(wait=False, cancel_futures=True)
+                self._process_pool = None
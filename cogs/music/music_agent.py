@@ -3,7 +3,7 @@ import logging
 import os
 import random
 from collections import deque
-from typing import Optional, Any, List, Tuple
+from typing import AsyncGenerator, Optional, Any, List, Tuple
 import io
 import hashlib
 import subprocess
@@ -27,9 +27,9 @@ from .music_core import MusicState
 from .music_session_restorer import MusicSessionRestorer
 from .music_state_store import MusicStateStore
 from .music_utils import (
-    Song, LoopMode, ytdl, URL_REGEX, MUSIC_CHANNEL_ID, MASTER_USER_ID,
-    load_favorites, add_favorite, remove_favorites, BOT_EMBED_COLOR,
-    load_music_settings
+    Song, LoopMode, ExtractionPriority, extract_info, iter_playlist_entries, resolve_in_order, URL_REGEX, MUSIC_CHANNEL_ID, MASTER_USER_ID,
+    get_user_favorites, is_favorite, add_favorite, remove_favorites, BOT_EMBED_COLOR,
+    get_guild_music_settings, flush_write_behind, extraction_pool
 )
 from .music_ui import QueueManagementView, FavoritesView, SearchSelect
 
@@ -70,6 +70,12 @@ class MusicAgentCog(commands.Cog):
         ]
         await asyncio.gather(*cleanup_tasks)
 
+        # 버퍼에 남은 재생 횟수를 종료 전에 반영합니다.
+        await flush_write_behind()
+
+        # 추출 워커(프로세스 모드의 자식 프로세스 포함)를 정리합니다. 다시 로드하면 첫 추출 때 새로 띄웁니다.
+        await asyncio.to_thread(extraction_pool.shutdown)
+
     @tasks.loop(seconds=10)
     async def update_progress_loop(self) -> None:
         for state in self.music_states.values():
@@ -177,8 +183,7 @@ class MusicAgentCog(commands.Cog):
             guild = self.bot.get_guild(guild_id)
             if not guild: raise RuntimeError(f"Guild with ID {guild_id} not found.")
             
-            settings = await load_music_settings()
-            guild_settings = settings.get(str(guild_id), {})
+            guild_settings = await get_guild_music_settings(guild_id)
             initial_volume = guild_settings.get("volume", 0.5)
             state = MusicState(self.bot, self, guild, initial_volume=initial_volume)
             
@@ -245,29 +250,27 @@ class MusicAgentCog(commands.Cog):
             is_playlist_url = 'list=' in query and is_url
             search_query = query if is_url else f"ytsearch3:{query}"
 
-            data = await self.bot.loop.run_in_executor(None, lambda: ytdl.extract_info(search_query, download=False))
+            # 재생목록은 곡별 추출 없이 평면 목록만 읽으므로 전체 추출을 건너뜁니다.
+            data = None if is_playlist_url else await extract_info(search_query)
 
-            if is_playlist_url and 'entries' in data:
+            if is_playlist_url:
                 state.cancel_autoplay_task()
-                entries = data.get('entries', [])
-                if not entries:
+                playlist_chunks = iter_playlist_entries(query)
+                first_chunk = await anext(playlist_chunks, None)
+                if not first_chunk:
                     await send_message_func("재생목록을 처리할 수 없거나 비어있습니다.", ephemeral=True, delete_after=5)
                     return
 
-                added_count = 0
-                total_songs = len(entries)
-                for i, song_data in enumerate(entries):
-                    if song_data:
-                        song = Song(song_data, requester)
-                        state.queue.append(song)
-                        added_count += 1
-                        
-                        if (i + 1) % 5 == 0 or (i + 1) == total_songs:
-                            await state.set_task(f"🎶 재생목록 추가 중... ({added_count}/{total_songs})")
-                
-                logger.info(f"[{guild.name}] 재생목록 추가: {added_count}곡")
-                command_logger.info(f"사용자 '{user.display_name}'가 '{channel.name}' 채널에서 재생목록을 추가했습니다. (곡 수: {added_count}, URL: {query})")
-                await send_message_func(f"✅ 재생목록에서 **{added_count}**개의 노래를 대기열에 추가했습니다.", ephemeral=True, delete_after=5)
+                for song_data in first_chunk:
+                    state.queue.append(Song(song_data, requester))
+                # 첫 묶음부터 재생을 시작하고 나머지는 읽히는 대로 대기열에 이어 붙입니다.
+                state.playlist_task = self.bot.loop.create_task(
+                    self._queue_remaining_playlist(
+                        state, playlist_chunks, requester, len(first_chunk), user, channel, query, state.playlist_task
+                    )
+                )
+                logger.info(f"[{guild.name}] 재생목록 추가 시작: {len(first_chunk)}곡")
+                await send_message_func(f"✅ 재생목록에서 **{len(first_chunk)}**개의 노래를 대기열에 추가했습니다. 나머지 곡은 재생하면서 이어서 추가합니다.", ephemeral=True, delete_after=5)
 
             elif 'entries' in data:
                 entries = [e for e in data.get('entries', []) if e]
@@ -303,6 +306,41 @@ class MusicAgentCog(commands.Cog):
         finally:
             await state.clear_task()
 
+    async def _queue_remaining_playlist(
+        self,
+        state: MusicState,
+        playlist_chunks: AsyncGenerator[List[dict], None],
+        requester: discord.Member,
+        added_count: int,
+        user: discord.Member,
+        channel: Any,
+        query: str,
+        previous_task: Optional[asyncio.Task],
+    ) -> None:
+        """Append the rest of a streamed playlist to the queue as each chunk is read."""
+        try:
+            # 앞서 요청한 재생목록이 아직 추가 중이면 순서가 섞이지 않도록 끝날 때까지 기다립니다.
+            if previous_task is not None and not previous_task.done():
+                await asyncio.wait({previous_task})
+            async for chunk in playlist_chunks:
+                for song_data in chunk:
+                    state.queue.append(Song(song_data, requester))
+                added_count += len(chunk)
+                await state.set_task(f"🎶 재생목록 추가 중... ({added_count}곡)")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"[{state.guild.name}] 재생목록 나머지 곡을 읽는 중 오류: {e}")
+        finally:
+            await playlist_chunks.aclose()
+            # 취소된 경우(대기열 비우기, 퇴장)에도 진행 표시가 남지 않게 합니다.
+            if state.playlist_task in (None, asyncio.current_task()):
+                state.playlist_task = None
+                state.current_task = None
+        await state.schedule_ui_update()
+        logger.info(f"[{state.guild.name}] 재생목록 추가: {added_count}곡")
+        command_logger.info(f"사용자 '{user.display_name}'가 '{channel.name}' 채널에서 재생목록을 추가했습니다. (곡 수: {added_count}, URL: {query})")
+
     async def handle_play(self, interaction: discord.Interaction, query: str) -> None:
         await interaction.response.defer(ephemeral=True)
         
@@ -428,30 +466,26 @@ class MusicAgentCog(commands.Cog):
         state = await self.get_music_state(interaction.guild.id) # type: ignore
         if not state.current_song: return await interaction.response.send_message("재생 중인 노래가 없습니다.", ephemeral=True) # type: ignore
         song = state.current_song
-        user_id = str(interaction.user.id)
-        favorites = await load_favorites()
-        user_favorites = favorites.get(user_id, [])
-        if any(fav['url'] == song.webpage_url for fav in user_favorites): return await interaction.response.send_message("이미 즐겨찾기에 추가된 노래입니다.", ephemeral=True) # type: ignore
+        if await is_favorite(interaction.user.id, song.webpage_url): return await interaction.response.send_message("이미 즐겨찾기에 추가된 노래입니다.", ephemeral=True) # type: ignore
         await add_favorite(interaction.user.id, song.webpage_url, song.title)
         await interaction.response.send_message(f"⭐ '{song.title}'을(를) 즐겨찾기에 추가했습니다!", ephemeral=True)
         command_logger.info(f"사용자 '{interaction.user.display_name}'가 '{song.title}'을(를) 즐겨찾기에 추가했습니다.") # type: ignore
 
     async def handle_view_favorites(self, interaction: discord.Interaction) -> None:
-        user_id = str(interaction.user.id)
-        favorites = await load_favorites()
-        user_favorites = favorites.get(user_id, [])
+        user_favorites = await get_user_favorites(interaction.user.id)
         if not user_favorites: return await interaction.response.send_message("즐겨찾기 목록이 비어있습니다.", ephemeral=True) # type: ignore
         view = FavoritesView(self, interaction, user_favorites)
         embed = view.create_favorites_embed()
         await interaction.response.send_message(embed=embed, view=view, ephemeral=True)
 
-    async def handle_add_multiple_from_favorites(self, interaction: discord.Interaction, urls: List[str]) -> Tuple[int, bool]:
+    async def handle_add_multiple_from_favorites(self, interaction: discord.Interaction, urls: List[str]) -> Tuple[int, bool, List[str]]:
+        """Queue ``urls`` in order, resolving several at once; returns (added, joined_vc, failed_urls)."""
         state = await self.get_music_state(interaction.guild.id) # type: ignore
         state.cancel_autoplay_task()
         joined_vc = False
         
         if not await self._ensure_voice_connection(interaction.user, state, None): # type: ignore
-            return 0, False
+            return 0, False, []
                 
         if interaction.user.voice and interaction.user.voice.channel: # type: ignore
             if not state.voice_client or not state.voice_client.is_connected():
@@ -462,29 +496,37 @@ class MusicAgentCog(commands.Cog):
                 joined_vc = True
         
         count = 0
+        failed_urls: List[str] = []
         total_urls = len(urls)
         await state.set_task(f"❤️ 즐겨찾기에서 `{total_urls}`곡을 추가하는 중...")
         try:
-            for i, url in enumerate(urls):
-                try:
-                    if (i + 1) % 5 == 0 or (i + 1) == total_urls:
-                        await state.set_task(f"❤️ 즐겨찾기 추가 중... ({i + 1}/{total_urls})")
-
-                    # [삭제됨] 시간 측정 로직 제거
-                    data = await self.bot.loop.run_in_executor(None, lambda target_url=url: ytdl.extract_info(target_url, download=False))
-                    # [삭제됨] update_request_timing 호출 제거
+            # 여러 곡을 동시에 추출하되, 대기열에는 선택한 순서대로 넣습니다.
+            i = 0
+            # 한 곡만 누른 경우(인기곡 버튼)는 사용자가 기다리므로 일괄 추가보다 먼저 추출합니다.
+            priority = ExtractionPriority.BULK if total_urls > 1 else ExtractionPriority.INTERACTIVE
+            async for url, data, error in resolve_in_order(urls, priority=priority):
+                i += 1
+                if error is not None:
+                    failed_urls.append(url)
+                    logger.warning(f"즐겨찾기 노래 추가 실패 ({url}): {error}")
+                else:
                     state.queue.append(Song(data, interaction.user))
                     count += 1
-                except Exception as e: logger.warning(f"즐겨찾기 노래 추가 실패 ({url}): {e}")
+                    # 첫 곡이 준비되면 나머지를 기다리지 않고 재생을 시작합니다.
+                    if count == 1 and state.voice_client and not (state.voice_client.is_playing() or state.voice_client.is_paused()):
+                        state.play_next_song.set()
+
+                if i % 5 == 0 or i == total_urls:
+                    await state.set_task(f"❤️ 즐겨찾기 추가 중... ({i}/{total_urls})")
         finally:
             await state.clear_task()
 
         if count > 0 and state.voice_client and not (state.voice_client.is_playing() or state.voice_client.is_paused()):
             state.play_next_song.set()
         
-        command_logger.info(f"사용자 '{interaction.user.display_name}'가 즐겨찾기에서 {count}곡을 대기열에 추가했습니다.") # type: ignore
+        command_logger.info(f"사용자 '{interaction.user.display_name}'가 즐겨찾기에서 {count}곡을 대기열에 추가했습니다. (실패 {len(failed_urls)}곡)") # type: ignore
         
-        return count, joined_vc
+        return count, joined_vc, failed_urls
 
     async def handle_delete_from_favorites(self, user_id: str, urls_to_delete: List[str]) -> int:
         deleted_count = await remove_favorites(int(user_id), urls_to_delete)
@@ -500,6 +542,7 @@ class MusicAgentCog(commands.Cog):
         queue_list = list(state.queue)
         random.shuffle(queue_list)
         state.queue = deque(queue_list)
+        state.invalidate_prefetch()
         await state.schedule_ui_update()
         await interaction.response.send_message("🔀 대기열을 섞었습니다!", ephemeral=True, delete_after=5)
         command_logger.info(f"사용자 '{interaction.user.display_name}'가 대기열을 섞었습니다.") # type: ignore
@@ -508,7 +551,9 @@ class MusicAgentCog(commands.Cog):
         state = await self.get_music_state(interaction.guild.id) # type: ignore
         state.cancel_autoplay_task()
         count = len(state.queue)
+        state.cancel_playlist_task()
         state.queue.clear()
+        state.invalidate_prefetch()
         await state.schedule_ui_update()
         await original_interaction.edit_original_response(content=f"🗑️ 대기열의 노래 {count}개를 모두 삭제했습니다.", view=None)
         command_logger.info(f"사용자 '{interaction.user.display_name}'가 대기열을 비웠습니다. ({count}곡 삭제)") # type: ignore
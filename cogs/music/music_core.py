@@ -19,7 +19,7 @@ except ImportError:
     logging.getLogger(__name__).warning("rapidfuzz 라이브러리를 찾을 수 없습니다.")
 
 from .music_utils import (
-    Song, LoopMode, ytdl, increment_play_count
+    Song, LoopMode, ExtractionPriority, extract_info, extraction_cache, buffer_play_count
 )
 from .music_ui import MusicPlayerView
 
@@ -44,6 +44,14 @@ class MusicState:
         self.total_paused_duration: timedelta = timedelta(seconds=0)
         self.autoplay_history: deque = deque(maxlen=20)
         self.autoplay_task: Optional[asyncio.Task] = None
+        # 현재 곡이 재생되는 동안 다음 곡(queue[0])의 스트림 URL을 미리 추출합니다.
+        self.prefetch_task: Optional[asyncio.Task] = None
+        self.prefetch_song: Optional[Song] = None
+        # 재생목록의 나머지 곡을 대기열에 이어 붙이는 작업입니다.
+        self.playlist_task: Optional[asyncio.Task] = None
+        # 곡이 끝난 시점부터 다음 곡 재생 시작까지의 간격(초)입니다.
+        self.track_gaps: deque = deque(maxlen=50)
+        self.track_ended_at: Optional[float] = None
         self.seek_time: int = 0
         self.consecutive_play_failures: int = 0
         self.is_tts_interrupting: bool = False
@@ -108,7 +116,7 @@ class MusicState:
             logger.info(f"[{self.guild.name}] [Autoplay] 전략: {strategy} / 검색어: '{search_query}'")
             
             try:
-                data = await self.bot.loop.run_in_executor(None, lambda: ytdl.extract_info(search_query, download=False, process=True))
+                data = await extract_info(search_query, priority=ExtractionPriority.AUTOPLAY)
             except Exception as e:
                 logger.warning(f"[{self.guild.name}] [Autoplay] 검색 중 영상을 불러올 수 없습니다 (삭제/비공개 됨): {e}")
                 return
@@ -176,6 +184,57 @@ class MusicState:
         if self.autoplay_task is task:
             self.autoplay_task = None
 
+    def cancel_playlist_task(self) -> None:
+        """Stop appending the rest of a streamed playlist, if one is still loading."""
+        task = self.playlist_task
+        self.playlist_task = None
+        if task is not None and not task.done():
+            task.cancel()
+
+    def refresh_prefetch(self) -> None:
+        """Resolve the song at the head of the queue while the current one plays."""
+        next_song = self.queue[0] if self.queue and self.loop_mode != LoopMode.SONG else None
+        if next_song is self.prefetch_song and self.prefetch_task is not None:
+            return
+        self.invalidate_prefetch()
+        if next_song is None or not next_song.webpage_url:
+            return
+        if not (self.voice_client and (self.voice_client.is_playing() or self.voice_client.is_paused())):
+            return
+        self.prefetch_song = next_song
+        self.prefetch_task = self.bot.loop.create_task(self._prefetch_next_song(next_song))
+
+    def invalidate_prefetch(self) -> None:
+        """Drop the lookahead after the queue head was reordered, shuffled or cleared."""
+        task = self.prefetch_task
+        self.prefetch_task = None
+        self.prefetch_song = None
+        if task is not None and not task.done():
+            task.cancel()
+
+    async def _prefetch_next_song(self, song: Song) -> None:
+        try:
+            # 결과는 추출 캐시에 남고, 재생 시점에 아직 진행 중이면 같은 추출을 기다립니다.
+            await extract_info(song.webpage_url, priority=ExtractionPriority.PREFETCH)
+            logger.debug(f"[{self.guild.name}] 다음 곡 미리 추출 완료: '{song.title}'")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"[{self.guild.name}] 다음 곡 미리 추출 실패 ('{song.title}'): {e}")
+
+    def get_track_gap_stats(self) -> dict:
+        """Return the silence between recent tracks in milliseconds."""
+        gaps = sorted(self.track_gaps)
+        if not gaps:
+            return {"count": 0, "avg_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0, "last_ms": 0.0}
+        return {
+            "count": len(gaps),
+            "avg_ms": sum(gaps) / len(gaps) * 1000,
+            "p95_ms": gaps[min(len(gaps) - 1, int(len(gaps) * 0.95))] * 1000,
+            "max_ms": gaps[-1] * 1000,
+            "last_ms": self.track_gaps[-1] * 1000,
+        }
+
     async def create_now_playing_embed(self) -> discord.Embed:
         if not self.current_song and self.current_task:
             embed = discord.Embed(title="⚙️ [시스템 처리 중...]", description=f"```\n{self.current_task}\n```", color=0x36393F)
@@ -260,6 +319,8 @@ class MusicState:
                 self.main_task,
                 self.autoplay_task,
                 self.ui_update_task,
+                self.prefetch_task,
+                self.playlist_task,
             )
             if task is not None and not task.done()
         ]
@@ -271,6 +332,9 @@ class MusicState:
         self.main_task = None
         self.autoplay_task = None
         self.ui_update_task = None
+        self.prefetch_task = None
+        self.prefetch_song = None
+        self.playlist_task = None
 
     async def cleanup(
         self,
@@ -294,6 +358,8 @@ class MusicState:
             self.ui_update_task.cancel()
 
         self.ui_update_task = self.bot.loop.create_task(self._delayed_ui_update())
+        # 화면 갱신은 대기열 변경 뒤마다 호출되므로 여기서 다음 곡 미리 추출도 맞춰 둡니다.
+        self.refresh_prefetch()
 
     async def _delayed_ui_update(self) -> None:
         try:
@@ -349,17 +415,24 @@ class MusicState:
             self.current_song = next_song
 
             if not self.current_song:
+                # 대기열이 비어 쉬는 시간은 곡 전환 간격에 넣지 않습니다.
+                self.track_ended_at = None
                 if self.auto_play_enabled and previous_song and not self.autoplay_task:
                     self.autoplay_task = self.bot.loop.create_task(self._prefetch_autoplay_song(previous_song))
                 if previous_song is not None: await self.schedule_ui_update()
                 continue
             
-            if self.current_song != previous_song:
+            if self.prefetch_song is self.current_song:
+                # 미리 추출한 곡이 재생되므로 같은 곡을 다시 미리 추출하지 않도록 비웁니다.
+                self.prefetch_task = None
+                self.prefetch_song = None
+
+            song_changed = self.current_song != previous_song
+            if song_changed:
                 await self.schedule_ui_update()
-                await self.cog.cleanup_channel_messages(self)
             
             try:
-                data = await self.bot.loop.run_in_executor(None, lambda: ytdl.extract_info(self.current_song.webpage_url, download=False))
+                data = await extract_info(self.current_song.webpage_url)
                 stream_url = data.get('url')
                 if not stream_url:
                     if self.text_channel: await self.text_channel.send(f"❌ '{self.current_song.title}'을(를) 재생할 수 없습니다.", delete_after=20)
@@ -393,9 +466,11 @@ class MusicState:
                     
                 if self.voice_client:
                     self.voice_client.play(source, after=lambda e: self.handle_after_play(e))
+                    self._record_track_gap()
                 
                 if self.current_song.webpage_url:
-                    self.bot.loop.create_task(increment_play_count(self.guild.id, self.current_song.webpage_url, self.current_song.title))
+                    # 재생 횟수는 쓰기 지연 버퍼에서 합산된 뒤 한 번에 반영됩니다.
+                    buffer_play_count(self.guild.id, self.current_song.webpage_url, self.current_song.title)
                 
                 self.consecutive_play_failures = 0
                 self.playback_start_time = discord.utils.utcnow() - timedelta(seconds=self.seek_time)
@@ -404,10 +479,16 @@ class MusicState:
                 self.seek_time = 0
                 
                 await self.schedule_ui_update()
+                if song_changed:
+                    # 메시지 정리는 재생을 시작한 뒤에 해서 곡 사이 무음에 포함되지 않게 합니다.
+                    await self.cog.cleanup_channel_messages(self)
 
             except Exception as e:
                 self.consecutive_play_failures += 1
                 logger.error(f"'{self.current_song.title}' 재생 중 오류 발생", exc_info=True)
+                if self.current_song.webpage_url:
+                    # 만료되었거나 잘못된 스트림 URL을 다음 시도에서 다시 쓰지 않도록 캐시에서 뺍니다.
+                    extraction_cache.invalidate(self.current_song.webpage_url)
                 if self.consecutive_play_failures >= 3:
                     if self.text_channel: await self.text_channel.send(f"🚨 **재생 오류**: '{self.current_song.title}' 곡을 재생하는 데 반복적으로 실패하여 대기열을 초기화합니다.", delete_after=30)
                     self.queue.clear()
@@ -418,7 +499,18 @@ class MusicState:
             if self.loop_mode == LoopMode.QUEUE and self.current_song:
                 self.queue.append(self.current_song)
 
+    def _record_track_gap(self) -> None:
+        ended_at = self.track_ended_at
+        self.track_ended_at = None
+        if ended_at is None:
+            return
+        gap = time.perf_counter() - ended_at
+        self.track_gaps.append(gap)
+        logger.info(f"[{self.guild.name}] 곡 전환 간격: {gap * 1000:.0f}ms")
+
     def handle_after_play(self, error: Optional[Exception]) -> None:
         if self.is_tts_interrupting: return
+        if self.track_ended_at is None:
+            self.track_ended_at = time.perf_counter()
         if error: logger.error(f"재생 후 콜백 오류: {error}")
         self.bot.loop.call_soon_threadsafe(self.play_next_song.set)
@@ -114,12 +114,14 @@ class QueueManagementView(ui.View):
             song_to_move = list(self.state.queue)[self.selected_index]
             self.state.queue.remove(song_to_move)
             self.state.queue.insert(0, song_to_move)
+            self.state.refresh_prefetch()
             await self.update_view(interaction, f"✅ '{song_to_move.title}'을(를) 대기열 맨 위로 옮겼습니다.")
 
     async def remove_song(self, interaction: discord.Interaction) -> None:
         if self.selected_index is not None and self.selected_index < len(list(self.state.queue)):
             song_to_remove = list(self.state.queue)[self.selected_index]
             self.state.queue.remove(song_to_remove)
+            self.state.refresh_prefetch()
             await self.update_view(interaction, f"🗑️ '{song_to_remove.title}'을(를) 대기열에서 삭제했습니다.")
     
     async def shuffle(self, interaction: discord.Interaction) -> None:
@@ -238,9 +240,14 @@ class FavoritesView(ui.View):
             return
 
         await interaction.response.defer(thinking=True, ephemeral=True)
-        count, joined = await self.cog.handle_add_multiple_from_favorites(interaction, self.selected_urls)
+        count, joined, failed_urls = await self.cog.handle_add_multiple_from_favorites(interaction, self.selected_urls)
         
         message = f"✅ 즐겨찾기에서 {count}개의 노래를 대기열에 추가했습니다."
+        if failed_urls:
+            titles = {fav['url']: fav['title'] for fav in self.favorites}
+            failed_titles = ", ".join(f"'{titles.get(url, url)[:30]}'" for url in failed_urls[:5])
+            more = f" 외 {len(failed_urls) - 5}곡" if len(failed_urls) > 5 else ""
+            message += f"\n⚠️ 불러오지 못한 곡 {len(failed_urls)}개: {failed_titles}{more}"
         state = await self.cog.get_music_state(interaction.guild.id)
         if state.voice_client and not state.voice_client.is_connected() and count > 0:
              message += "\n음성 채널에 참여하시면 재생이 시작됩니다."
@@ -292,8 +299,8 @@ class TopSongButton(ui.Button):
 
     async def callback(self, interaction: discord.Interaction) -> None:
         await interaction.response.defer(thinking=True, ephemeral=True)
-        count, joined = await self.cog.handle_add_multiple_from_favorites(interaction, [self.song_url])
-        message = f"🔥 많이 듣는 곡을 대기열에 추가했습니다."
+        count, joined, failed_urls = await self.cog.handle_add_multiple_from_favorites(interaction, [self.song_url])
+        message = f"🔥 많이 듣는 곡을 대기열에 추가했습니다." if not failed_urls else "⚠️ 삭제되었거나 재생할 수 없는 곡이라 추가하지 못했습니다."
         state = await self.cog.get_music_state(interaction.guild.id)
         if state.voice_client and not state.voice_client.is_connected() and count > 0:
              message += "\n음성 채널에 참여하시면 재생이 시작됩니다."
@@ -393,8 +400,8 @@ class MusicPlayerView(ui.View):
                 def make_callback(target_url):
                     async def top_song_callback(interaction: discord.Interaction) -> None:
                         await interaction.response.defer(thinking=True, ephemeral=True)
-                        c, joined = await self.cog.handle_add_multiple_from_favorites(interaction, [target_url])
-                        msg = "🔥 많이 듣는 곡을 대기열에 추가했습니다."
+                        c, joined, failed = await self.cog.handle_add_multiple_from_favorites(interaction, [target_url])
+                        msg = "🔥 많이 듣는 곡을 대기열에 추가했습니다." if not failed else "⚠️ 삭제되었거나 재생할 수 없는 곡이라 추가하지 못했습니다."
                         st = await self.cog.get_music_state(interaction.guild.id)
                         if st.voice_client and not st.voice_client.is_connected() and c > 0:
                             msg += "\n음성 채널에 참여하시면 재생이 시작됩니다."
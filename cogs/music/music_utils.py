@@ -1,22 +1,30 @@
+import asyncio
 import os
 import re
 from enum import Enum
-from typing import Any, Dict, Optional, Tuple
+from functools import partial
+from itertools import islice
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
 
 import discord
 import yt_dlp
 
+from .extraction_cache import ExtractionCache
+from .extraction_pool import ExtractionPool, ExtractionPriority
 from .music_state_store import (
     DEFAULT_MUSIC_STATE_FILE,
     MusicStateStore,
 )
 from database_manager import (
-    get_favorites as load_favorites,
+    get_user_favorites,
+    is_favorite,
     add_favorite,
     remove_favorites,
-    get_music_settings as load_music_settings,
+    get_guild_music_settings,
     update_music_volume,
     increment_play_count_db as increment_play_count,
+    buffer_play_count,
+    flush_write_behind,
     get_top_played_songs_db as get_top_played_songs
 )
 
@@ -30,6 +38,10 @@ URL_REGEX: re.Pattern = re.compile(r'https?://(?:www\.)?(?:music\.youtube\.com|y
 YTDL_OPTIONS: Dict[str, Any] = {
     'format': 'bestaudio[ext=opus]/bestaudio/best',
     'noplaylist': False,
+    # 전체 추출(process=True)로 재생목록이 풀릴 때만 적용되는 안전 상한입니다. 'list='가 없는
+    # 채널·앨범 주소나 즐겨찾기에 저장된 재생목록 주소가 곡마다 포맷을 추출하지 않도록 막습니다.
+    # 재생목록 주소는 iter_playlist_entries가 process=False로 읽어 이 값을 거치지 않고
+    # PLAYLIST_MAX_ENTRIES까지 직접 잘라 읽습니다.
     'playlistend': 50,
     'quiet': True,
     'no_warnings': True,
@@ -45,7 +57,130 @@ FFMPEG_OPTIONS: Dict[str, str] = {
     'before_options': '-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5 -nostdin',
     'options': '-vn'
 }
-ytdl: yt_dlp.YoutubeDL = yt_dlp.YoutubeDL(YTDL_OPTIONS)
+# 추출은 기본 스레드 풀(DB 호출과 공유)이 아닌 전용 워커에서 실행하고, 워커마다 YoutubeDL을 따로 둡니다.
+extraction_pool: ExtractionPool = ExtractionPool(partial(yt_dlp.YoutubeDL, YTDL_OPTIONS))
+
+
+def _extract_job(ydl: yt_dlp.YoutubeDL, query: str, process: bool) -> Optional[Dict[str, Any]]:
+    return ydl.extract_info(query, download=False, process=process)
+
+
+# 같은 URL·검색어를 반복해서 추출하지 않도록 결과를 캐시하고 동시 요청은 한 번만 추출합니다.
+extraction_cache: ExtractionCache = ExtractionCache(
+    lambda query, process, priority: extraction_pool.submit(_extract_job, query, process, priority=priority)
+)
+
+
+async def extract_info(
+    query: str,
+    process: bool = True,
+    priority: ExtractionPriority = ExtractionPriority.INTERACTIVE,
+) -> Optional[Dict[str, Any]]:
+    """Return yt-dlp info for ``query`` through the shared extraction cache."""
+    return await extraction_cache.extract(query, process, priority)
+
+# 즐겨찾기·인기곡 여러 개를 추가할 때 동시에 추출할 최대 곡 수입니다.
+MUSIC_RESOLVE_CONCURRENCY: int = max(1, int(os.getenv("MUSIC_RESOLVE_CONCURRENCY", "4")))
+
+
+async def resolve_in_order(
+    queries: Sequence[str],
+    limit: int = MUSIC_RESOLVE_CONCURRENCY,
+    priority: ExtractionPriority = ExtractionPriority.BULK,
+) -> AsyncIterator[Tuple[str, Optional[Dict[str, Any]], Optional[Exception]]]:
+    """Extract up to ``limit`` queries at once and yield ``(query, info, error)`` in input order."""
+    semaphore = asyncio.Semaphore(limit)
+
+    async def resolve(query: str) -> Optional[Dict[str, Any]]:
+        async with semaphore:
+            return await extract_info(query, priority=priority)
+
+    tasks = [asyncio.ensure_future(resolve(query)) for query in queries]
+    try:
+        for query, task in zip(queries, tasks):
+            info: Optional[Dict[str, Any]] = None
+            error: Optional[Exception] = None
+            try:
+                info = await task
+            except Exception as e:
+                error = e
+            if info is None and error is None:
+                error = ValueError("영상 정보를 가져오지 못했습니다.")
+            yield query, info, error
+    finally:
+        # 호출자가 중간에 멈추면 남은 추출을 취소하고 결과를 회수합니다.
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+# 재생목록은 곡 정보(id·제목·길이)만 평면으로 읽고, 스트림 URL은 재생 직전(또는 미리 추출)에 얻습니다.
+PLAYLIST_CHUNK_SIZE: int = 50
+PLAYLIST_MAX_ENTRIES: int = int(os.getenv("MUSIC_PLAYLIST_MAX_ENTRIES", "1000"))
+_UNAVAILABLE_PLAYLIST_TITLES = {"[Private video]", "[Deleted video]"}
+
+
+def flat_entry_to_song_data(entry: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Map a flat playlist entry to the fields ``Song`` reads, without a stream URL."""
+    webpage_url = entry.get("webpage_url") or entry.get("url")
+    if not webpage_url or entry.get("title") in _UNAVAILABLE_PLAYLIST_TITLES:
+        return None
+    if not URL_REGEX.match(webpage_url) and entry.get("id"):
+        webpage_url = f"https://www.youtube.com/watch?v={entry['id']}"
+    thumbnails = entry.get("thumbnails") or []
+    return {
+        "webpage_url": webpage_url,
+        "url": None,
+        "title": entry.get("title") or "알 수 없는 제목",
+        "duration": int(entry.get("duration") or 0),
+        "thumbnail": entry.get("thumbnail") or (thumbnails[-1].get("url") if thumbnails else None),
+        "uploader": entry.get("uploader") or entry.get("channel") or "알 수 없는 아티스트",
+    }
+
+
+def _open_flat_playlist(ydl: yt_dlp.YoutubeDL, url: str) -> Iterator[Dict[str, Any]]:
+    # process=False면 yt-dlp가 곡별 포맷을 고르지 않고, 유튜브 재생목록 항목은 페이지 단위로 늦게 읽힙니다.
+    info = ydl.extract_info(url, download=False, process=False)
+    # watch?v=...&list=... 주소는 재생목록 주소로 한 번 더 넘겨줍니다.
+    for _ in range(3):
+        if not info or info.get("_type") not in ("url", "url_transparent"):
+            break
+        info = ydl.extract_info(info["url"], download=False, process=False)
+    if not info:
+        return iter(())
+    if "entries" not in info:
+        return iter((info,))
+    return iter(info["entries"] or ())
+
+
+def _flat_playlist_slice(
+    ydl: yt_dlp.YoutubeDL,
+    url: str,
+    start: int,
+    stop: int,
+) -> Tuple[List[Dict[str, Any]], bool]:
+    """Read entries ``[start, stop)`` of a playlist; returns (song data, reached the end)."""
+    # 워커마다 YoutubeDL이 다르므로 목록 반복자를 작업 사이에 넘기지 않고 구간마다 새로 엽니다.
+    entries = list(islice(_open_flat_playlist(ydl, url), start, stop))
+    songs = [data for entry in entries if entry and (data := flat_entry_to_song_data(entry))]
+    return songs, len(entries) < stop - start
+
+
+async def iter_playlist_entries(url: str) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Yield a playlist's songs, the first ``PLAYLIST_CHUNK_SIZE`` first, as they are read."""
+    start, size = 0, PLAYLIST_CHUNK_SIZE
+    priority = ExtractionPriority.INTERACTIVE
+    while start < PLAYLIST_MAX_ENTRIES:
+        stop = min(start + size, PLAYLIST_MAX_ENTRIES)
+        songs, exhausted = await extraction_pool.run(_flat_playlist_slice, url, start, stop, priority=priority)
+        if songs:
+            yield songs
+        if exhausted:
+            return
+        # 앞 페이지를 다시 읽는 비용이 커지지 않도록 다음 구간은 두 배씩 늘립니다.
+        start, size = stop, size * 2
+        priority = ExtractionPriority.BULK
+
 
 # --- 열거형 및 데이터 클래스 ---
 class LoopMode(Enum):
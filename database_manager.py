@@ -1,13 +1,42 @@
 import asyncio
 import base64
+import codecs
+import hashlib
+import itertools
+import json
 import logging
+import math
 import os
+import queue
+import re
 import sqlite3
+import struct
 import subprocess
 import sys
 import tempfile
+import threading
+import time
+import zlib
+from bisect import bisect_left
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar, copy_context
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
 
 from cryptography.fernet import Fernet
 from cryptography.fernet import InvalidToken
@@ -25,6 +54,8 @@ def _configure_connection(conn: sqlite3.Connection) -> sqlite3.Connection:
 
 logger: logging.Logger = logging.getLogger("DatabaseManager")
 
+T = TypeVar("T")
+
 # 현재 스크립트 위치 기준으로 절대 경로 설정
 BASE_DIR: Path = Path(__file__).parent
 DATA_DIR: Path = BASE_DIR / "data"
@@ -32,24 +63,539 @@ DATA_DIR: Path = BASE_DIR / "data"
 DB_PATH: Path = DATA_DIR / "bot_database.db"
 SQL_BACKUP_PATH: Path = DATA_DIR / "database_backup.sql"
 BACKUP_ENVELOPE_HEADER: bytes = b"DISCORDBOT_BACKUP_V2\n"
-
-
-def _connect_database(path: Optional[Path] = None) -> sqlite3.Connection:
+# V3: SQLite 백업 API로 복사한 DB 파일 이미지를 청크 단위로 암호화한 봉투
+BACKUP_SNAPSHOT_HEADER: bytes = b"DISCORDBOT_BACKUP_V3\n"
+# V4: SQL 덤프를 zlib으로 압축한 뒤 V3와 같은 청크 형식으로 암호화한 봉투
+BACKUP_COMPRESSED_SQL_HEADER: bytes = b"DISCORDBOT_BACKUP_V4\n"
+DB_BACKUP_COMPRESS_LEVEL: int = 6
+# "incremental"은 V3 기준 스냅샷 + 암호화 변경분, "snapshot"은 매번 V3 전체,
+# "sql"은 압축 SQL 덤프(V4)
+DB_BACKUP_MODE: str = os.getenv("DB_BACKUP_MODE", "incremental").strip().lower()
+DB_BACKUP_CHUNK_BYTES: int = max(
+    64 * 1024,
+    int(os.getenv("DB_BACKUP_CHUNK_BYTES", str(1024 * 1024))),
+)
+DB_BACKUP_PAGES_PER_STEP: int = max(1, int(os.getenv("DB_BACKUP_PAGES_PER_STEP", "256")))
+# SQL 덤프 복구: executemany 한 번에 넣을 행 수와 진행 상황 로그 간격(초)
+DB_RESTORE_BATCH_ROWS: int = max(1, int(os.getenv("DB_RESTORE_BATCH_ROWS", "5000")))
+DB_RESTORE_PROGRESS_SECONDS: float = 5.0
+# 증분 백업: 기준 스냅샷 뒤에 쌓는 암호화 변경분과 새 기준으로 다시 시작하는 조건
+# V1은 압축 없는 변경 SQL, V2는 zlib 압축 후 암호화한 변경 SQL
+BACKUP_LEGACY_DELTA_HEADER: bytes = b"DISCORDBOT_DELTA_V1\n"
+BACKUP_DELTA_HEADER: bytes = b"DISCORDBOT_DELTA_V2\n"
+DB_BACKUP_REBASE_EVERY: int = max(1, int(os.getenv("DB_BACKUP_REBASE_EVERY", "28")))
+DB_BACKUP_REBASE_RATIO: float = 0.5
+# 음성 채널 1분당 경험치 (users.total_xp 생성 컬럼과 레벨링 Cog가 함께 사용)
+VC_XP_PER_MIN: int = 5
+# 기간별 랭킹용 일 단위 XP 집계는 KST 날짜 기준으로 나누고 보존 기간이 지나면 삭제
+XP_ROLLUP_TZ: timezone = timezone(timedelta(hours=9))
+XP_ROLLUP_RETENTION_DAYS: int = max(31, int(os.getenv("XP_ROLLUP_RETENTION_DAYS", "100")))
+LEADERBOARD_PERIODS: Tuple[str, ...] = ("daily", "weekly", "monthly")
+
+
+def _connect_database(
+    path: Optional[Path] = None,
+    read_only: bool = False,
+) -> sqlite3.Connection:
     """봇 데이터베이스 연결을 열고 공통 세션 설정을 적용합니다."""
     target_path = DB_PATH if path is None else path
-    conn = sqlite3.connect(
-        target_path,
-        timeout=10.0,
-        check_same_thread=False,
-    )
+    if read_only:
+        conn = sqlite3.connect(
+            f"{Path(target_path).resolve().as_uri()}?mode=ro",
+            uri=True,
+            timeout=10.0,
+            check_same_thread=False,
+        )
+    else:
+        conn = sqlite3.connect(
+            target_path,
+            timeout=10.0,
+            check_same_thread=False,
+        )
     return _configure_connection(conn)
 
 
-# 기존 JSON 경로는 더 이상 사용하지 않아 삭제됨
+# --- 장기 연결 풀 ---
+# 메시지마다 연결을 새로 열고 PRAGMA를 다시 실행하지 않도록, 설정이 끝난 연결을
+# 재사용합니다. WAL 모드에서는 읽기 전용 연결 여러 개가 동시에 조회하고, 쓰기는
+# 하나의 쓰기 연결로만 직렬화합니다. 테스트처럼 DB_PATH가 바뀌면 새 경로로 풀을
+# 다시 만듭니다.
+DB_POOL_SIZE: int = max(1, int(os.getenv("DB_POOL_SIZE", "4")))
+DB_POOL_ACQUIRE_TIMEOUT: float = 30.0
+
+
+class _ConnectionPool:
+    """Reuse configured SQLite connections for one database path."""
+
+    def __init__(self, path: Path, size: int, read_only: bool = False) -> None:
+        self.path: Path = path
+        self.size: int = max(1, size)
+        self.read_only: bool = read_only
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._opened: int = 0
+        self._closed: bool = False
+        self._guard: threading.Lock = threading.Lock()
+
+    def acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._guard:
+            if self._closed:
+                raise RuntimeError("Database connection pool is closed.")
+            can_open = self._opened < self.size
+            if can_open:
+                self._opened += 1
+
+        if can_open:
+            try:
+                conn = _connect_database(self.path, read_only=self.read_only)
+            except Exception:
+                with self._guard:
+                    self._opened -= 1
+                raise
+            conn.row_factory = sqlite3.Row
+            return conn
+
+        try:
+            return self._idle.get(timeout=DB_POOL_ACQUIRE_TIMEOUT)
+        except queue.Empty as e:
+            raise TimeoutError(
+                f"No pooled DB connection became available within "
+                f"{DB_POOL_ACQUIRE_TIMEOUT:.0f}s."
+            ) from e
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        if conn.in_transaction:
+            conn.rollback()
+        with self._guard:
+            if not self._closed:
+                self._idle.put(conn)
+                return
+            self._opened -= 1
+        conn.close()
+
+    def close(self) -> None:
+        with self._guard:
+            self._closed = True
+            while True:
+                try:
+                    conn = self._idle.get_nowait()
+                except queue.Empty:
+                    break
+                self._opened -= 1
+                conn.close()
+
+
+# read_only 여부별 풀 (True: 읽기 전용 연결들, False: 단일 쓰기 연결)
+_pools: Dict[bool, _ConnectionPool] = {}
+_pool_guard: threading.Lock = threading.Lock()
+
+
+def _get_pool(read_only: bool = False) -> _ConnectionPool:
+    with _pool_guard:
+        pool = _pools.get(read_only)
+        if pool is None or pool.path != DB_PATH:
+            if pool is not None:
+                pool.close()
+            pool = _ConnectionPool(
+                DB_PATH,
+                DB_POOL_SIZE if read_only else 1,
+                read_only=read_only,
+            )
+            _pools[read_only] = pool
+        return pool
+
+
+@contextmanager
+def _pooled_connection(read_only: bool = False) -> Iterator[sqlite3.Connection]:
+    """Borrow one pooled connection and commit or roll back its transaction."""
+    pool = _get_pool(read_only)
+    conn = pool.acquire()
+    try:
+        with conn:
+            yield conn
+    finally:
+        pool.release(conn)
+
+
+def open_connection_pool() -> None:
+    """Open the shared pools after init_db so the first event pays no connect cost."""
+    for read_only in (False, True):
+        pool = _get_pool(read_only)
+        pool.release(pool.acquire())
+    logger.info(
+        f"Database connection pools ready (readers={DB_POOL_SIZE}, writer=1)."
+    )
+
+
+def close_connection_pool() -> None:
+    """Close every idle pooled connection; busy ones close when released."""
+    with _pool_guard:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
+
+
+# --- 읽기/쓰기 동시성 제어 ---
+# 읽기는 읽기 전용 연결 수만큼 동시에 실행하고, 쓰기는 하나씩만 실행합니다.
+# 호출 지점별 대기 시간을 기록해 어떤 작업이 잠금 경합을 겪는지 확인할 수 있습니다.
+DB_LOCK_WAIT_WARN_SECONDS: float = 1.0
+# 읽기 슬롯이나 쓰기 잠금을 이보다 오래 쥔 호출은 실행한 SQL과 함께 느린 쿼리 로그에
+# 남깁니다. 0이면 SQL 추적을 끕니다.
+DB_SLOW_QUERY_MS: float = max(0.0, float(os.getenv("DB_SLOW_QUERY_MS", "200")))
+DB_SLOW_QUERY_MAX_STATEMENTS: int = 20
+SLOW_QUERY_LOGGER_NAME: str = "DatabaseManager.slow_query"
+slow_query_logger: logging.Logger = logging.getLogger(SLOW_QUERY_LOGGER_NAME)
+
+_read_slots: asyncio.Semaphore = asyncio.Semaphore(DB_POOL_SIZE)
+_write_lock: asyncio.Lock = asyncio.Lock()
+
+# 구간 경계가 2배씩 늘어나는 고정 버킷입니다. 기록은 이분 탐색 한 번이고,
+# 백분위는 해당 버킷의 상한(관측 최댓값 이하)으로 근사합니다.
+_LATENCY_BUCKETS_MS: Tuple[float, ...] = tuple(0.05 * 2 ** i for i in range(21))
+_ROW_BUCKETS: Tuple[float, ...] = (0.0,) + tuple(float(2 ** i) for i in range(21))
+# 느린 쿼리 로그에 URL·제목 같은 사용자 데이터가 남지 않도록 문자열 리터럴을 가립니다.
+_SQL_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+
+
+class Histogram:
+    """Fixed-bucket histogram with approximate percentiles."""
+
+    def __init__(self, bounds: Tuple[float, ...]) -> None:
+        self.bounds: Tuple[float, ...] = bounds
+        self.buckets: List[int] = [0] * (len(bounds) + 1)
+        self.count: int = 0
+        self.total: float = 0.0
+        self.max: float = 0.0
+
+    def record(self, value: float) -> None:
+        self.buckets[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, percent: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * percent / 100))
+        seen = 0
+        for index, bucket in enumerate(self.buckets):
+            seen += bucket
+            if seen >= rank:
+                if index < len(self.bounds):
+                    return min(self.bounds[index], self.max)
+                return self.max
+        return self.max
+
+
+class CallSiteStats:
+    """Lock wait, lock hold (execution) and row histograms for one call site."""
+
+    def __init__(self, mode: str) -> None:
+        self.mode: str = mode
+        self.lock_wait_ms: Histogram = Histogram(_LATENCY_BUCKETS_MS)
+        self.exec_ms: Histogram = Histogram(_LATENCY_BUCKETS_MS)
+        self.rows: Histogram = Histogram(_ROW_BUCKETS)
+        self.slow_calls: int = 0
+
+    def lock_wait_dict(self) -> Dict[str, Any]:
+        wait = self.lock_wait_ms
+        return {
+            "mode": self.mode,
+            "calls": wait.count,
+            "avg_wait_ms": wait.total / wait.count if wait.count else 0.0,
+            "max_wait_ms": wait.max,
+            "total_wait_ms": wait.total,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        summary: Dict[str, Any] = {
+            "mode": self.mode,
+            "calls": self.exec_ms.count,
+            "slow_calls": self.slow_calls,
+            "total_exec_ms": self.exec_ms.total,
+        }
+        for name, histogram in (
+            ("lock_wait_ms", self.lock_wait_ms),
+            ("exec_ms", self.exec_ms),
+            ("rows", self.rows),
+        ):
+            summary[name] = {
+                "p50": histogram.percentile(50),
+                "p95": histogram.percentile(95),
+                "p99": histogram.percentile(99),
+                "max": histogram.max,
+            }
+        return summary
+
+
+_call_site_stats: Dict[str, CallSiteStats] = {}
+
+
+def _stats_for(call_site: str, mode: str) -> CallSiteStats:
+    stats = _call_site_stats.get(call_site)
+    if stats is None:
+        stats = _call_site_stats[call_site] = CallSiteStats(mode)
+    return stats
+
+
+def get_lock_wait_stats() -> Dict[str, Dict[str, Any]]:
+    """Return lock wait statistics keyed by database_manager call site."""
+    return {
+        call_site: stats.lock_wait_dict()
+        for call_site, stats in sorted(_call_site_stats.items())
+        if stats.lock_wait_ms.count
+    }
+
+
+def get_db_latency_stats() -> Dict[str, Dict[str, Any]]:
+    """Return p50/p95/p99 lock wait, execution time and rows per call site."""
+    return {
+        call_site: stats.to_dict()
+        for call_site, stats in sorted(_call_site_stats.items())
+    }
+
+
+def reset_lock_wait_stats() -> None:
+    _call_site_stats.clear()
+
+
+class _CallRecord:
+    """What one entry point did while it held its read slot or the write lock."""
+
+    def __init__(self, call_site: str, mode: str) -> None:
+        self.call_site: str = call_site
+        self.mode: str = mode
+        self.rows: Optional[int] = None
+        # (시작 시각, 실행한 SQL) - 느린 쿼리 로그용으로 워커 스레드가 채웁니다.
+        self.statements: List[Tuple[float, str]] = []
+        self.omitted_statements: int = 0
+        self.finished_at: Optional[float] = None
+
+    def trace(self, statement: str) -> None:
+        if len(self.statements) < DB_SLOW_QUERY_MAX_STATEMENTS:
+            self.statements.append((time.perf_counter(), statement))
+        else:
+            self.omitted_statements += 1
+
+
+def _record_call(
+    record: _CallRecord,
+    waited_ms: Optional[float],
+    exec_ms: float,
+) -> None:
+    stats = _stats_for(record.call_site, record.mode)
+    if waited_ms is not None:
+        stats.lock_wait_ms.record(waited_ms)
+    stats.exec_ms.record(exec_ms)
+    if record.rows is not None:
+        stats.rows.record(record.rows)
+    if DB_SLOW_QUERY_MS and exec_ms >= DB_SLOW_QUERY_MS:
+        stats.slow_calls += 1
+        _log_slow_call(record, waited_ms or 0.0, exec_ms)
+
+
+def _log_slow_call(record: _CallRecord, waited_ms: float, exec_ms: float) -> None:
+    lines = [
+        f"{record.call_site} ({record.mode}) held the DB for {exec_ms:.1f} ms "
+        f"after waiting {waited_ms:.1f} ms, rows={record.rows}"
+    ]
+    # 다음 문장이 시작될 때까지를 한 문장의 실행 시간으로 봅니다.
+    ends = [started for started, _ in record.statements[1:]]
+    ends.append(record.finished_at or time.perf_counter())
+    for (started, statement), ended in zip(record.statements, ends):
+        text = _SQL_STRING_LITERAL.sub("?", " ".join(statement.split()))
+        lines.append(f"  {(ended - started) * 1000:8.1f} ms  {text[:300]}")
+    if record.omitted_statements:
+        lines.append(f"  ... {record.omitted_statements} more statement(s)")
+    slow_query_logger.warning("\n".join(lines))
+
+
+@asynccontextmanager
+async def _db_access(call_site: str, mode: str) -> AsyncIterator[_CallRecord]:
+    """Wait for a read slot or the write lock and record how long it was waited for and held."""
+    guard = _read_slots if mode == "read" else _write_lock
+    record = _CallRecord(call_site, mode)
+    wait_started = time.perf_counter()
+    async with guard:
+        acquired = time.perf_counter()
+        waited = acquired - wait_started
+        if waited >= DB_LOCK_WAIT_WARN_SECONDS:
+            logger.warning(
+                f"DB {mode} access for '{call_site}' waited {waited:.2f}s."
+            )
+        try:
+            yield record
+        finally:
+            _record_call(
+                record,
+                waited * 1000,
+                (time.perf_counter() - acquired) * 1000,
+            )
+
+
+def _rows_touched(mode: str, changed: int, result: Any) -> int:
+    # 쓰기는 바뀐 행 수, 읽기는 돌려준 행 수를 셉니다.
+    if mode == "write":
+        return changed
+    if isinstance(result, (list, tuple)):
+        return len(result)
+    return 0 if result is None else 1
+
+
+def _execute_recorded(
+    conn: sqlite3.Connection,
+    func: Callable[..., T],
+    args: Tuple[Any, ...],
+    record: _CallRecord,
+) -> T:
+    """Run ``func`` on ``conn`` and fill ``record`` with rows and traced SQL."""
+    if DB_SLOW_QUERY_MS:
+        conn.set_trace_callback(record.trace)
+    changes_before = conn.total_changes
+    try:
+        result = func(conn, *args)
+        record.rows = _rows_touched(
+            record.mode, conn.total_changes - changes_before, result
+        )
+        return result
+    finally:
+        record.finished_at = time.perf_counter()
+        if DB_SLOW_QUERY_MS:
+            conn.set_trace_callback(None)
+
+
+def _run_with_connection(
+    func: Callable[..., T],
+    read_only: bool,
+    args: Tuple[Any, ...],
+    record: _CallRecord,
+) -> T:
+    with _pooled_connection(read_only) as conn:
+        return _execute_recorded(conn, func, args, record)
+
+
+async def _run_read(call_site: str, func: Callable[..., T], *args: Any) -> T:
+    """Run ``func(conn, *args)`` on a read-only connection in a worker thread."""
+    async with _db_access(call_site, "read") as record:
+        return await asyncio.to_thread(_run_with_connection, func, True, args, record)
+
+
+async def _run_write(call_site: str, func: Callable[..., T], *args: Any) -> T:
+    """Run ``func(conn, *args)`` as one transaction on the single writer connection.
+
+    Inside ``transaction()`` the call joins the open unit of work instead.
+    """
+    unit = _active_unit_of_work()
+    if unit is not None:
+        unit.operations += 1
+        record = _CallRecord(call_site, "write")
+        started = time.perf_counter()
+        try:
+            return await asyncio.to_thread(unit.run_locked, _execute_recorded, unit.conn, func, args, record)
+        finally:
+            # 잠금은 transaction()이 이미 쥐고 있으므로 실행 시간과 행 수만 남깁니다.
+            _record_call(record, None, (time.perf_counter() - started) * 1000)
+    async with _db_access(call_site, "write") as record:
+        return await asyncio.to_thread(_run_with_connection, func, False, args, record)
+
+
+# --- 작업 단위(Unit of work) ---
+# 여러 쓰기를 연달아 하는 호출부는 transaction() 블록 안에서 기존 쓰기 함수를 그대로
+# 호출합니다. 블록 전체가 쓰기 잠금 한 번, 쓰기 연결 하나, 커밋 한 번으로 처리됩니다.
+class UnitOfWork:
+    """Writer connection and pending after-commit hooks for one ``transaction()`` block."""
+
+    def __init__(self, call_site: str, conn: sqlite3.Connection) -> None:
+        self.call_site: str = call_site
+        self.conn: sqlite3.Connection = conn
+        self.operations: int = 0
+        self._after_commit: List[Callable[[], None]] = []
+        # gather 등으로 여러 작업이 같은 연결을 쓰므로 구문과 커밋을 스레드 안에서 직렬화합니다.
+        # 호출자가 취소되어도 실행 중인 구문이 끝날 때까지 잠금이 유지됩니다.
+        self._conn_lock: threading.Lock = threading.Lock()
+        self._open: bool = True
+
+    def run_locked(self, func: Callable[..., T], *args: Any) -> T:
+        with self._conn_lock:
+            return func(*args)
 
-# SQLite 동시성 이슈(Concurrency)를 방어하기 위해 db_lock을 사용합니다.
-# 또한 check_same_thread=False 옵션을 추가하여 asyncio.to_thread에서 발생할 수 있는 스레드 참조 에러를 최적화합니다.
-db_lock: asyncio.Lock = asyncio.Lock()
+
+_current_unit_of_work: ContextVar[Optional[UnitOfWork]] = ContextVar(
+    "database_unit_of_work",
+    default=None,
+)
+
+
+def _active_unit_of_work() -> Optional[UnitOfWork]:
+    # 블록 안에서 만든 작업(gather, wait_for, create_task)도 컨텍스트를 복사해 합류합니다.
+    # 블록이 끝난 뒤의 쓰기는 닫힌 연결을 쓰지 않도록 평소처럼 따로 커밋합니다.
+    unit = _current_unit_of_work.get()
+    return unit if unit is not None and unit._open else None
+
+
+def _after_commit(callback: Callable[[], None]) -> None:
+    """Run ``callback`` now, or after the enclosing transaction() commits."""
+    unit = _active_unit_of_work()
+    if unit is not None:
+        unit._after_commit.append(callback)
+    else:
+        callback()
+
+
+def _finish_transaction(conn: sqlite3.Connection, commit: bool) -> None:
+    if commit:
+        conn.commit()
+    else:
+        conn.rollback()
+
+
+@asynccontextmanager
+async def transaction(call_site: str) -> AsyncIterator[UnitOfWork]:
+    """Group the database_manager writes awaited inside the block into one commit.
+
+    The write lock is held for the whole block, so keep Discord/HTTP calls out
+    of it. An exception leaving the block rolls every write back. Reads still
+    use the read-only pool and do not see the block's uncommitted writes.
+
+    Tasks started inside the block (``asyncio.gather``, ``wait_for``,
+    ``create_task``) join it while it is open, so their writes commit or roll
+    back with the block. Writes such a task issues after the block has ended
+    run as their own transactions.
+    """
+    outer = _active_unit_of_work()
+    if outer is not None:
+        yield outer
+        return
+
+    async with _db_access(call_site, "write"):
+        pool = _get_pool(False)
+        conn = await asyncio.to_thread(pool.acquire)
+        unit = UnitOfWork(call_site, conn)
+        token = _current_unit_of_work.set(unit)
+        committed = False
+        try:
+            yield unit
+            unit._open = False
+            await asyncio.to_thread(unit.run_locked, _finish_transaction, conn, True)
+            committed = True
+        finally:
+            unit._open = False
+            _current_unit_of_work.reset(token)
+            try:
+                if not committed:
+                    await asyncio.to_thread(unit.run_locked, _finish_transaction, conn, False)
+            finally:
+                pool.release(conn)
+                # 롤백된 경우에도 캐시를 비워 두면 안전합니다.
+                for callback in unit._after_commit:
+                    callback()
+
+
+# 기존 JSON 경로는 더 이상 사용하지 않아 삭제됨
 
 # 암호화 인스턴스 초기화
 _cipher_suite: Optional[Fernet] = None
@@ -71,15 +617,29 @@ def get_cipher() -> Optional[Fernet]:
             return None
     return _cipher_suite
 
-def _parse_dump_values(line: str) -> tuple[Any, ...]:
+# SQLite .dump/iterdump가 쓰는 한 행짜리 INSERT 형식
+_DUMP_INSERT_PATTERN = re.compile(r'INSERT INTO ("(?:[^"]|"")+") VALUES\(')
+# 전환 전 필드 암호화 백업에서 암호화되어 있던 열 위치 (url, title)
+_PROTECTED_DUMP_COLUMNS: Dict[str, Tuple[int, ...]] = {
+    '"favorites"': (1, 2),
+    '"music_play_counts"': (1, 2),
+}
+
+
+def _parse_dump_values(
+    statement: str,
+    parser: sqlite3.Connection,
+) -> tuple[Any, ...]:
     """Parse SQLite's own VALUES syntax without treating it as Python code."""
-    parts = line.split("VALUES(", 1)
-    if len(parts) != 2 or ");" not in parts[1]:
+    match = _DUMP_INSERT_PATTERN.match(statement)
+    body = statement.rstrip()
+    if match is None or not body.endswith(");"):
         raise ValueError("Unsupported SQL dump INSERT format.")
 
-    value_part = parts[1].rsplit(");", 1)[0]
-    with sqlite3.connect(":memory:") as parser:
-        row = parser.execute(f"SELECT {value_part}").fetchone()
+    try:
+        row = parser.execute(f"SELECT {body[match.end():-2]}").fetchone()
+    except sqlite3.Error as e:
+        raise ValueError("Unsupported SQL dump INSERT format.") from e
 
     if row is None:
         raise ValueError("SQL dump INSERT has no values.")
@@ -154,6 +714,36 @@ def _fetch_remote_backup() -> None:
         )
         SQL_BACKUP_PATH.write_bytes(result.stdout)
         logger.info("Successfully fetched database_backup.sql from remote branch without polluting Index!")
+
+        # 증분 백업이면 기준 스냅샷 뒤에 쌓인 변경분도 함께 내려받습니다.
+        listing = subprocess.run(
+            [
+                "git",
+                "ls-tree",
+                "-r",
+                "--name-only",
+                "FETCH_HEAD",
+                "data/database_backup.deltas",
+            ],
+            check=True,
+            cwd=BASE_DIR,
+            capture_output=True,
+        )
+        delta_names = listing.stdout.decode("utf-8").split()
+        if delta_names:
+            delta_dir = _backup_delta_dir()
+            delta_dir.mkdir(parents=True, exist_ok=True)
+            for stale_delta in delta_dir.glob("*.delta"):
+                stale_delta.unlink()
+            for delta_name in delta_names:
+                delta = subprocess.run(
+                    ["git", "show", f"FETCH_HEAD:{delta_name}"],
+                    check=True,
+                    cwd=BASE_DIR,
+                    capture_output=True,
+                )
+                (delta_dir / Path(delta_name).name).write_bytes(delta.stdout)
+            logger.info(f"Fetched {len(delta_names)} backup delta(s) from remote branch.")
     except Exception as e:
         logger.critical(f"FATAL Error fetching backup: {e}")
         sys.exit(
@@ -163,27 +753,360 @@ def _fetch_remote_backup() -> None:
         )
 
 
-def _decode_backup_line(line: str) -> str:
-    """Decrypt the protected values in one supported SQLite dump line."""
-    if line.startswith("INSERT INTO \"favorites\" VALUES("):
-        user_id, enc_url, enc_title = _parse_dump_values(line)
-        dec_url = _decode_backup_value(enc_url).replace("'", "''")
-        dec_title = _decode_backup_value(enc_title).replace("'", "''")
-        return (
-            f"INSERT INTO \"favorites\" VALUES("
-            f"{user_id},'{dec_url}','{dec_title}');\n"
-        )
+# 청크 프레임: 4바이트 토큰 길이 + Fernet 토큰. 토큰 평문 앞에는 백업 ID, 순번,
+# 마지막 청크 여부를 넣어 청크 교체·재배열·잘림을 복호화 단계에서 거부합니다.
+_CHUNK_FRAME = struct.Struct(">I")
+_CHUNK_META = struct.Struct(">16sQ?")
+_MAX_CHUNK_TOKEN_BYTES: int = 64 * 1024 * 1024
+
+
+def _write_encrypted_chunks(
+    source: BinaryIO,
+    destination: BinaryIO,
+    cipher: Fernet,
+    chunk_size: Optional[int] = None,
+) -> str:
+    """Encrypt a stream chunk by chunk and return the plaintext SHA-256."""
+    chunk_size = chunk_size or DB_BACKUP_CHUNK_BYTES
+    backup_id = os.urandom(16)
+    digest = hashlib.sha256()
+    index = 0
+    chunk = source.read(chunk_size)
+    while True:
+        next_chunk = source.read(chunk_size)
+        is_final = not next_chunk
+        digest.update(chunk)
+        token = cipher.encrypt(_CHUNK_META.pack(backup_id, index, is_final) + chunk)
+        destination.write(_CHUNK_FRAME.pack(len(token)))
+        destination.write(token)
+        if is_final:
+            return digest.hexdigest()
+        chunk = next_chunk
+        index += 1
+
+
+def _iter_decrypted_chunks(source: BinaryIO, cipher: Fernet) -> Iterator[bytes]:
+    """Yield authenticated plaintext chunks in order, rejecting any tampering."""
+    backup_id: Optional[bytes] = None
+    expected_index = 0
+    while True:
+        frame = source.read(_CHUNK_FRAME.size)
+        if len(frame) != _CHUNK_FRAME.size:
+            raise ValueError("Encrypted backup is truncated.")
+        (token_length,) = _CHUNK_FRAME.unpack(frame)
+        if token_length > _MAX_CHUNK_TOKEN_BYTES:
+            raise ValueError("Encrypted backup chunk is too large.")
+        token = source.read(token_length)
+        if len(token) != token_length:
+            raise ValueError("Encrypted backup is truncated.")
 
-    elif line.startswith("INSERT INTO \"music_play_counts\" VALUES("):
-        guild_id, enc_url, enc_title, play_count = _parse_dump_values(line)
-        dec_url = _decode_backup_value(enc_url).replace("'", "''")
-        dec_title = _decode_backup_value(enc_title).replace("'", "''")
-        return (
-            f"INSERT INTO \"music_play_counts\" VALUES("
-            f"{guild_id},'{dec_url}','{dec_title}',{play_count});\n"
-        )
+        try:
+            plaintext = cipher.decrypt(token)
+        except InvalidToken as e:
+            raise ValueError("DB_ENCRYPTION_KEY cannot decrypt this backup.") from e
+        if len(plaintext) < _CHUNK_META.size:
+            raise ValueError("Encrypted backup chunk is malformed.")
+
+        chunk_backup_id, index, is_final = _CHUNK_META.unpack_from(plaintext)
+        if backup_id is None:
+            backup_id = chunk_backup_id
+        if chunk_backup_id != backup_id or index != expected_index:
+            raise ValueError("Encrypted backup chunks are out of order.")
+
+        yield plaintext[_CHUNK_META.size:]
+        if is_final:
+            if source.read(1):
+                raise ValueError("Encrypted backup has trailing data.")
+            return
+        expected_index += 1
+
+
+class _ZlibCompressingReader:
+    """File-like ``read(size)`` over the zlib stream of another binary file."""
+
+    def __init__(self, source: BinaryIO, level: int = DB_BACKUP_COMPRESS_LEVEL) -> None:
+        self._source = source
+        self._compressor = zlib.compressobj(level)
+        self._buffer = bytearray()
+        self._finished = False
+
+    def read(self, size: int) -> bytes:
+        while len(self._buffer) < size and not self._finished:
+            block = self._source.read(size)
+            if block:
+                self._buffer += self._compressor.compress(block)
+            else:
+                self._buffer += self._compressor.flush()
+                self._finished = True
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+
+def _iter_decompressed(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Inflate a zlib stream piece by piece, never more than one chunk at a time."""
+    decompressor = zlib.decompressobj()
+    for chunk in chunks:
+        while chunk:
+            data = decompressor.decompress(chunk, DB_BACKUP_CHUNK_BYTES)
+            if data:
+                yield data
+            chunk = decompressor.unconsumed_tail
+    tail = decompressor.flush()
+    if tail:
+        yield tail
+    if not decompressor.eof:
+        raise ValueError("Compressed backup is truncated.")
+    if decompressor.unused_data:
+        raise ValueError("Compressed backup has trailing data.")
+
+
+def _iter_sql_statements(blocks: Iterable[bytes]) -> Iterator[str]:
+    """Split streamed UTF-8 SQL into complete statements (multi-line strings too)."""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    statement = ""
+    for block in blocks:
+        buffer += decoder.decode(block)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            statement += f"{line}\n"
+            if sqlite3.complete_statement(statement):
+                yield statement
+                statement = ""
+
+    statement += buffer + decoder.decode(b"", final=True)
+    if statement.strip():
+        if not sqlite3.complete_statement(statement):
+            raise ValueError("SQL backup ends with an incomplete statement.")
+        yield statement
+
+
+def _bulk_restore_statements(
+    conn: sqlite3.Connection,
+    statements: Iterable[str],
+    progress_source: Optional[BinaryIO] = None,
+    decode_protected: bool = False,
+) -> int:
+    """Replay a dump in one transaction, batching its INSERTs through executemany."""
+    total_bytes = os.fstat(progress_source.fileno()).st_size if progress_source else 0
+    # 값 파싱용 메모리 DB는 행마다 새로 열지 않고 복구가 끝날 때까지 재사용합니다.
+    parser = sqlite3.connect(":memory:")
+    batch: List[Tuple[Any, ...]] = []
+    batch_sql: Optional[str] = None
+    rows = 0
+    began = committed = False
+    started = last_report = time.monotonic()
+
+    def flush() -> None:
+        if batch:
+            conn.executemany(batch_sql, batch)
+            batch.clear()
+
+    # 덤프의 BEGIN TRANSACTION/COMMIT 대신 복구 전체를 트랜잭션 하나로 묶습니다.
+    conn.isolation_level = None
+    conn.execute("BEGIN")
+    try:
+        for statement in statements:
+            keyword = statement.strip().rstrip(";").strip().upper()
+            if keyword in ("BEGIN", "BEGIN TRANSACTION"):
+                began = True
+                continue
+            if keyword in ("COMMIT", "COMMIT TRANSACTION", "END", "END TRANSACTION"):
+                committed = True
+                continue
+
+            match = _DUMP_INSERT_PATTERN.match(statement)
+            if match is None:
+                flush()
+                conn.execute(statement)
+                continue
+
+            table = match.group(1)
+            values = _parse_dump_values(statement, parser)
+            if decode_protected and table in _PROTECTED_DUMP_COLUMNS:
+                decoded = list(values)
+                for index in _PROTECTED_DUMP_COLUMNS[table]:
+                    decoded[index] = _decode_backup_value(decoded[index])
+                values = tuple(decoded)
+
+            insert_sql = f"INSERT INTO {table} VALUES({','.join('?' * len(values))})"
+            if insert_sql != batch_sql:
+                flush()
+                batch_sql = insert_sql
+            batch.append(values)
+            rows += 1
+            if len(batch) >= DB_RESTORE_BATCH_ROWS:
+                flush()
+
+            now = time.monotonic()
+            if now - last_report >= DB_RESTORE_PROGRESS_SECONDS:
+                last_report = now
+                rate = rows / max(now - started, 1e-9)
+                if total_bytes:
+                    percent = progress_source.tell() * 100 / total_bytes
+                    logger.info(
+                        f"Restoring backup: {rows} rows ({percent:.0f}%), "
+                        f"{rate:.0f} rows/sec"
+                    )
+                else:
+                    logger.info(f"Restoring backup: {rows} rows, {rate:.0f} rows/sec")
+
+        flush()
+        if began and not committed:
+            raise ValueError("SQL backup is missing transaction boundaries.")
+        conn.execute("COMMIT")
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        parser.close()
+
+    elapsed = time.monotonic() - started
+    logger.info(
+        f"Restored {rows} rows in {elapsed:.2f}s "
+        f"({rows / max(elapsed, 1e-9):.0f} rows/sec)."
+    )
+    return rows
+
+
+def _check_database_integrity(conn: sqlite3.Connection) -> None:
+    """Reject a snapshot that SQLite itself does not consider intact."""
+    result = conn.execute("PRAGMA integrity_check").fetchone()
+    if result is None or result[0] != "ok":
+        raise ValueError(f"Database snapshot failed integrity check: {result}")
+
+
+def _backup_delta_dir() -> Path:
+    return SQL_BACKUP_PATH.parent / f"{SQL_BACKUP_PATH.stem}.deltas"
+
+
+def _replay_backup_deltas(
+    conn: sqlite3.Connection,
+    cipher: Fernet,
+    base_id: str,
+) -> int:
+    """Apply the change sets made for ``base_id`` in sequence order."""
+    delta_dir = _backup_delta_dir()
+    if not delta_dir.is_dir():
+        return 0
+
+    expected_sequence = 1
+    for delta_path in sorted(delta_dir.glob("*.delta")):
+        with delta_path.open("rb") as delta_file:
+            delta_header = delta_file.read(len(BACKUP_DELTA_HEADER))
+            chunks = _iter_decrypted_chunks(delta_file, cipher)
+            if delta_header == BACKUP_DELTA_HEADER:
+                blocks = _iter_decompressed(chunks)
+            elif delta_header == BACKUP_LEGACY_DELTA_HEADER:
+                blocks = chunks
+            else:
+                raise ValueError(f"Unknown backup delta format: {delta_path.name}")
+
+            header_line, blocks = _split_first_line(blocks)
+            header = json.loads(header_line.decode("utf-8"))
+            if header.get("base_id") != base_id:
+                # 새 기준 스냅샷을 올린 직후 정리되지 못한 이전 기준의 변경분입니다.
+                logger.warning(
+                    f"Skipping backup delta {delta_path.name} made for another "
+                    "base snapshot."
+                )
+                continue
+            if header.get("sequence") != expected_sequence:
+                raise ValueError("Backup deltas are missing or out of order.")
+
+            # 변경분 전체를 문자열로 모으지 않고 복호화·압축 해제된 블록에서 구문을
+            # 하나씩 꺼내 트랜잭션 하나로 적용합니다.
+            _apply_delta_statements(conn, _iter_sql_statements(blocks))
+        expected_sequence += 1
+    return expected_sequence - 1
+
+
+def _split_first_line(blocks: Iterable[bytes]) -> Tuple[bytes, Iterator[bytes]]:
+    """Return the first line of a block stream and the stream after it."""
+    blocks = iter(blocks)
+    head = b""
+    for block in blocks:
+        head += block
+        if b"\n" in head:
+            break
+    line, _, rest = head.partition(b"\n")
+    return line, itertools.chain((rest,), blocks)
+
+
+def _iter_single_statements(statement: str) -> Iterator[str]:
+    # 기본 키가 없는 테이블의 변경분은 한 줄에 DELETE와 INSERT를 함께 씁니다.
+    start = 0
+    for index, char in enumerate(statement):
+        if char == ";" and sqlite3.complete_statement(statement[start:index + 1]):
+            yield statement[start:index + 1]
+            start = index + 1
+    if statement[start:].strip():
+        yield statement[start:]
+
+
+def _apply_delta_statements(conn: sqlite3.Connection, statements: Iterable[str]) -> None:
+    conn.isolation_level = None
+    conn.execute("BEGIN")
+    try:
+        for statement in statements:
+            for single in _iter_single_statements(statement):
+                conn.execute(single)
+        conn.execute("COMMIT")
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+
+
+def _restore_database_from_snapshot(temp_path: Path, cipher: Fernet) -> None:
+    """Stream-decrypt a V3 backup into ``temp_path`` and replay its deltas."""
+    digest = hashlib.sha256()
+    with SQL_BACKUP_PATH.open("rb") as backup_file, \
+         temp_path.open("wb") as db_file:
+        backup_file.seek(len(BACKUP_SNAPSHOT_HEADER))
+        for chunk in _iter_decrypted_chunks(backup_file, cipher):
+            digest.update(chunk)
+            db_file.write(chunk)
+
+    conn = _connect_database(temp_path)
+    try:
+        _check_database_integrity(conn)
+        replayed = _replay_backup_deltas(conn, cipher, digest.hexdigest())
+        if replayed:
+            logger.info(f"Replayed {replayed} backup delta(s) on the base snapshot.")
+    finally:
+        conn.close()
+
+
+def _restore_database_from_compressed_sql(temp_path: Path, cipher: Fernet) -> None:
+    """Decrypt, inflate and bulk-insert a V4 dump as a stream."""
+    conn = _connect_database(temp_path)
+    try:
+        with SQL_BACKUP_PATH.open("rb") as backup_file:
+            backup_file.seek(len(BACKUP_COMPRESSED_SQL_HEADER))
+            compressed_chunks = _iter_decrypted_chunks(backup_file, cipher)
+            _bulk_restore_statements(
+                conn,
+                _iter_sql_statements(_iter_decompressed(compressed_chunks)),
+                progress_source=backup_file,
+            )
+    finally:
+        conn.close()
+
+
+def _decrypt_sql_envelope(backup_bytes: bytes) -> str:
+    """Decrypt a V2 envelope that holds one Fernet token for the whole dump."""
+    cipher = get_cipher()
+    if cipher is None:
+        raise ValueError("DB_ENCRYPTION_KEY is required to restore this backup.")
 
-    return line
+    encrypted_payload = backup_bytes[len(BACKUP_ENVELOPE_HEADER):]
+    try:
+        return cipher.decrypt(encrypted_payload).decode("utf-8")
+    except (InvalidToken, UnicodeDecodeError) as e:
+        raise ValueError("DB_ENCRYPTION_KEY cannot decrypt this backup.") from e
 
 
 def _restore_database_from_sql() -> None:
@@ -192,28 +1115,6 @@ def _restore_database_from_sql() -> None:
     temp_path: Optional[Path] = None
 
     try:
-        backup_bytes = SQL_BACKUP_PATH.read_bytes()
-        if backup_bytes.startswith(BACKUP_ENVELOPE_HEADER):
-            cipher = get_cipher()
-            if cipher is None:
-                raise ValueError(
-                    "DB_ENCRYPTION_KEY is required to restore this backup."
-                )
-
-            encrypted_payload = backup_bytes[len(BACKUP_ENVELOPE_HEADER):]
-            try:
-                sql_script = cipher.decrypt(encrypted_payload).decode("utf-8")
-            except (InvalidToken, UnicodeDecodeError) as e:
-                raise ValueError(
-                    "DB_ENCRYPTION_KEY cannot decrypt this backup."
-                ) from e
-        else:
-            legacy_script = backup_bytes.decode("utf-8")
-            sql_script = "".join(
-                _decode_backup_line(line)
-                for line in legacy_script.splitlines(keepends=True)
-            )
-
         DB_PATH.parent.mkdir(parents=True, exist_ok=True)
         with tempfile.NamedTemporaryFile(
             dir=DB_PATH.parent,
@@ -223,16 +1124,59 @@ def _restore_database_from_sql() -> None:
         ) as temp_file:
             temp_path = Path(temp_file.name)
 
-        conn = _connect_database(temp_path)
-        try:
-            conn.executescript(sql_script)
-            conn.commit()
-        finally:
-            conn.close()
+        with SQL_BACKUP_PATH.open("rb") as backup_file:
+            envelope_header = backup_file.read(len(BACKUP_SNAPSHOT_HEADER))
 
+        if envelope_header == BACKUP_SNAPSHOT_HEADER:
+            cipher = get_cipher()
+            if cipher is None:
+                raise ValueError(
+                    "DB_ENCRYPTION_KEY is required to restore this backup."
+                )
+            # DB 이미지 전체를 메모리에 올리지 않고 청크 단위로 임시 DB에 씁니다.
+            _restore_database_from_snapshot(temp_path, cipher)
+        elif envelope_header == BACKUP_COMPRESSED_SQL_HEADER:
+            cipher = get_cipher()
+            if cipher is None:
+                raise ValueError(
+                    "DB_ENCRYPTION_KEY is required to restore this backup."
+                )
+            _restore_database_from_compressed_sql(temp_path, cipher)
+        elif envelope_header == BACKUP_ENVELOPE_HEADER:
+            sql_script = _decrypt_sql_envelope(SQL_BACKUP_PATH.read_bytes())
+            conn = _connect_database(temp_path)
+            try:
+                _bulk_restore_statements(
+                    conn,
+                    _iter_sql_statements((sql_script.encode("utf-8"),)),
+                )
+            finally:
+                conn.close()
+        else:
+            # 전환 전 평문 덤프는 파일을 통째로 읽지 않고 블록 단위로 흘려 넣으며
+            # 보호 필드(url, title)만 행마다 복호화합니다.
+            conn = _connect_database(temp_path)
+            try:
+                with SQL_BACKUP_PATH.open("rb") as backup_file:
+                    blocks = iter(lambda: backup_file.read(DB_BACKUP_CHUNK_BYTES), b"")
+                    _bulk_restore_statements(
+                        conn,
+                        _iter_sql_statements(blocks),
+                        progress_source=backup_file,
+                        decode_protected=True,
+                    )
+            finally:
+                conn.close()
+
+        # DB 파일 없이 남은 WAL/SHM은 이전 DB의 것이므로 새 DB에 재생되지 않게 지웁니다.
+        for stale_sidecar in (
+            Path(f"{DB_PATH}-wal"),
+            Path(f"{DB_PATH}-shm"),
+        ):
+            stale_sidecar.unlink(missing_ok=True)
         os.replace(temp_path, DB_PATH)
         temp_path = None
-        logger.info("Database restored successfully from SQL dump.")
+        logger.info("Database restored successfully from backup.")
     except Exception as e:
         logger.error(f"Failed to restore DB: {e}", exc_info=True)
         raise RuntimeError(f"Failed to restore DB from {SQL_BACKUP_PATH}") from e
@@ -247,104 +1191,189 @@ def _restore_database_from_sql() -> None:
                 candidate.unlink(missing_ok=True)
 
 
+def _migration_001_base_tables(c: sqlite3.Cursor) -> None:
+    # 1. users
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            user_id INTEGER,
+            guild_id INTEGER,
+            xp INTEGER DEFAULT 0,
+            level INTEGER DEFAULT 1,
+            total_vc_seconds INTEGER DEFAULT 0,
+            birth_month INTEGER,
+            birth_day INTEGER,
+            PRIMARY KEY (user_id, guild_id)
+        )
+    ''')
+
+    # 레거시 users 테이블 구조에 생일 컬럼이 없다면 자동 추가
+    c.execute("PRAGMA table_info(users)")
+    columns = [info[1] for info in c.fetchall()]
+    if 'birth_month' not in columns:
+        c.execute("ALTER TABLE users ADD COLUMN birth_month INTEGER")
+        c.execute("ALTER TABLE users ADD COLUMN birth_day INTEGER")
+
+    # 2. music_settings (guild 단위)
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS music_settings (
+            guild_id INTEGER PRIMARY KEY,
+            volume REAL DEFAULT 1.0
+        )
+    ''')
+
+    # 3. music_play_counts (guild 단위)
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS music_play_counts (
+            guild_id INTEGER,
+            url TEXT,
+            title TEXT,
+            play_count INTEGER DEFAULT 1,
+            PRIMARY KEY(guild_id, url)
+        )
+    ''')
+
+    # 4. favorites (user 단위)
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS favorites (
+            user_id INTEGER,
+            url TEXT,
+            title TEXT,
+            PRIMARY KEY(user_id, url)
+        )
+    ''')
+
+    # 5. watch_sessions (방 정보)
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS watch_sessions (
+            session_id TEXT PRIMARY KEY,
+            guild_id INTEGER,
+            created_by INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            channel_id INTEGER,
+            message_id INTEGER
+        )
+    ''')
+
+    # 기존 테이블에 컬럼이 없을 시 자동 추가
+    c.execute("PRAGMA table_info(watch_sessions)")
+    watch_columns = [info[1] for info in c.fetchall()]
+    if 'channel_id' not in watch_columns:
+        c.execute("ALTER TABLE watch_sessions ADD COLUMN channel_id INTEGER")
+        c.execute("ALTER TABLE watch_sessions ADD COLUMN message_id INTEGER")
+
+    # 6. watch_playlists (세션 공유 대기열)
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS watch_playlists (
+            session_id TEXT,
+            video_url TEXT,
+            video_title TEXT,
+            added_by TEXT,
+            order_index INTEGER,
+            PRIMARY KEY (session_id, video_url)
+        )
+    ''')
+
+
+def _migration_002_users_total_xp(c: sqlite3.Cursor) -> None:
+    # 랭킹용 총 경험치는 생성 컬럼으로 두고 (guild_id, total_xp) 인덱스로 정렬·순위를 조회
+    # (생성 컬럼은 table_info에 나타나지 않으므로 table_xinfo로 확인)
+    c.execute("PRAGMA table_xinfo(users)")
+    if 'total_xp' not in [info[1] for info in c.fetchall()]:
+        c.execute(
+            "ALTER TABLE users ADD COLUMN total_xp INTEGER "
+            f"GENERATED ALWAYS AS (xp + (total_vc_seconds / 60) * {VC_XP_PER_MIN}) VIRTUAL"
+        )
+    c.execute("CREATE INDEX IF NOT EXISTS idx_users_guild_total_xp ON users (guild_id, total_xp)")
+
+
+def _migration_003_xp_daily(c: sqlite3.Cursor) -> None:
+    # 7. xp_daily (기간별 랭킹용 guild·날짜·유저 단위 XP 집계)
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS xp_daily (
+            guild_id INTEGER,
+            day TEXT,
+            user_id INTEGER,
+            xp INTEGER DEFAULT 0,
+            vc_seconds INTEGER DEFAULT 0,
+            PRIMARY KEY (guild_id, day, user_id)
+        ) WITHOUT ROWID
+    ''')
+
+
+def _migration_004_secondary_indexes(c: sqlite3.Cursor) -> None:
+    # get_birthdays_today / get_all_birthdays: guild 필터 + 월·일 조건 및 정렬
+    c.execute("CREATE INDEX IF NOT EXISTS idx_users_guild_birthday ON users (guild_id, birth_month, birth_day)")
+    # get_top_played_songs_db와 재생 횟수 상위 50곡 유지: guild 필터 + play_count 정렬
+    c.execute("CREATE INDEX IF NOT EXISTS idx_play_counts_guild_count ON music_play_counts (guild_id, play_count)")
+    # 보존 기간 정리(prune_xp_rollups)의 날짜 범위 삭제
+    c.execute("CREATE INDEX IF NOT EXISTS idx_xp_daily_day ON xp_daily (day)")
+    # get_watch_playlist: 세션별 order_index 정렬과 다음 순번 계산
+    c.execute("CREATE INDEX IF NOT EXISTS idx_watch_playlists_session_order ON watch_playlists (session_id, order_index)")
+
+
+def _migration_005_users_rank_index(c: sqlite3.Cursor) -> None:
+    # 랭킹 페이지(total_xp DESC, user_id)와 동점 순위 계산이 임시 정렬 없이 인덱스 범위만
+    # 읽도록 user_id까지 포함한 인덱스로 바꿉니다. 002가 다시 만든 이전 인덱스도 지웁니다.
+    c.execute("CREATE INDEX IF NOT EXISTS idx_users_guild_rank ON users (guild_id, total_xp DESC, user_id)")
+    c.execute("DROP INDEX IF EXISTS idx_users_guild_total_xp")
+
+
+# 번호 순서대로 한 번씩만 적용되는 스키마 마이그레이션 (PRAGMA user_version = 마지막 적용 번호)
+# SQL 덤프 복구본은 user_version이 0으로 돌아오므로 각 단계는 다시 실행해도 안전해야 합니다.
+# 새 변경은 기존 항목을 고치지 말고 목록 끝에 추가합니다.
+SCHEMA_MIGRATIONS: List[Callable[[sqlite3.Cursor], None]] = [
+    _migration_001_base_tables,
+    _migration_002_users_total_xp,
+    _migration_003_xp_daily,
+    _migration_004_secondary_indexes,
+    _migration_005_users_rank_index,
+]
+SCHEMA_VERSION: int = len(SCHEMA_MIGRATIONS)
+
+
+def _apply_schema_migrations(conn: sqlite3.Connection) -> int:
+    """Apply pending migrations, each in its own transaction, and return the new version."""
+    current_version: int = conn.execute("PRAGMA user_version").fetchone()[0]
+    if current_version > SCHEMA_VERSION:
+        raise RuntimeError(
+            f"Database schema version {current_version} is newer than this bot "
+            f"supports ({SCHEMA_VERSION})."
+        )
+
+    for version in range(current_version + 1, SCHEMA_VERSION + 1):
+        conn.execute("BEGIN")
+        try:
+            SCHEMA_MIGRATIONS[version - 1](conn.cursor())
+            conn.execute(f"PRAGMA user_version = {version}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        logger.info(f"Applied database schema migration {version}.")
+    return SCHEMA_VERSION
+
+
 def _prepare_database_schema() -> None:
-    """Apply persistent DB settings, create tables, and run compatible upgrades."""
-    with _connect_database() as conn:
+    """Apply persistent DB settings and run pending schema migrations."""
+    conn = _connect_database()
+    try:
         # journal_mode는 데이터베이스 파일에 영구 기록되므로 초기화 시 한 번만 설정합니다.
         try:
             conn.execute("PRAGMA journal_mode=WAL;")
         except Exception as e:
             logger.warning(f"Failed to set journal_mode to WAL: {e}")
-        c: sqlite3.Cursor = conn.cursor()
-        
-        # 1. users
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                user_id INTEGER,
-                guild_id INTEGER,
-                xp INTEGER DEFAULT 0,
-                level INTEGER DEFAULT 1,
-                total_vc_seconds INTEGER DEFAULT 0,
-                birth_month INTEGER,
-                birth_day INTEGER,
-                PRIMARY KEY (user_id, guild_id)
-            )
-        ''')
-        
-        # 레거시 users 테이블 구조에 생일 컬럼이 없다면 자동 추가
-        c.execute("PRAGMA table_info(users)")
-        columns = [info[1] for info in c.fetchall()]
-        if 'birth_month' not in columns:
-            c.execute("ALTER TABLE users ADD COLUMN birth_month INTEGER")
-            c.execute("ALTER TABLE users ADD COLUMN birth_day INTEGER")
-        
-        # 2. music_settings (guild 단위)
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS music_settings (
-                guild_id INTEGER PRIMARY KEY,
-                volume REAL DEFAULT 1.0
-            )
-        ''')
-        
-        # 3. music_play_counts (guild 단위)
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS music_play_counts (
-                guild_id INTEGER,
-                url TEXT,
-                title TEXT,
-                play_count INTEGER DEFAULT 1,
-                PRIMARY KEY(guild_id, url)
-            )
-        ''')
-        
-        # 4. favorites (user 단위)
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS favorites (
-                user_id INTEGER,
-                url TEXT,
-                title TEXT,
-                PRIMARY KEY(user_id, url)
-            )
-        ''')
-        
-        # 5. watch_sessions (방 정보)
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS watch_sessions (
-                session_id TEXT PRIMARY KEY,
-                guild_id INTEGER,
-                created_by INTEGER,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                channel_id INTEGER,
-                message_id INTEGER
-            )
-        ''')
-        
-        # 기존 테이블에 컬럼이 없을 시 자동 추가
-        c.execute("PRAGMA table_info(watch_sessions)")
-        watch_columns = [info[1] for info in c.fetchall()]
-        if 'channel_id' not in watch_columns:
-            c.execute("ALTER TABLE watch_sessions ADD COLUMN channel_id INTEGER")
-            c.execute("ALTER TABLE watch_sessions ADD COLUMN message_id INTEGER")
-        
-        # 6. watch_playlists (세션 공유 대기열)
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS watch_playlists (
-                session_id TEXT,
-                video_url TEXT,
-                video_title TEXT,
-                added_by TEXT,
-                order_index INTEGER,
-                PRIMARY KEY (session_id, video_url)
-            )
-        ''')
-        
-        conn.commit()
+        _apply_schema_migrations(conn)
+    finally:
+        conn.close()
     logger.info("Database schemas initialized.")
 
 
 def init_db() -> None:
     """Prepare local storage, recover data when needed, and ensure the schema."""
     DATA_DIR.mkdir(parents=True, exist_ok=True)
+    # 복구가 DB 파일을 교체할 수 있으므로 이전 파일을 가리키는 연결과 조회 캐시를 먼저 비웁니다.
+    close_connection_pool()
+    clear_query_caches()
 
     if not DB_PATH.exists() and not SQL_BACKUP_PATH.exists():
         _fetch_remote_backup()
@@ -357,24 +1386,308 @@ def init_db() -> None:
 
 def _write_database_dump(destination: Path) -> None:
     """Write one complete plaintext SQL dump to a protected temporary path."""
-    with _connect_database() as conn:
-        with destination.open("w", encoding="utf-8", newline="\n") as dump_file:
-            for line in conn.iterdump():
-                dump_file.write(f"{line}\n")
+    source = _connect_database()
+    try:
+        with source as conn:
+            # 여러 테이블을 읽는 동안 같은 WAL 스냅샷을 보도록 읽기 트랜잭션을 엽니다.
+            conn.execute("BEGIN")
+            with destination.open("w", encoding="utf-8", newline="\n") as dump_file:
+                for line in conn.iterdump():
+                    dump_file.write(f"{line}\n")
+    finally:
+        source.close()
+
 
+def _validate_sql_backup(backup_path: Path, scratch_path: Path) -> None:
+    """Reject incomplete or syntactically invalid SQL dumps.
 
-def _validate_sql_backup(backup_path: Path) -> None:
-    """Reject incomplete or syntactically invalid SQL dumps."""
-    sql_script = backup_path.read_text(encoding="utf-8")
-    if "BEGIN TRANSACTION;" not in sql_script or "COMMIT;" not in sql_script:
+    The dump is replayed statement by statement into a scratch DB file, so
+    memory stays O(chunk) however large the dump is.
+    """
+    began = committed = False
+    validation_db = sqlite3.connect(scratch_path, isolation_level=None)
+    try:
+        # 검증용 사본이므로 저널과 동기화를 끄고 디스크에만 씁니다.
+        validation_db.execute("PRAGMA journal_mode=OFF")
+        validation_db.execute("PRAGMA synchronous=OFF")
+        with backup_path.open("rb") as dump_file:
+            blocks = iter(lambda: dump_file.read(DB_BACKUP_CHUNK_BYTES), b"")
+            for statement in _iter_sql_statements(blocks):
+                keyword = statement.strip().rstrip(";").strip().upper()
+                if keyword == "BEGIN TRANSACTION":
+                    began = True
+                elif keyword == "COMMIT":
+                    committed = True
+                validation_db.execute(statement)
+    finally:
+        validation_db.close()
+    if not began or not committed:
         raise ValueError("SQL backup is missing transaction boundaries.")
 
-    with sqlite3.connect(":memory:") as validation_db:
-        validation_db.executescript(sql_script)
 
+def _write_database_snapshot(destination: Path) -> None:
+    """Copy a consistent DB image page by page through the SQLite backup API."""
+    source = _connect_database(read_only=True)
+    target = sqlite3.connect(destination)
+    try:
+        # 읽기 트랜잭션 하나를 유지해 단계별 복사 도중 쓰기가 커밋되어도 처음부터
+        # 다시 복사하지 않고 같은 WAL 스냅샷을 끝까지 복사합니다. WAL 모드라
+        # 이 읽기 트랜잭션이 쓰기 연결을 막지는 않습니다.
+        source.execute("BEGIN")
+        source.execute("SELECT count(*) FROM sqlite_master").fetchone()
+        source.backup(target, pages=DB_BACKUP_PAGES_PER_STEP)
+        source.rollback()
+
+        # 복사본은 -wal/-shm 없이 한 파일로 암호화되도록 롤백 저널 모드로 바꿉니다.
+        target.execute("PRAGMA journal_mode=DELETE")
+        _check_database_integrity(target)
+    finally:
+        target.close()
+        source.close()
+
+
+def _verify_encrypted_chunks(backup_path: Path, header: bytes, expected_sha256: str) -> None:
+    """Re-read a chunked envelope and compare its plaintext digest in O(chunk) memory."""
+    cipher = get_cipher()
+    if cipher is None:
+        raise ValueError("DB_ENCRYPTION_KEY is required to verify this backup.")
+
+    digest = hashlib.sha256()
+    with backup_path.open("rb") as backup_file:
+        if backup_file.read(len(header)) != header:
+            raise ValueError("Encrypted backup header mismatch.")
+        for chunk in _iter_decrypted_chunks(backup_file, cipher):
+            digest.update(chunk)
+    if digest.hexdigest() != expected_sha256:
+        raise ValueError("Encrypted backup verification failed.")
+
+
+# --- 증분 백업 ---
+# 직전 백업 시점의 평문 DB 사본(참조 DB)과 새 스냅샷을 비교해 행 단위 변경 SQL만
+# 암호화한 변경분을 `<백업 이름>.deltas/NNNNNN.delta`로 쌓습니다. 참조 DB는 운영 DB와
+# 같은 data 폴더에 두며 원격으로 올리지 않습니다. 변경분 수나 크기가 기준을 넘거나
+# 스키마가 바뀌면 새 기준 스냅샷으로 다시 시작(rebase)합니다.
+def _backup_reference_path() -> Path:
+    return SQL_BACKUP_PATH.parent / f".{SQL_BACKUP_PATH.stem}.reference.db"
+
+
+def _backup_manifest_path() -> Path:
+    return SQL_BACKUP_PATH.parent / f".{SQL_BACKUP_PATH.stem}.manifest.json"
+
+
+def _read_backup_manifest() -> Optional[Dict[str, Any]]:
+    try:
+        manifest = json.loads(_backup_manifest_path().read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return manifest if isinstance(manifest, dict) else None
+
+
+def _write_backup_manifest(manifest: Dict[str, Any]) -> None:
+    manifest_path = _backup_manifest_path()
+    temp_path = manifest_path.with_name(f"{manifest_path.name}.tmp")
+    temp_path.write_text(json.dumps(manifest), encoding="utf-8")
+    os.replace(temp_path, manifest_path)
+
+
+def _clear_incremental_backup_state(keep_reference: bool = False) -> None:
+    """Drop deltas (and optionally the reference copy) after a full backup."""
+    delta_dir = _backup_delta_dir()
+    if delta_dir.is_dir():
+        for delta_path in delta_dir.glob("*.delta"):
+            delta_path.unlink()
+    if not keep_reference:
+        _backup_reference_path().unlink(missing_ok=True)
+        _backup_manifest_path().unlink(missing_ok=True)
+
+
+def _needs_rebase(manifest: Optional[Dict[str, Any]]) -> bool:
+    if manifest is None or not SQL_BACKUP_PATH.exists():
+        return True
+    if not _backup_reference_path().exists():
+        return True
+    if manifest.get("sequence", 0) >= DB_BACKUP_REBASE_EVERY:
+        return True
+    return manifest.get("delta_bytes", 0) > (
+        manifest.get("base_bytes", 0) * DB_BACKUP_REBASE_RATIO
+    )
+
+
+def _quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _write_table_changes(
+    conn: sqlite3.Connection,
+    table: str,
+    destination: BinaryIO,
+) -> int:
+    """Write DELETE/INSERT statements turning ``base.table`` into ``main.table``."""
+    table_name = _quote_identifier(table)
+    table_literal = table_name.replace("'", "''")
+    xinfo = conn.execute(f"PRAGMA main.table_xinfo({table_name})").fetchall()
+    # 생성 컬럼(hidden 2, 3)은 값을 넣을 수 없으므로 비교와 INSERT에서 제외합니다.
+    columns = [_quote_identifier(row[1]) for row in xinfo if row[6] == 0]
+    keys = [
+        _quote_identifier(name)
+        for _, name in sorted((row[5], row[1]) for row in xinfo if row[5] > 0)
+    ]
+    has_primary_key = bool(keys)
+    if not has_primary_key:
+        keys = [_quote_identifier("name")] if table == "sqlite_sequence" else columns
+
+    key_list = ", ".join(keys)
+    column_list = ", ".join(columns)
+    key_match = " || ' AND ' || ".join(
+        f"'{key.replace(chr(39), chr(39) * 2)} IS ' || quote({key})" for key in keys
+    )
+    values = " || ',' || ".join(f"quote({column})" for column in columns)
+    column_literal = column_list.replace("'", "''")
+    insert = (
+        f"'INSERT OR REPLACE INTO {table_literal} ({column_literal}) VALUES(' "
+        f"|| {values} || ');'"
+        if has_primary_key
+        else f"'DELETE FROM {table_literal} WHERE ' || {key_match} || '; "
+        f"INSERT INTO {table_literal} ({column_literal}) VALUES(' || {values} || ');'"
+    )
+
+    statements = 0
+    queries = (
+        f"SELECT 'DELETE FROM {table_literal} WHERE ' || {key_match} || ';' "
+        f"FROM (SELECT {key_list} FROM base.{table_name} "
+        f"EXCEPT SELECT {key_list} FROM main.{table_name})",
+        f"SELECT {insert} FROM (SELECT {column_list} FROM main.{table_name} "
+        f"EXCEPT SELECT {column_list} FROM base.{table_name})",
+    )
+    for query in queries:
+        for (statement,) in conn.execute(query):
+            destination.write(statement.encode("utf-8") + b"\n")
+            statements += 1
+    return statements
+
+
+def _write_change_set(
+    snapshot_path: Path,
+    reference_path: Path,
+    destination: BinaryIO,
+) -> Optional[int]:
+    """Write the row changes since the reference; ``None`` asks for a rebase."""
+    conn = _connect_database(snapshot_path, read_only=True)
+    try:
+        conn.execute(
+            "ATTACH DATABASE ? AS base",
+            (f"{reference_path.resolve().as_uri()}?mode=ro",),
+        )
+        schema_query = "SELECT type, name, sql FROM {}.sqlite_master ORDER BY type, name"
+        version_query = "PRAGMA {}.user_version"
+        if (
+            conn.execute(schema_query.format("main")).fetchall()
+            != conn.execute(schema_query.format("base")).fetchall()
+            or conn.execute(version_query.format("main")).fetchone()
+            != conn.execute(version_query.format("base")).fetchone()
+        ):
+            return None
+
+        tables = [
+            row[0]
+            for row in conn.execute(
+                "SELECT name FROM main.sqlite_master WHERE type = 'table' "
+                "AND name NOT LIKE 'sqlite%' ORDER BY name"
+            )
+        ]
+        if conn.execute(
+            "SELECT 1 FROM main.sqlite_master WHERE name = 'sqlite_sequence'"
+        ).fetchone():
+            tables.append("sqlite_sequence")
+
+        return sum(_write_table_changes(conn, table, destination) for table in tables)
+    finally:
+        conn.close()
+
+
+def _publish_base_snapshot(
+    snapshot_path: Path,
+    encrypted_path: Path,
+    cipher: Fernet,
+) -> None:
+    """Encrypt a snapshot as the new V3 base and restart the delta chain."""
+    with snapshot_path.open("rb") as plaintext_file, \
+         encrypted_path.open("wb") as encrypted_file:
+        encrypted_file.write(BACKUP_SNAPSHOT_HEADER)
+        base_id = _write_encrypted_chunks(plaintext_file, encrypted_file, cipher)
+    _verify_encrypted_chunks(encrypted_path, BACKUP_SNAPSHOT_HEADER, base_id)
+
+    base_bytes = encrypted_path.stat().st_size
+    os.replace(encrypted_path, SQL_BACKUP_PATH)
+    # 새 기준을 먼저 게시한 뒤 이전 기준의 변경분을 지웁니다. 그 사이에 중단되어도
+    # 복구는 base_id가 다른 변경분을 건너뜁니다.
+    _clear_incremental_backup_state(keep_reference=True)
+    _write_backup_manifest(
+        {"base_id": base_id, "base_bytes": base_bytes, "sequence": 0, "delta_bytes": 0}
+    )
+    logger.info("Database base snapshot published; backup deltas restarted.")
+
+
+def _publish_change_set(
+    snapshot_path: Path,
+    changes_path: Path,
+    encrypted_path: Path,
+    cipher: Fernet,
+    manifest: Dict[str, Any],
+) -> bool:
+    """Publish the next encrypted delta; ``False`` means a rebase is needed."""
+    sequence = int(manifest["sequence"]) + 1
+    with changes_path.open("wb") as changes_file:
+        header = {"base_id": manifest["base_id"], "sequence": sequence}
+        changes_file.write(json.dumps(header).encode("utf-8") + b"\n")
+        statements = _write_change_set(
+            snapshot_path,
+            _backup_reference_path(),
+            changes_file,
+        )
+    if statements is None:
+        logger.info("Database schema changed since the base snapshot; rebasing.")
+        return False
+    if statements == 0:
+        logger.info("No database changes since the last backup; no delta written.")
+        return True
+
+    with changes_path.open("rb") as plaintext_file, \
+         encrypted_path.open("wb") as encrypted_file:
+        encrypted_file.write(BACKUP_DELTA_HEADER)
+        compressed_sha256 = _write_encrypted_chunks(
+            _ZlibCompressingReader(plaintext_file),
+            encrypted_file,
+            cipher,
+        )
+    _verify_encrypted_chunks(encrypted_path, BACKUP_DELTA_HEADER, compressed_sha256)
+
+    delta_dir = _backup_delta_dir()
+    delta_dir.mkdir(parents=True, exist_ok=True)
+    delta_bytes = encrypted_path.stat().st_size
+    os.replace(encrypted_path, delta_dir / f"{sequence:06d}.delta")
+    manifest["sequence"] = sequence
+    manifest["delta_bytes"] = int(manifest.get("delta_bytes", 0)) + delta_bytes
+    _write_backup_manifest(manifest)
+    logger.info(
+        f"Database backup delta {sequence} published "
+        f"({statements} statements, {delta_bytes} bytes)."
+    )
+    return True
+
+
+def _new_backup_temp_path(kind: str, suffix: str) -> Path:
+    with tempfile.NamedTemporaryFile(
+        dir=SQL_BACKUP_PATH.parent,
+        prefix=f".{SQL_BACKUP_PATH.stem}.{kind}.",
+        suffix=suffix,
+        delete=False,
+    ) as temp_file:
+        return Path(temp_file.name)
 
-def _create_atomic_database_backup() -> bool:
-    """Validate, encrypt, and publish a complete backup as one atomic file."""
+
+def _create_atomic_database_backup(mode: str = "sql") -> bool:
+    """Validate, encrypt, and publish a complete backup or the next delta."""
     cipher = get_cipher()
     if cipher is None:
         logger.error(
@@ -384,164 +1697,507 @@ def _create_atomic_database_backup() -> bool:
         return False
 
     SQL_BACKUP_PATH.parent.mkdir(parents=True, exist_ok=True)
-    plaintext_temp_path: Optional[Path] = None
-    encrypted_temp_path: Optional[Path] = None
+    temp_paths: List[Path] = []
 
     try:
-        with tempfile.NamedTemporaryFile(
-            dir=SQL_BACKUP_PATH.parent,
-            prefix=f".{SQL_BACKUP_PATH.stem}.plaintext.",
-            suffix=".sql.tmp",
-            delete=False,
-        ) as temp_file:
-            plaintext_temp_path = Path(temp_file.name)
-
-        with tempfile.NamedTemporaryFile(
-            dir=SQL_BACKUP_PATH.parent,
-            prefix=f".{SQL_BACKUP_PATH.stem}.encrypted.",
-            suffix=".enc.tmp",
-            delete=False,
-        ) as temp_file:
-            encrypted_temp_path = Path(temp_file.name)
-
-        _write_database_dump(plaintext_temp_path)
-        _validate_sql_backup(plaintext_temp_path)
-
-        plaintext_bytes = plaintext_temp_path.read_bytes()
-        encrypted_payload = cipher.encrypt(plaintext_bytes)
-        if cipher.decrypt(encrypted_payload) != plaintext_bytes:
-            raise ValueError("Encrypted backup verification failed.")
+        if mode == "sql":
+            plaintext_temp_path = _new_backup_temp_path("plaintext", ".sql.tmp")
+            temp_paths.append(plaintext_temp_path)
+            encrypted_temp_path = _new_backup_temp_path("encrypted", ".enc.tmp")
+            temp_paths.append(encrypted_temp_path)
+
+            validation_temp_path = _new_backup_temp_path("validate", ".db.tmp")
+            temp_paths.append(validation_temp_path)
+
+            _write_database_dump(plaintext_temp_path)
+            _validate_sql_backup(plaintext_temp_path, validation_temp_path)
+
+            # 반복이 많은 INSERT 문을 압축한 뒤 청크 단위로 암호화합니다(V4).
+            with plaintext_temp_path.open("rb") as plaintext_file, \
+                 encrypted_temp_path.open("wb") as encrypted_file:
+                encrypted_file.write(BACKUP_COMPRESSED_SQL_HEADER)
+                compressed_sha256 = _write_encrypted_chunks(
+                    _ZlibCompressingReader(plaintext_file),
+                    encrypted_file,
+                    cipher,
+                )
+            _verify_encrypted_chunks(
+                encrypted_temp_path,
+                BACKUP_COMPRESSED_SQL_HEADER,
+                compressed_sha256,
+            )
+            os.replace(encrypted_temp_path, SQL_BACKUP_PATH)
+            # SQL 덤프 위에는 변경분을 쌓을 수 없으므로 증분 상태를 비웁니다.
+            _clear_incremental_backup_state()
+        else:
+            snapshot_temp_path = _new_backup_temp_path("plaintext", ".db.tmp")
+            temp_paths.append(snapshot_temp_path)
+            encrypted_temp_path = _new_backup_temp_path("encrypted", ".enc.tmp")
+            temp_paths.append(encrypted_temp_path)
+
+            _write_database_snapshot(snapshot_temp_path)
+            manifest = _read_backup_manifest()
+            published = False
+            if mode == "incremental" and not _needs_rebase(manifest):
+                changes_temp_path = _new_backup_temp_path("changes", ".sql.tmp")
+                temp_paths.append(changes_temp_path)
+                published = _publish_change_set(
+                    snapshot_temp_path,
+                    changes_temp_path,
+                    encrypted_temp_path,
+                    cipher,
+                    manifest,
+                )
+            if not published:
+                _publish_base_snapshot(
+                    snapshot_temp_path,
+                    encrypted_temp_path,
+                    cipher,
+                )
+            # 방금 백업한 스냅샷이 다음 변경분의 비교 기준이 됩니다.
+            os.replace(snapshot_temp_path, _backup_reference_path())
 
-        encrypted_temp_path.write_bytes(
-            BACKUP_ENVELOPE_HEADER + encrypted_payload
+        logger.info(
+            f"Database successfully backed up as an encrypted envelope ({mode})."
         )
-        os.replace(encrypted_temp_path, SQL_BACKUP_PATH)
-        encrypted_temp_path = None
-        logger.info("Database successfully backed up as an encrypted envelope.")
         return True
     except Exception as e:
         logger.error(f"Failed to backup DB to SQL: {e}", exc_info=True)
         return False
     finally:
-        for temp_path in (plaintext_temp_path, encrypted_temp_path):
-            if temp_path is not None:
-                temp_path.unlink(missing_ok=True)
+        for temp_path in temp_paths:
+            for candidate in (
+                temp_path,
+                Path(f"{temp_path}-journal"),
+                Path(f"{temp_path}-wal"),
+                Path(f"{temp_path}-shm"),
+            ):
+                candidate.unlink(missing_ok=True)
+
+
+# --- 변경 없음 감지 ---
+# 예약 백업이 DB가 그대로인데도 스냅샷·암호화·업로드를 반복하지 않도록 마지막 백업
+# 시점의 지문을 백업 옆에 저장합니다. PRAGMA data_version은 연결마다 따로 세는 값이라
+# cron이 매번 새로 띄우는 프로세스에서는 비교할 수 없으므로, 먼저 DB/WAL 파일의
+# 크기·수정 시각을 비교하고(수 ms), 다르면 SQLite 안에서 계산한 테이블별 행 수와 열 집계를 비교합니다.
+BACKUP_CREATED: str = "created"
+BACKUP_UNCHANGED: str = "unchanged"
+BACKUP_FAILED: str = "failed"
+
 
+def _backup_fingerprint_path() -> Path:
+    return SQL_BACKUP_PATH.parent / f".{SQL_BACKUP_PATH.stem}.fingerprint.json"
+
+
+def _database_file_signature() -> List[int]:
+    """Size and mtime of the DB and its WAL; every commit changes one of them."""
+    signature: List[int] = []
+    for path in (DB_PATH, Path(f"{DB_PATH}-wal")):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            signature.extend((0, 0))
+        else:
+            signature.extend((stat.st_size, stat.st_mtime_ns))
+    return signature
+
+
+def _table_checksum_query(conn: sqlite3.Connection, table: str) -> str:
+    # 행을 파이썬으로 가져오지 않고 SQLite 안에서 한 번 훑어 집계합니다. 열마다 선언 타입에
+    # 맞는 가장 싼 집계 하나만 씁니다. 정수는 큰 디스코드 ID의 하위 자리가 정확히 남는 나머지
+    # 합, 실수는 합, 문자열·BLOB은 길이 합입니다. 같은 길이 문자열만 바꾸는 쓰기 경로는 없고
+    # (INSERT OR REPLACE는 rowid가, 재생 기록은 횟수가 함께 바뀜) rowid 합이 행 교체를 잡습니다.
+    table_name = _quote_identifier(table)
+    aggregates = ["count(*)"]
+    create_sql = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone()[0] or ""
+    if "WITHOUT ROWID" not in create_sql.upper():
+        aggregates.append("total(rowid)")
+    for row in conn.execute(f"PRAGMA table_info({table_name})"):
+        column = _quote_identifier(row[1])
+        declared_type = (row[2] or "").upper()
+        if "INT" in declared_type:
+            aggregates.append(f"total({column} % 1000003)")
+        elif any(token in declared_type for token in ("REAL", "FLOA", "DOUB")):
+            aggregates.append(f"total({column})")
+        else:
+            aggregates.append(f"total(length({column}))")
+    return f"SELECT {', '.join(aggregates)} FROM {table_name}"
+
+
+def _database_content_fingerprint() -> Dict[str, Any]:
+    """Per-table row count and column aggregates, computed SQL-side in one read snapshot."""
+    conn = _connect_database(read_only=True)
+    try:
+        conn.execute("BEGIN")
+        tables: Dict[str, List[float]] = {}
+        table_names = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name"
+        ).fetchall()
+        for (table,) in table_names:
+            tables[table] = list(conn.execute(_table_checksum_query(conn, table)).fetchone())
+        return {
+            "schema_version": conn.execute("PRAGMA schema_version").fetchone()[0],
+            "user_version": conn.execute("PRAGMA user_version").fetchone()[0],
+            "tables": tables,
+        }
+    finally:
+        conn.close()
+
+
+def _read_backup_fingerprint() -> Optional[Dict[str, Any]]:
+    try:
+        fingerprint = json.loads(_backup_fingerprint_path().read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return fingerprint if isinstance(fingerprint, dict) else None
 
-async def backup_database_to_sql() -> bool:
-    """Create an encrypted SQL backup without risking the last good dump."""
-    async with db_lock:
-        return await asyncio.to_thread(_create_atomic_database_backup)
+
+def _write_backup_fingerprint(fingerprint: Dict[str, Any]) -> None:
+    fingerprint_path = _backup_fingerprint_path()
+    temp_path = fingerprint_path.with_name(f"{fingerprint_path.name}.tmp")
+    temp_path.write_text(json.dumps(fingerprint), encoding="utf-8")
+    os.replace(temp_path, fingerprint_path)
+
+
+def _run_backup(mode: str, skip_unchanged: bool = True) -> str:
+    """Back up unless the fingerprint matches the last backup in this mode."""
+    fingerprint: Optional[Dict[str, Any]] = None
+    try:
+        # 지문은 스냅샷보다 먼저 잽니다. 그 사이에 들어온 쓰기는 다음 백업에서 다시
+        # 변경으로 잡히므로 놓치지 않습니다.
+        files = _database_file_signature()
+        stored = _read_backup_fingerprint() if skip_unchanged else None
+        comparable = (
+            stored is not None
+            and stored.get("mode") == mode
+            and SQL_BACKUP_PATH.exists()
+        )
+        if comparable and stored.get("files") == files:
+            logger.info("Database unchanged since the last backup (file signature).")
+            return BACKUP_UNCHANGED
+
+        content = _database_content_fingerprint()
+        fingerprint = {"mode": mode, "files": files, "content": content}
+        if comparable and stored.get("content") == content:
+            # 체크포인트처럼 파일만 바뀐 경우입니다. 다음 비교가 빠르도록 파일 정보만 갱신합니다.
+            _write_backup_fingerprint(fingerprint)
+            logger.info("Database unchanged since the last backup (content checksum).")
+            return BACKUP_UNCHANGED
+    except Exception as e:
+        logger.warning(f"Backup change detection failed; running a full backup: {e}")
+        fingerprint = None
+
+    if not _create_atomic_database_backup(mode):
+        return BACKUP_FAILED
+
+    if fingerprint is not None:
+        try:
+            _write_backup_fingerprint(fingerprint)
+        except OSError as e:
+            logger.warning(f"Failed to record the backup fingerprint: {e}")
+    else:
+        _backup_fingerprint_path().unlink(missing_ok=True)
+    return BACKUP_CREATED
+
+
+async def run_scheduled_backup(
+    mode: Optional[str] = None,
+    skip_unchanged: bool = True,
+) -> str:
+    """Back up the DB and report ``"created"``, ``"unchanged"`` or ``"failed"``.
+
+    ``mode`` defaults to ``DB_BACKUP_MODE``: ``"incremental"`` adds an
+    encrypted delta on top of the last V3 base snapshot (rebasing when
+    needed), ``"snapshot"`` always writes a full V3 snapshot, and ``"sql"``
+    writes the compressed V4 SQL dump envelope.
+    """
+    backup_mode = (mode or DB_BACKUP_MODE).strip().lower()
+    if backup_mode not in ("incremental", "snapshot", "sql"):
+        logger.error(f"Unknown DB_BACKUP_MODE '{backup_mode}'. Backup aborted.")
+        return BACKUP_FAILED
+
+    # 모든 방식이 하나의 읽기 트랜잭션 스냅샷에서 만들어지므로 쓰기 작업을 막지 않습니다.
+    async with _db_access("backup_database_to_sql", "read"):
+        return await asyncio.to_thread(_run_backup, backup_mode, skip_unchanged)
+
+
+async def backup_database_to_sql(mode: Optional[str] = None) -> bool:
+    """Create an encrypted backup without risking the last good one.
+
+    An unchanged DB counts as success; see ``run_scheduled_backup``.
+    """
+    return await run_scheduled_backup(mode) != BACKUP_FAILED
 
 
 # migrate_json_to_db() 함수는 불필요해져 삭제되었습니다.
 
 
+# ==========================================
+# 조회 캐시
+# ==========================================
+# 자주 읽고 드물게 바뀌는 키별 조회 결과를 이벤트 루프 안에 보관합니다. 해당 키를
+# 바꾸는 쓰기 함수가 커밋 뒤 무효화하며, 조회 도중 무효화가 있었던 결과는 저장하지
+# 않아 오래된 값이 다시 들어오지 않습니다.
+DB_QUERY_CACHE_ENTRIES: int = max(1, int(os.getenv("DB_QUERY_CACHE_ENTRIES", "1024")))
+
+
+class QueryCache:
+    """Bounded LRU cache of per-key query results, invalidated by the writers."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries: int = max_entries
+        self.hits: int = 0
+        self.misses: int = 0
+        self.invalidations: int = 0
+        self._entries: "OrderedDict[Any, Any]" = OrderedDict()
+        self._epoch: int = 0
+
+    def peek(self, key: Any) -> Optional[Any]:
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return value
+
+    async def load(self, key: Any, loader: Callable[[], Awaitable[T]]) -> T:
+        """Return the cached value for ``key`` or load and remember it."""
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+        self.misses += 1
+        epoch = self._epoch
+        value = await loader()
+        if epoch == self._epoch:
+            self._entries[key] = value
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, key: Any) -> None:
+        self._epoch += 1
+        self.invalidations += 1
+        self._entries.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Any], bool]) -> None:
+        self._epoch += 1
+        self.invalidations += 1
+        for key in [key for key in self._entries if predicate(key)]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._epoch += 1
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+
+# 사용자별 즐겨찾기: user_id -> ((url, title), ...) 저장 순서
+_favorites_cache: QueryCache = QueryCache(DB_QUERY_CACHE_ENTRIES)
+# 서버별 음악 설정: guild_id -> volume (설정 행이 없으면 None)
+_music_settings_cache: QueryCache = QueryCache(DB_QUERY_CACHE_ENTRIES)
+# 서버별 인기곡: (guild_id, limit) -> ((url, title, count), ...)
+_top_songs_cache: QueryCache = QueryCache(DB_QUERY_CACHE_ENTRIES)
+
+
+def clear_query_caches() -> None:
+    _favorites_cache.clear()
+    _music_settings_cache.clear()
+    _top_songs_cache.clear()
+
+
+def _invalidate_top_songs(guild_ids: Iterable[int]) -> None:
+    changed = set(guild_ids)
+    if changed:
+        _top_songs_cache.invalidate_where(lambda key: key[0] in changed)
+
+
+def get_query_cache_stats() -> Dict[str, Dict[str, int]]:
+    return {
+        "favorites": _favorites_cache.stats(),
+        "music_settings": _music_settings_cache.stats(),
+        "top_songs": _top_songs_cache.stats(),
+    }
+
+
 # 비동기 DB 조회/조작 유틸 함수
+# 조회는 _run_read(읽기 전용 연결), 변경은 _run_write(단일 쓰기 연결)로 실행하며
+# 각 함수 이름이 잠금 대기 통계의 호출 지점 이름이 됩니다.
 async def get_favorites() -> Dict[str, List[Dict[str, str]]]:
-    async with db_lock:
-        def _get() -> Dict[str, List[Dict[str, str]]]:
-            with _connect_database() as conn:
-                conn.row_factory = sqlite3.Row
-                c: sqlite3.Cursor = conn.cursor()
-                c.execute("SELECT user_id, url, title FROM favorites")
-                res: Dict[str, List[Dict[str, str]]] = {}
-                for row in c.fetchall():
-                    uid: str = str(row['user_id'])
-                    if uid not in res:
-                        res[uid] = []
-                    res[uid].append({"url": row['url'], "title": row['title']})
-                return res
-        return await asyncio.to_thread(_get)
+    def _get(conn: sqlite3.Connection) -> Dict[str, List[Dict[str, str]]]:
+        c: sqlite3.Cursor = conn.cursor()
+        c.execute("SELECT user_id, url, title FROM favorites")
+        res: Dict[str, List[Dict[str, str]]] = {}
+        for row in c.fetchall():
+            uid: str = str(row['user_id'])
+            if uid not in res:
+                res[uid] = []
+            res[uid].append({"url": row['url'], "title": row['title']})
+        return res
+    return await _run_read("get_favorites", _get)
+
+
+async def get_user_favorites(user_id: int) -> List[Dict[str, str]]:
+    """Return one user's favorites in the order they were saved."""
+    def _get(conn: sqlite3.Connection) -> Tuple[Tuple[str, str], ...]:
+        c: sqlite3.Cursor = conn.cursor()
+        # 기본 키 (user_id, url) 인덱스로 해당 사용자 행만 읽습니다.
+        c.execute("SELECT url, title FROM favorites WHERE user_id = ? ORDER BY rowid", (user_id,))
+        return tuple((row['url'], row['title']) for row in c.fetchall())
+
+    rows = await _favorites_cache.load(
+        user_id,
+        lambda: _run_read("get_user_favorites", _get),
+    )
+    return [{"url": url, "title": title} for url, title in rows]
+
+
+async def is_favorite(user_id: int, url: str) -> bool:
+    cached = _favorites_cache.peek(user_id)
+    if cached is not None:
+        return any(saved_url == url for saved_url, _ in cached)
+
+    def _exists(conn: sqlite3.Connection) -> bool:
+        c: sqlite3.Cursor = conn.cursor()
+        c.execute("SELECT 1 FROM favorites WHERE user_id = ? AND url = ?", (user_id, url))
+        return c.fetchone() is not None
+    return await _run_read("is_favorite", _exists)
 
 
 async def add_favorite(user_id: int, url: str, title: str) -> None:
-    async with db_lock:
-        def _add() -> None:
-            with _connect_database() as conn:
-                c: sqlite3.Cursor = conn.cursor()
-                c.execute("INSERT OR IGNORE INTO users (user_id, guild_id) VALUES (?, ?)", (user_id, 0))
-                c.execute("INSERT OR REPLACE INTO favorites (user_id, url, title) VALUES (?, ?, ?)", (user_id, url, title))
-                conn.commit()
-        await asyncio.to_thread(_add)
+    def _add(conn: sqlite3.Connection) -> None:
+        c: sqlite3.Cursor = conn.cursor()
+        c.execute("INSERT OR IGNORE INTO users (user_id, guild_id) VALUES (?, ?)", (user_id, 0))
+        c.execute("INSERT OR REPLACE INTO favorites (user_id, url, title) VALUES (?, ?, ?)", (user_id, url, title))
+    try:
+        await _run_write("add_favorite", _add)
+    finally:
+        _after_commit(lambda: _favorites_cache.invalidate(user_id))
+
+
+def _delete_favorites(c: sqlite3.Cursor, user_id: int, urls: List[str]) -> int:
+    """Delete many of one user's favorites in a single statement."""
+    # URL 목록을 JSON 배열 하나로 바인딩하므로 개수와 관계없이 문장 하나로 끝나고,
+    # 기본 키 (user_id, url) 인덱스로 대상 행만 찾습니다.
+    c.execute(
+        "DELETE FROM favorites WHERE user_id = ? AND url IN (SELECT value FROM json_each(?))",
+        (user_id, json.dumps(urls)),
+    )
+    return c.rowcount
 
 
 async def remove_favorites(user_id: int, urls: List[str]) -> int:
-    async with db_lock:
-        def _remove() -> int:
-            with _connect_database() as conn:
-                c: sqlite3.Cursor = conn.cursor()
-                deleted_count: int = 0
-                for url in urls:
-                    c.execute("DELETE FROM favorites WHERE user_id = ? AND url = ?", (user_id, url))
-                    deleted_count += c.rowcount
-                conn.commit()
-                return deleted_count
-        return await asyncio.to_thread(_remove)
+    def _remove(conn: sqlite3.Connection) -> int:
+        return _delete_favorites(conn.cursor(), user_id, urls)
+    if not urls:
+        return 0
+    try:
+        return await _run_write("remove_favorites", _remove)
+    finally:
+        _after_commit(lambda: _favorites_cache.invalidate(user_id))
 
 
 async def get_music_settings() -> Dict[str, Any]:
-    async with db_lock:
-        def _get() -> Dict[str, Any]:
-            with _connect_database() as conn:
-                conn.row_factory = sqlite3.Row
-                c: sqlite3.Cursor = conn.cursor()
-                res: Dict[str, Any] = {}
-                c.execute("SELECT guild_id, volume FROM music_settings")
-                for row in c.fetchall():
-                    gid: str = str(row['guild_id'])
-                    if gid not in res:
-                        res[gid] = {"play_counts": {}}
-                    res[gid]["volume"] = row['volume']
-                
-                c.execute("SELECT guild_id, url, title, play_count FROM music_play_counts")
-                for row in c.fetchall():
-                    gid: str = str(row['guild_id'])
-                    if gid not in res:
-                        res[gid] = {"volume": 1.0, "play_counts": {}}
-                    if "play_counts" not in res[gid]:
-                        res[gid]["play_counts"] = {}
-                    res[gid]["play_counts"][row['url']] = {"title": row['title'], "count": row['play_count']}
-                return res
-        return await asyncio.to_thread(_get)
+    def _get(conn: sqlite3.Connection) -> Dict[str, Any]:
+        c: sqlite3.Cursor = conn.cursor()
+        res: Dict[str, Any] = {}
+        c.execute("SELECT guild_id, volume FROM music_settings")
+        for row in c.fetchall():
+            gid: str = str(row['guild_id'])
+            if gid not in res:
+                res[gid] = {"play_counts": {}}
+            res[gid]["volume"] = row['volume']
+
+        c.execute("SELECT guild_id, url, title, play_count FROM music_play_counts")
+        for row in c.fetchall():
+            gid: str = str(row['guild_id'])
+            if gid not in res:
+                res[gid] = {"volume": 1.0, "play_counts": {}}
+            if "play_counts" not in res[gid]:
+                res[gid]["play_counts"] = {}
+            res[gid]["play_counts"][row['url']] = {"title": row['title'], "count": row['play_count']}
+        return res
+    return await _run_read("get_music_settings", _get)
+
+
+async def get_guild_music_settings(guild_id: int) -> Dict[str, Any]:
+    """Return one guild's saved settings, or an empty dict if it has none."""
+    def _get(conn: sqlite3.Connection) -> Optional[float]:
+        c: sqlite3.Cursor = conn.cursor()
+        c.execute("SELECT volume FROM music_settings WHERE guild_id = ?", (guild_id,))
+        row = c.fetchone()
+        return row['volume'] if row else None
+
+    volume = await _music_settings_cache.load(
+        guild_id,
+        lambda: _run_read("get_guild_music_settings", _get),
+    )
+    return {} if volume is None else {"volume": volume}
 
 
 async def update_music_volume(guild_id: int, volume: float) -> None:
-    async with db_lock:
-        def _update() -> None:
-            with _connect_database() as conn:
-                c: sqlite3.Cursor = conn.cursor()
-                c.execute("INSERT OR IGNORE INTO music_settings (guild_id, volume) VALUES (?, ?)", (guild_id, volume))
-                c.execute("UPDATE music_settings SET volume = ? WHERE guild_id = ?", (volume, guild_id))
-                conn.commit()
-        await asyncio.to_thread(_update)
+    def _update(conn: sqlite3.Connection) -> None:
+        c: sqlite3.Cursor = conn.cursor()
+        c.execute("INSERT OR IGNORE INTO music_settings (guild_id, volume) VALUES (?, ?)", (guild_id, volume))
+        c.execute("UPDATE music_settings SET volume = ? WHERE guild_id = ?", (volume, guild_id))
+    try:
+        await _run_write("update_music_volume", _update)
+    finally:
+        _after_commit(lambda: _music_settings_cache.invalidate(guild_id))
+
+
+PLAY_COUNT_KEEP: int = 50
+
+
+def _trim_play_counts(c: sqlite3.Cursor, guild_id: int) -> None:
+    """Keep only the 50 most played songs for one guild."""
+    # idx_play_counts_guild_count를 역순으로 읽어 상위 50곡 뒤의 행을 한 문장으로 지웁니다.
+    c.execute(
+        """
+        DELETE FROM music_play_counts
+        WHERE guild_id = ? AND url IN (
+            SELECT url FROM music_play_counts WHERE guild_id = ?
+            ORDER BY play_count DESC LIMIT -1 OFFSET ?
+        )
+        """,
+        (guild_id, guild_id, PLAY_COUNT_KEEP),
+    )
 
 
 async def increment_play_count_db(guild_id: int, url: str, title: str) -> None:
-    async with db_lock:
-        def _update() -> None:
-            with _connect_database() as conn:
-                c: sqlite3.Cursor = conn.cursor()
-                c.execute("INSERT OR IGNORE INTO music_play_counts (guild_id, url, title, play_count) VALUES (?, ?, ?, 0)", (guild_id, url, title))
-                c.execute("UPDATE music_play_counts SET play_count = play_count + 1, title = ? WHERE guild_id = ? AND url = ?", (title, guild_id, url))
-                
-                c.execute("SELECT url FROM music_play_counts WHERE guild_id = ? ORDER BY play_count DESC LIMIT -1 OFFSET 50", (guild_id,))
-                to_delete: List[str] = [r[0] for r in c.fetchall()]
-                for del_url in to_delete:
-                    c.execute("DELETE FROM music_play_counts WHERE guild_id = ? AND url = ?", (guild_id, del_url))
-                conn.commit()
-        await asyncio.to_thread(_update)
+    def _update(conn: sqlite3.Connection) -> None:
+        c: sqlite3.Cursor = conn.cursor()
+        c.execute("INSERT OR IGNORE INTO music_play_counts (guild_id, url, title, play_count) VALUES (?, ?, ?, 0)", (guild_id, url, title))
+        c.execute("UPDATE music_play_counts SET play_count = play_count + 1, title = ? WHERE guild_id = ? AND url = ?", (title, guild_id, url))
+
+        _trim_play_counts(c, guild_id)
+    try:
+        await _run_write("increment_play_count_db", _update)
+    finally:
+        _after_commit(lambda: _invalidate_top_songs((guild_id,)))
 
 
 async def get_top_played_songs_db(guild_id: int, limit: int = 5) -> List[Dict[str, Any]]:
-    async with db_lock:
-        def _get() -> List[Dict[str, Any]]:
-            with _connect_database() as conn:
-                conn.row_factory = sqlite3.Row
-                c: sqlite3.Cursor = conn.cursor()
-                c.execute("SELECT url, title, play_count as count FROM music_play_counts WHERE guild_id = ? ORDER BY play_count DESC LIMIT ?", (guild_id, limit))
-                return [dict(row) for row in c.fetchall()]
-        return await asyncio.to_thread(_get)
+    def _get(conn: sqlite3.Connection) -> Tuple[Tuple[str, str, int], ...]:
+        c: sqlite3.Cursor = conn.cursor()
+        c.execute("SELECT url, title, play_count as count FROM music_play_counts WHERE guild_id = ? ORDER BY play_count DESC LIMIT ?", (guild_id, limit))
+        return tuple((row['url'], row['title'], row['count']) for row in c.fetchall())
+
+    # 재생 중 UI는 10초마다 갱신되므로 재생 횟수가 바뀔 때까지 결과를 재사용합니다.
+    rows = await _top_songs_cache.load(
+        (guild_id, limit),
+        lambda: _run_read("get_top_played_songs_db", _get),
+    )
+    return [{"url": url, "title": title, "count": count} for url, title, count in rows]
 
 
 # ==========================================
@@ -549,100 +2205,196 @@ async def get_top_played_songs_db(guild_id: int, limit: int = 5) -> List[Dict[st
 # ==========================================
 
 async def get_user_data(user_id: int, guild_id: int) -> Optional[Dict[str, Any]]:
-    async with db_lock:
-        def _get() -> Optional[Dict[str, Any]]:
-            with _connect_database() as conn:
-                conn.row_factory = sqlite3.Row
-                c: sqlite3.Cursor = conn.cursor()
-                c.execute("SELECT user_id, guild_id, xp, level, total_vc_seconds FROM users WHERE user_id = ? AND guild_id = ?", (user_id, guild_id))
-                row = c.fetchone()
-                return dict(row) if row else None
-        return await asyncio.to_thread(_get)
+    def _get(conn: sqlite3.Connection) -> Optional[Dict[str, Any]]:
+        c: sqlite3.Cursor = conn.cursor()
+        c.execute("SELECT user_id, guild_id, xp, level, total_vc_seconds FROM users WHERE user_id = ? AND guild_id = ?", (user_id, guild_id))
+        row = c.fetchone()
+        return dict(row) if row else None
+    return await _run_read("get_user_data", _get)
 
 
 async def update_user_xp(user_id: int, guild_id: int, xp_added: int, vc_sec_added: int = 0, new_level: Optional[int] = None) -> None:
-    async with db_lock:
-        def _update() -> None:
-            with _connect_database() as conn:
-                c: sqlite3.Cursor = conn.cursor()
-                
-                # 먼저 데이터가 있는지 검사하고 없으면 기본값으로 생성
-                c.execute("INSERT OR IGNORE INTO users (user_id, guild_id) VALUES (?, ?)", (user_id, guild_id))
-
-                if new_level is not None:
-                    c.execute("UPDATE users SET xp = xp + ?, total_vc_seconds = total_vc_seconds + ?, level = ? WHERE user_id = ? AND guild_id = ?",
-                              (xp_added, vc_sec_added, new_level, user_id, guild_id))
-                else:
-                    c.execute("UPDATE users SET xp = xp + ?, total_vc_seconds = total_vc_seconds + ? WHERE user_id = ? AND guild_id = ?",
-                              (xp_added, vc_sec_added, user_id, guild_id))
-                conn.commit()
-        await asyncio.to_thread(_update)
-
-
-async def get_top_users(guild_id: int, limit: int = 10, vc_xp_per_min: int = 5) -> List[Dict[str, Any]]:
-    async with db_lock:
-        def _get() -> List[Dict[str, Any]]:
-            with _connect_database() as conn:
-                conn.row_factory = sqlite3.Row
-                c: sqlite3.Cursor = conn.cursor()
-                
-                # 순수하게 현재 서버(guild_id)의 데이터만 가져와 랭킹을 산정합니다.
-                c.execute('''
-                    SELECT user_id, xp, level, total_vc_seconds,
-                           (xp + (total_vc_seconds / 60) * ?) as total_xp
-                    FROM users 
-                    WHERE guild_id = ?
-                    ORDER BY total_xp DESC
-                    LIMIT ?
-                ''', (vc_xp_per_min, guild_id, limit))
-                
-                rows: List[Dict[str, Any]] = [dict(row) for row in c.fetchall()]
-                return rows
-        return await asyncio.to_thread(_get)
+    def _update(conn: sqlite3.Connection) -> None:
+        c: sqlite3.Cursor = conn.cursor()
+
+        # 먼저 데이터가 있는지 검사하고 없으면 기본값으로 생성
+        c.execute("INSERT OR IGNORE INTO users (user_id, guild_id) VALUES (?, ?)", (user_id, guild_id))
+
+        if new_level is not None:
+            c.execute("UPDATE users SET xp = xp + ?, total_vc_seconds = total_vc_seconds + ?, level = ? WHERE user_id = ? AND guild_id = ?",
+                      (xp_added, vc_sec_added, new_level, user_id, guild_id))
+        else:
+            c.execute("UPDATE users SET xp = xp + ?, total_vc_seconds = total_vc_seconds + ? WHERE user_id = ? AND guild_id = ?",
+                      (xp_added, vc_sec_added, user_id, guild_id))
+    await _run_write("update_user_xp", _update)
+
+
+_ADD_USER_XP_SQL: str = """
+    INSERT INTO users (user_id, guild_id, xp, total_vc_seconds)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(user_id, guild_id) DO UPDATE SET
+        xp = xp + excluded.xp,
+        total_vc_seconds = total_vc_seconds + excluded.total_vc_seconds
+    RETURNING xp, level, total_vc_seconds
+"""
+
+
+_ROLLUP_XP_SQL: str = """
+    INSERT INTO xp_daily (guild_id, day, user_id, xp, vc_seconds)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(guild_id, day, user_id) DO UPDATE SET
+        xp = xp + excluded.xp,
+        vc_seconds = vc_seconds + excluded.vc_seconds
+"""
+
+
+def _xp_rollup_day(now: Optional[datetime] = None) -> str:
+    """Return the KST calendar day (YYYY-MM-DD) an XP delta is bucketed under."""
+    current = now or datetime.now(XP_ROLLUP_TZ)
+    return current.astimezone(XP_ROLLUP_TZ).date().isoformat()
+
+
+def _period_start_day(period: str, today: date) -> str:
+    if period == "daily":
+        start = today
+    elif period == "weekly":
+        start = today - timedelta(days=today.weekday())
+    elif period == "monthly":
+        start = today.replace(day=1)
+    else:
+        raise ValueError(f"Unknown leaderboard period: {period}")
+    return start.isoformat()
+
+
+async def add_user_xp(user_id: int, guild_id: int, xp_added: int, vc_sec_added: int = 0) -> Dict[str, int]:
+    """Apply an XP delta atomically and return the new xp, level, and total_vc_seconds."""
+    day: str = _xp_rollup_day()
+
+    def _add(conn: sqlite3.Connection) -> Dict[str, int]:
+        row = conn.execute(_ADD_USER_XP_SQL, (user_id, guild_id, xp_added, vc_sec_added)).fetchone()
+        if xp_added or vc_sec_added:
+            conn.execute(_ROLLUP_XP_SQL, (guild_id, day, user_id, xp_added, vc_sec_added))
+        return dict(row)
+    return await _run_write("add_user_xp", _add)
+
+
+async def update_user_level(user_id: int, guild_id: int, level: int) -> None:
+    def _update(conn: sqlite3.Connection) -> None:
+        conn.execute("UPDATE users SET level = ? WHERE user_id = ? AND guild_id = ?", (level, user_id, guild_id))
+    await _run_write("update_user_level", _update)
+
+
+async def get_top_users(guild_id: int, limit: int = 10) -> List[Dict[str, Any]]:
+    page: Dict[str, Any] = await get_leaderboard_page(guild_id, page=0, page_size=limit)
+    return page["rows"]
+
+
+async def get_leaderboard_page(guild_id: int, page: int = 0, page_size: int = 10) -> Dict[str, Any]:
+    """Return one leaderboard page ordered by the indexed total_xp column."""
+    def _get(conn: sqlite3.Connection) -> Dict[str, Any]:
+        c: sqlite3.Cursor = conn.cursor()
+
+        # 순수하게 현재 서버(guild_id)의 데이터만 가져와 랭킹을 산정합니다.
+        c.execute("SELECT COUNT(*) FROM users WHERE guild_id = ?", (guild_id,))
+        total_users: int = c.fetchone()[0]
+        c.execute('''
+            SELECT user_id, xp, level, total_vc_seconds, total_xp
+            FROM users
+            WHERE guild_id = ?
+            ORDER BY total_xp DESC, user_id
+            LIMIT ? OFFSET ?
+        ''', (guild_id, page_size, page * page_size))
+
+        rows: List[Dict[str, Any]] = [dict(row) for row in c.fetchall()]
+        return {"rows": rows, "total_users": total_users, "page": page, "page_size": page_size}
+    return await _run_read("get_leaderboard_page", _get)
+
+
+async def get_user_rank(user_id: int, guild_id: int) -> Optional[Dict[str, int]]:
+    """Return the user's position in the guild, matching ``get_leaderboard_page`` order."""
+    def _get(conn: sqlite3.Connection) -> Optional[Dict[str, int]]:
+        c: sqlite3.Cursor = conn.cursor()
+        c.execute("SELECT total_xp FROM users WHERE user_id = ? AND guild_id = ?", (user_id, guild_id))
+        row = c.fetchone()
+        if row is None:
+            return None
+        total_xp: int = row[0]
+        # 인덱스에서 자신보다 앞에 오는 구간만 세어 순위를 구합니다.
+        # 동점은 랭킹 페이지와 같이 user_id가 작은 쪽이 앞섭니다.
+        # OR로 묶으면 범위 검색을 못 쓰므로 두 인덱스 범위의 개수를 더합니다.
+        c.execute(
+            "SELECT (SELECT COUNT(*) FROM users WHERE guild_id = ? AND total_xp > ?) + "
+            "(SELECT COUNT(*) FROM users WHERE guild_id = ? AND total_xp = ? AND user_id < ?)",
+            (guild_id, total_xp, guild_id, total_xp, user_id),
+        )
+        higher: int = c.fetchone()[0]
+        c.execute("SELECT COUNT(*) FROM users WHERE guild_id = ?", (guild_id,))
+        return {"rank": higher + 1, "total_xp": total_xp, "ranked_users": c.fetchone()[0]}
+    return await _run_read("get_user_rank", _get)
+
+async def get_period_leaderboard_page(guild_id: int, period: str, page: int = 0, page_size: int = 10) -> Dict[str, Any]:
+    """Return one page of the daily/weekly/monthly leaderboard from xp_daily buckets."""
+    start_day: str = _period_start_day(period, datetime.now(XP_ROLLUP_TZ).date())
+
+    def _get(conn: sqlite3.Connection) -> Dict[str, Any]:
+        c: sqlite3.Cursor = conn.cursor()
+        c.execute("SELECT COUNT(DISTINCT user_id) FROM xp_daily WHERE guild_id = ? AND day >= ?", (guild_id, start_day))
+        total_users: int = c.fetchone()[0]
+        c.execute('''
+            SELECT user_id, SUM(xp) AS xp, SUM(vc_seconds) AS total_vc_seconds,
+                   SUM(xp) + (SUM(vc_seconds) / 60) * ? AS total_xp
+            FROM xp_daily
+            WHERE guild_id = ? AND day >= ?
+            GROUP BY user_id
+            ORDER BY total_xp DESC, user_id
+            LIMIT ? OFFSET ?
+        ''', (VC_XP_PER_MIN, guild_id, start_day, page_size, page * page_size))
+
+        rows: List[Dict[str, Any]] = [dict(row) for row in c.fetchall()]
+        return {"rows": rows, "total_users": total_users, "page": page, "page_size": page_size}
+    return await _run_read("get_period_leaderboard_page", _get)
+
+
+async def prune_xp_rollups(retention_days: int = XP_ROLLUP_RETENTION_DAYS) -> int:
+    """Delete day buckets older than the retention window and return the row count."""
+    cutoff: str = (datetime.now(XP_ROLLUP_TZ).date() - timedelta(days=retention_days)).isoformat()
+
+    def _prune(conn: sqlite3.Connection) -> int:
+        return conn.execute("DELETE FROM xp_daily WHERE day < ?", (cutoff,)).rowcount
+    return await _run_write("prune_xp_rollups", _prune)
+
 
 # ==========================================
 # 생일 기능 DB 함수
 # ==========================================
 
 async def add_birthday(user_id: int, guild_id: int, month: int, day: int) -> None:
-    async with db_lock:
-        def _add() -> None:
-            with _connect_database() as conn:
-                c: sqlite3.Cursor = conn.cursor()
-                c.execute("INSERT OR IGNORE INTO users (user_id, guild_id) VALUES (?, ?)", (user_id, guild_id))
-                c.execute("UPDATE users SET birth_month = ?, birth_day = ? WHERE user_id = ? AND guild_id = ?", (month, day, user_id, guild_id))
-                conn.commit()
-        await asyncio.to_thread(_add)
+    def _add(conn: sqlite3.Connection) -> None:
+        c: sqlite3.Cursor = conn.cursor()
+        c.execute("INSERT OR IGNORE INTO users (user_id, guild_id) VALUES (?, ?)", (user_id, guild_id))
+        c.execute("UPDATE users SET birth_month = ?, birth_day = ? WHERE user_id = ? AND guild_id = ?", (month, day, user_id, guild_id))
+    await _run_write("add_birthday", _add)
 
 async def remove_birthday(user_id: int, guild_id: int) -> int:
-    async with db_lock:
-        def _remove() -> int:
-            with _connect_database() as conn:
-                c: sqlite3.Cursor = conn.cursor()
-                c.execute("UPDATE users SET birth_month = NULL, birth_day = NULL WHERE user_id = ? AND guild_id = ?", (user_id, guild_id))
-                updated = c.rowcount
-                conn.commit()
-                return updated
-        return await asyncio.to_thread(_remove)
+    def _remove(conn: sqlite3.Connection) -> int:
+        c: sqlite3.Cursor = conn.cursor()
+        c.execute("UPDATE users SET birth_month = NULL, birth_day = NULL WHERE user_id = ? AND guild_id = ?", (user_id, guild_id))
+        return c.rowcount
+    return await _run_write("remove_birthday", _remove)
 
 async def get_birthdays_today(guild_id: int, month: int, day: int) -> List[int]:
-    async with db_lock:
-        def _get() -> List[int]:
-            with _connect_database() as conn:
-                c: sqlite3.Cursor = conn.cursor()
-                c.execute("SELECT user_id FROM users WHERE guild_id = ? AND birth_month = ? AND birth_day = ?", (guild_id, month, day))
-                return [row[0] for row in c.fetchall()]
-        return await asyncio.to_thread(_get)
+    def _get(conn: sqlite3.Connection) -> List[int]:
+        c: sqlite3.Cursor = conn.cursor()
+        c.execute("SELECT user_id FROM users WHERE guild_id = ? AND birth_month = ? AND birth_day = ?", (guild_id, month, day))
+        return [row[0] for row in c.fetchall()]
+    return await _run_read("get_birthdays_today", _get)
 
 async def get_all_birthdays(guild_id: int) -> List[Dict[str, int]]:
-    async with db_lock:
-        def _get() -> List[Dict[str, int]]:
-            with _connect_database() as conn:
-                conn.row_factory = sqlite3.Row
-                c: sqlite3.Cursor = conn.cursor()
-                c.execute("SELECT user_id, birth_month as month, birth_day as day FROM users WHERE guild_id = ? AND birth_month IS NOT NULL ORDER BY birth_month, birth_day", (guild_id,))
-                return [dict(row) for row in c.fetchall()]
-        return await asyncio.to_thread(_get)
+    def _get(conn: sqlite3.Connection) -> List[Dict[str, int]]:
+        c: sqlite3.Cursor = conn.cursor()
+        c.execute("SELECT user_id, birth_month as month, birth_day as day FROM users WHERE guild_id = ? AND birth_month IS NOT NULL ORDER BY birth_month, birth_day", (guild_id,))
+        return [dict(row) for row in c.fetchall()]
+    return await _run_read("get_all_birthdays", _get)
 
 
 # ==========================================
@@ -650,95 +2402,304 @@ async def get_all_birthdays(guild_id: int) -> List[Dict[str, int]]:
 # ==========================================
 
 async def add_watch_session(session_id: str, guild_id: int, created_by: int, channel_id: Optional[int] = None, message_id: Optional[int] = None) -> None:
-    async with db_lock:
-        def _add() -> None:
-            with _connect_database() as conn:
-                c: sqlite3.Cursor = conn.cursor()
-                c.execute(
-                    "INSERT OR REPLACE INTO watch_sessions (session_id, guild_id, created_by, channel_id, message_id) VALUES (?, ?, ?, ?, ?)",
-                    (session_id, guild_id, created_by, channel_id, message_id)
-                )
-                conn.commit()
-        await asyncio.to_thread(_add)
+    def _add(conn: sqlite3.Connection) -> None:
+        c: sqlite3.Cursor = conn.cursor()
+        c.execute(
+            "INSERT OR REPLACE INTO watch_sessions (session_id, guild_id, created_by, channel_id, message_id) VALUES (?, ?, ?, ?, ?)",
+            (session_id, guild_id, created_by, channel_id, message_id)
+        )
+    await _run_write("add_watch_session", _add)
 
 
 async def get_watch_session(session_id: str) -> Optional[Dict[str, Any]]:
-    async with db_lock:
-        def _get() -> Optional[Dict[str, Any]]:
-            with _connect_database() as conn:
-                conn.row_factory = sqlite3.Row
-                c: sqlite3.Cursor = conn.cursor()
-                c.execute("SELECT session_id, guild_id, created_by, created_at, channel_id, message_id FROM watch_sessions WHERE session_id = ?", (session_id,))
-                row = c.fetchone()
-                return dict(row) if row else None
-        return await asyncio.to_thread(_get)
+    def _get(conn: sqlite3.Connection) -> Optional[Dict[str, Any]]:
+        c: sqlite3.Cursor = conn.cursor()
+        c.execute("SELECT session_id, guild_id, created_by, created_at, channel_id, message_id FROM watch_sessions WHERE session_id = ?", (session_id,))
+        row = c.fetchone()
+        return dict(row) if row else None
+    return await _run_read("get_watch_session", _get)
 
 
 async def get_all_watch_sessions() -> List[Dict[str, Any]]:
     """Return all persisted Watch Together sessions for startup reconciliation."""
-    async with db_lock:
-        def _get() -> List[Dict[str, Any]]:
-            with _connect_database() as conn:
-                conn.row_factory = sqlite3.Row
-                rows = conn.execute(
-                    """
-                    SELECT session_id, guild_id, created_by, created_at,
-                           channel_id, message_id
-                    FROM watch_sessions
-                    ORDER BY created_at ASC
-                    """
-                ).fetchall()
-                return [dict(row) for row in rows]
-
-        return await asyncio.to_thread(_get)
+    def _get(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+        rows = conn.execute(
+            """
+            SELECT session_id, guild_id, created_by, created_at,
+                   channel_id, message_id
+            FROM watch_sessions
+            ORDER BY created_at ASC
+            """
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    return await _run_read("get_all_watch_sessions", _get)
 
 
 async def delete_watch_session(session_id: str) -> None:
-    async with db_lock:
-        def _delete() -> None:
-            with _connect_database() as conn:
-                c: sqlite3.Cursor = conn.cursor()
-                c.execute("DELETE FROM watch_sessions WHERE session_id = ?", (session_id,))
-                c.execute("DELETE FROM watch_playlists WHERE session_id = ?", (session_id,))
-                conn.commit()
-        await asyncio.to_thread(_delete)
+    def _delete(conn: sqlite3.Connection) -> None:
+        c: sqlite3.Cursor = conn.cursor()
+        c.execute("DELETE FROM watch_sessions WHERE session_id = ?", (session_id,))
+        c.execute("DELETE FROM watch_playlists WHERE session_id = ?", (session_id,))
+    await _run_write("delete_watch_session", _delete)
 
 
 async def get_watch_playlist(session_id: str) -> List[Dict[str, Any]]:
-    async with db_lock:
-        def _get() -> List[Dict[str, Any]]:
-            with _connect_database() as conn:
-                conn.row_factory = sqlite3.Row
-                c: sqlite3.Cursor = conn.cursor()
-                c.execute(
-                    "SELECT video_url, video_title, added_by, order_index FROM watch_playlists WHERE session_id = ? ORDER BY order_index ASC",
-                    (session_id,)
-                )
-                return [dict(row) for row in c.fetchall()]
-        return await asyncio.to_thread(_get)
+    def _get(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+        c: sqlite3.Cursor = conn.cursor()
+        c.execute(
+            "SELECT video_url, video_title, added_by, order_index FROM watch_playlists WHERE session_id = ? ORDER BY order_index ASC",
+            (session_id,)
+        )
+        return [dict(row) for row in c.fetchall()]
+    return await _run_read("get_watch_playlist", _get)
 
 
 async def add_to_watch_playlist(session_id: str, video_url: str, video_title: str, added_by: str) -> None:
-    async with db_lock:
-        def _add() -> None:
-            with _connect_database() as conn:
-                c: sqlite3.Cursor = conn.cursor()
-                c.execute("SELECT COALESCE(MAX(order_index), 0) FROM watch_playlists WHERE session_id = ?", (session_id,))
-                max_idx = c.fetchone()[0]
-                
-                c.execute(
-                    "INSERT OR REPLACE INTO watch_playlists (session_id, video_url, video_title, added_by, order_index) VALUES (?, ?, ?, ?, ?)",
-                    (session_id, video_url, video_title, added_by, max_idx + 1)
-                )
-                conn.commit()
-        await asyncio.to_thread(_add)
+    def _add(conn: sqlite3.Connection) -> None:
+        c: sqlite3.Cursor = conn.cursor()
+        c.execute("SELECT COALESCE(MAX(order_index), 0) FROM watch_playlists WHERE session_id = ?", (session_id,))
+        max_idx = c.fetchone()[0]
+
+        c.execute(
+            "INSERT OR REPLACE INTO watch_playlists (session_id, video_url, video_title, added_by, order_index) VALUES (?, ?, ?, ?, ?)",
+            (session_id, video_url, video_title, added_by, max_idx + 1)
+        )
+    await _run_write("add_to_watch_playlist", _add)
 
 
 async def remove_from_watch_playlist(session_id: str, video_url: str) -> None:
-    async with db_lock:
-        def _remove() -> None:
-            with _connect_database() as conn:
-                c: sqlite3.Cursor = conn.cursor()
-                c.execute("DELETE FROM watch_playlists WHERE session_id = ? AND video_url = ?", (session_id, video_url))
-                conn.commit()
-        await asyncio.to_thread(_remove)
+    def _remove(conn: sqlite3.Connection) -> None:
+        c: sqlite3.Cursor = conn.cursor()
+        c.execute("DELETE FROM watch_playlists WHERE session_id = ? AND video_url = ?", (session_id, video_url))
+    await _run_write("remove_from_watch_playlist", _remove)
+
+
+# ==========================================
+# 쓰기 지연(Write-behind) 버퍼
+# ==========================================
+# 메시지 XP와 재생 횟수는 이벤트마다 커밋하지 않고 메모리에서 키별로 합친 뒤,
+# 일정 시간이 지나거나 대기 행이 많아지면 하나의 트랜잭션으로 반영합니다.
+WRITE_BEHIND_FLUSH_SECONDS: float = float(os.getenv("WRITE_BEHIND_FLUSH_SECONDS", "5"))
+WRITE_BEHIND_MAX_PENDING: int = max(1, int(os.getenv("WRITE_BEHIND_MAX_PENDING", "500")))
+
+
+def _flush_pending_writes(
+    conn: sqlite3.Connection,
+    xp_deltas: Dict[Tuple[int, int], List[int]],
+    play_deltas: Dict[Tuple[int, str], List[Any]],
+    level_resolver: Optional[Callable[[int, int], int]],
+    day: str,
+) -> None:
+    c: sqlite3.Cursor = conn.cursor()
+    if xp_deltas:
+        c.executemany(
+            _ROLLUP_XP_SQL,
+            [
+                (guild_id, day, user_id, xp_added, vc_sec_added)
+                for (user_id, guild_id), (xp_added, vc_sec_added) in xp_deltas.items()
+                if xp_added or vc_sec_added
+            ],
+        )
+        # RETURNING으로 반영 직후 값을 받아 레벨 캐시가 올라간 행만 갱신합니다.
+        level_updates: List[Tuple[int, int, int]] = []
+        for (user_id, guild_id), (xp_added, vc_sec_added) in xp_deltas.items():
+            xp, level, total_vc_seconds = c.execute(
+                _ADD_USER_XP_SQL,
+                (user_id, guild_id, xp_added, vc_sec_added),
+            ).fetchone()
+            if level_resolver is not None:
+                new_level = level_resolver(xp, total_vc_seconds)
+                if new_level > level:
+                    level_updates.append((new_level, user_id, guild_id))
+        c.executemany(
+            "UPDATE users SET level = ? WHERE user_id = ? AND guild_id = ?",
+            level_updates,
+        )
+
+    if play_deltas:
+        c.executemany(
+            """
+            INSERT INTO music_play_counts (guild_id, url, title, play_count)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(guild_id, url) DO UPDATE SET
+                play_count = play_count + excluded.play_count,
+                title = excluded.title
+            """,
+            [
+                (guild_id, url, title, count)
+                for (guild_id, url), (title, count) in play_deltas.items()
+            ],
+        )
+        for guild_id in {guild_id for guild_id, _ in play_deltas}:
+            _trim_play_counts(c, guild_id)
+
+
+class WriteBehindBuffer:
+    """Merge XP and play-count deltas in memory and flush them in one transaction."""
+
+    def __init__(self, flush_interval: float, max_pending: int) -> None:
+        self.flush_interval: float = flush_interval
+        self.max_pending: int = max_pending
+        # 레벨 캐시 계산 규칙은 레벨링 Cog가 등록합니다. (xp, total_vc_seconds) -> level
+        self.level_resolver: Optional[Callable[[int, int], int]] = None
+        self.flushed_rows: int = 0
+        self.flush_count: int = 0
+        self.failed_flushes: int = 0
+        self._xp: Dict[Tuple[int, int], List[int]] = {}
+        self._plays: Dict[Tuple[int, str], List[Any]] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional["asyncio.Task[int]"] = None
+        self._write_task: Optional["asyncio.Task[int]"] = None
+        self._flush_lock: asyncio.Lock = asyncio.Lock()
+
+    @property
+    def pending_rows(self) -> int:
+        return len(self._xp) + len(self._plays)
+
+    def add_xp(self, user_id: int, guild_id: int, xp_added: int, vc_sec_added: int = 0) -> None:
+        entry = self._xp.setdefault((user_id, guild_id), [0, 0])
+        entry[0] += xp_added
+        entry[1] += vc_sec_added
+        self._schedule_flush()
+
+    def add_play(self, guild_id: int, url: str, title: str) -> None:
+        entry = self._plays.get((guild_id, url))
+        if entry is None:
+            self._plays[(guild_id, url)] = [title, 1]
+        else:
+            entry[0] = title
+            entry[1] += 1
+        self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        if self.pending_rows >= self.max_pending:
+            self._start_background_flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self.flush_interval,
+                self._start_background_flush,
+            )
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _start_background_flush(self) -> None:
+        self._cancel_timer()
+        if self._flush_task is None or self._flush_task.done():
+            # 열린 transaction() 안에서 예약되어도 블록에 합류하지 않고 따로 커밋합니다.
+            context = copy_context()
+            context.run(_current_unit_of_work.set, None)
+            self._flush_task = context.run(asyncio.get_running_loop().create_task, self.flush())
+            self._flush_task.add_done_callback(self._after_background_flush)
+
+    def _after_background_flush(self, task: "asyncio.Task[int]") -> None:
+        # 반영 중에 타이머가 만료되면 새 작업을 만들지 않으므로, 그 사이 쌓인 값의 반영을 다시 예약합니다.
+        if self.pending_rows:
+            self._schedule_flush()
+
+    def _restore(
+        self,
+        xp_deltas: Dict[Tuple[int, int], List[int]],
+        play_deltas: Dict[Tuple[int, str], List[Any]],
+    ) -> None:
+        # 실패한 배치를 버리지 않고 그 사이 쌓인 값과 다시 합칩니다.
+        for key, (xp_added, vc_sec_added) in xp_deltas.items():
+            entry = self._xp.setdefault(key, [0, 0])
+            entry[0] += xp_added
+            entry[1] += vc_sec_added
+        for key, (title, count) in play_deltas.items():
+            entry = self._plays.get(key)
+            if entry is None:
+                self._plays[key] = [title, count]
+            else:
+                entry[1] += count
+
+    async def flush(self) -> int:
+        """Write every pending delta now and return the number of flushed rows."""
+        if _active_unit_of_work() is not None:
+            # 호출자의 트랜잭션이 롤백되면 꺼낸 값이 사라지므로 합류하지 않고,
+            # 블록이 끝나 쓰기 잠금이 풀린 뒤 백그라운드에서 반영합니다.
+            self._start_background_flush()
+            return 0
+        self._cancel_timer()
+        async with self._flush_lock:
+            if self._write_task is not None and not self._write_task.done():
+                # 취소된 이전 반영이 아직 쓰는 중이면 끝난 뒤에 이어서 반영합니다.
+                await asyncio.shield(self._write_task)
+            if not self.pending_rows:
+                return 0
+            xp_deltas, play_deltas = self._xp, self._plays
+            self._xp, self._plays = {}, {}
+            # 호출자가 취소되어도 꺼낸 값이 커밋되거나 버퍼로 되돌아가도록 쓰기를 별도 작업에서 끝냅니다.
+            self._write_task = asyncio.get_running_loop().create_task(
+                self._write_batch(xp_deltas, play_deltas)
+            )
+            return await asyncio.shield(self._write_task)
+
+    async def _write_batch(
+        self,
+        xp_deltas: Dict[Tuple[int, int], List[int]],
+        play_deltas: Dict[Tuple[int, str], List[Any]],
+    ) -> int:
+        try:
+            await _run_write(
+                "flush_write_behind",
+                _flush_pending_writes,
+                xp_deltas,
+                play_deltas,
+                self.level_resolver,
+                _xp_rollup_day(),
+            )
+        except BaseException as e:
+            self._restore(xp_deltas, play_deltas)
+            self.failed_flushes += 1
+            if not isinstance(e, Exception):
+                raise
+            logger.error(f"Write-behind flush failed; deltas kept for retry: {e}", exc_info=True)
+            self._schedule_flush()
+            return 0
+        finally:
+            changed_guilds = {guild_id for guild_id, _ in play_deltas}
+            _after_commit(lambda: _invalidate_top_songs(changed_guilds))
+
+        flushed = len(xp_deltas) + len(play_deltas)
+        self.flushed_rows += flushed
+        self.flush_count += 1
+        return flushed
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "pending_rows": self.pending_rows,
+            "pending_xp_rows": len(self._xp),
+            "pending_play_rows": len(self._plays),
+            "flushed_rows": self.flushed_rows,
+            "flush_count": self.flush_count,
+            "failed_flushes": self.failed_flushes,
+        }
+
+
+write_buffer: WriteBehindBuffer = WriteBehindBuffer(
+    WRITE_BEHIND_FLUSH_SECONDS,
+    WRITE_BEHIND_MAX_PENDING,
+)
+
+
+def buffer_user_xp(user_id: int, guild_id: int, xp_added: int, vc_sec_added: int = 0) -> None:
+    """Queue an XP delta; it reaches the DB on the next write-behind flush."""
+    write_buffer.add_xp(user_id, guild_id, xp_added, vc_sec_added)
+
+
+def buffer_play_count(guild_id: int, url: str, title: str) -> None:
+    """Queue one play of ``url``; it reaches the DB on the next write-behind flush."""
+    write_buffer.add_play(guild_id, url, title)
+
+
+async def flush_write_behind() -> int:
+    return await write_buffer.flush()
+
+
+def get_write_behind_stats() -> Dict[str, int]:
+    return write_buffer.stats()
@@ -55,6 +55,7 @@ class MyBot(commands.Bot):
     async def setup_hook(self) -> None:
         # DB 복구와 스키마 준비가 끝난 뒤에만 외부 요청과 Cog 이벤트를 받습니다.
         await asyncio.to_thread(database_manager.init_db)
+        await asyncio.to_thread(database_manager.open_connection_pool)
 
         import uvicorn
         from cogs.watch_together.watch_server import app
@@ -127,6 +128,11 @@ class MyBot(commands.Bot):
         self.webserver_task = None
         self.webserver = None
 
+        # Cog 언로드 중의 마지막 DB 정산까지 끝난 뒤 남은 쓰기 지연 버퍼를 반영하고
+        # 재사용 연결을 닫습니다.
+        await database_manager.flush_write_behind()
+        await asyncio.to_thread(database_manager.close_connection_pool)
+
 # --- 메인 실행 함수 ---
 def main() -> None:
     try:
@@ -8,26 +8,18 @@ set -u
 BOT_DIR="/home/os/bot"
 DATA_DIR="$BOT_DIR/data"
 LOG_FILE="$DATA_DIR/logs/backup.log"
-BACKUP_REPO_DIR=""
+DELTA_DIR="$DATA_DIR/database_backup.deltas"
+# 직전 업로드 커밋을 유지하는 로컬 저장소. 같은 기준 스냅샷 위에서는 새 변경분만
+# 커밋하므로 push에는 새 변경분 객체만 실립니다.
+BACKUP_REPO_DIR="$DATA_DIR/backup_repo"
 TIMESTAMP=""
 
 
-cleanup() {
-    if [ -n "$BACKUP_REPO_DIR" ] &&
-       [ -d "$BACKUP_REPO_DIR" ]; then
-        rm -rf -- "$BACKUP_REPO_DIR"
-    fi
-}
-
-
 log_failure() {
     echo "[$TIMESTAMP] ❌ $1" >> "$LOG_FILE"
     exit 1
 }
 
-
-trap cleanup EXIT
-
 # ==========================================
 # 1. 환경 설정 및 이동
 # ==========================================
@@ -38,8 +30,10 @@ TIMESTAMP="$(date "+%Y-%m-%d %H:%M:%S")"
 # ==========================================
 # 2. 암호화 SQL 덤프 생성
 # ==========================================
+# created: 새 백업/변경분 생성, unchanged: 마지막 백업 이후 DB 변경 없음
+BACKUP_OUTCOME="created"
 if [ -f "$DATA_DIR/bot_database.db" ]; then
-    if ! "$BOT_DIR/bot_env/bin/python" -c "
+    if ! BACKUP_OUTCOME="$("$BOT_DIR/bot_env/bin/python" -c "
 import sys
 import asyncio
 from pathlib import Path
@@ -51,16 +45,19 @@ load_dotenv(dotenv_path=bot_dir / '.env')
 import database_manager
 
 try:
-    success = asyncio.run(database_manager.backup_database_to_sql())
-    if not success:
-        sys.exit('Backup Error: backup_database_to_sql returned False')
+    outcome = asyncio.run(database_manager.run_scheduled_backup())
+    if outcome == database_manager.BACKUP_FAILED:
+        sys.exit('Backup Error: run_scheduled_backup failed')
+    print(outcome)
 except Exception as e:
     sys.exit(f'Backup Error: {e}')
-"; then
+")"; then
         log_failure "새 SQL 백업 생성에 실패했습니다. 기존 백업 업로드를 중단합니다."
     fi
 fi
 
+BACKUP_OUTCOME="$(printf '%s\n' "$BACKUP_OUTCOME" | tail -n 1)"
+
 # ==========================================
 # 3. 로컬 7일 보관 및 크기 검증
 # ==========================================
@@ -78,30 +75,34 @@ if [ "$FILE_SIZE" -lt 1024 ]; then
     log_failure "백업 파일 크기가 비정상적입니다 (${FILE_SIZE} bytes)."
 fi
 
-cp "$DATA_DIR/database_backup.sql" \
-    "$ARCHIVE_DIR/database_backup_$(date "+%Y%m%d_%H%M").sql" ||
-    log_failure "로컬 7일 보관용 백업을 만들 수 없습니다."
+# DB가 그대로면 같은 내용의 보관본을 또 만들지 않습니다. 업로드 단계는 직전 push가
+# 끝났는지만 로컬에서 확인하고 원격 왕복 없이 종료합니다.
+if [ "$BACKUP_OUTCOME" = "unchanged" ]; then
+    echo "[$TIMESTAMP] ✅ 마지막 백업 이후 DB 변경이 없어 새 보관본을 만들지 않습니다." \
+        >> "$LOG_FILE"
+else
+    ARCHIVE_STAMP="$(date "+%Y%m%d_%H%M")"
+    cp "$DATA_DIR/database_backup.sql" \
+        "$ARCHIVE_DIR/database_backup_$ARCHIVE_STAMP.sql" ||
+        log_failure "로컬 7일 보관용 백업을 만들 수 없습니다."
+
+    # 증분 백업이면 기준 스냅샷과 함께 복구해야 하는 변경분도 같은 시각으로 보관합니다.
+    if [ -d "$DELTA_DIR" ]; then
+        tar -cf "$ARCHIVE_DIR/database_backup_$ARCHIVE_STAMP.deltas.tar" \
+            -C "$DATA_DIR" "$(basename "$DELTA_DIR")" ||
+            log_failure "로컬 7일 보관용 변경분을 만들 수 없습니다."
+    fi
+fi
 
-if ! find "$ARCHIVE_DIR" -type f -name "*.sql" -mtime +7 -exec rm {} \;; then
+if ! find "$ARCHIVE_DIR" -type f \( -name "*.sql" -o -name "*.deltas.tar" \) \
+        -mtime +7 -exec rm {} \;; then
     echo "[$TIMESTAMP] ⚠️ 7일이 지난 로컬 백업 정리에 실패했습니다." \
         >> "$LOG_FILE"
 fi
 
 # ==========================================
-# 4. 독립 임시 저장소에서 db-backup 브랜치 갱신
+# 4. 로컬 백업 저장소에서 db-backup 브랜치 갱신
 # ==========================================
-BACKUP_REPO_DIR="$(mktemp -d)" ||
-    log_failure "임시 백업 저장소를 만들 수 없습니다."
-mkdir -p "$BACKUP_REPO_DIR/data" ||
-    log_failure "임시 백업 데이터 폴더를 만들 수 없습니다."
-cp "$DATA_DIR/database_backup.sql" "$BACKUP_REPO_DIR/data/" ||
-    log_failure "임시 백업 저장소로 SQL 파일을 복사할 수 없습니다."
-cd "$BACKUP_REPO_DIR" ||
-    log_failure "임시 백업 저장소에 접근할 수 없습니다."
-
-git init --initial-branch=backup > /dev/null 2>&1 ||
-    log_failure "임시 Git 저장소 초기화에 실패했습니다."
-
 REMOTE_URL="$("$BOT_DIR/bot_env/bin/python" -c "
 from dotenv import dotenv_values
 
@@ -114,14 +115,56 @@ if [ -z "$REMOTE_URL" ]; then
     log_failure "백업 원격 저장소 주소가 없습니다. DB_BACKUP_REMOTE_URL을 확인하세요."
 fi
 
-git add . ||
+# 기준 스냅샷이 바뀌었으면(rebase) 이력을 버리고 새 단일 커밋으로 시작해
+# db-backup 브랜치가 변경분 이력만큼만 자라게 합니다.
+if [ -d "$BACKUP_REPO_DIR/.git" ] &&
+   ! cmp -s "$DATA_DIR/database_backup.sql" \
+        "$BACKUP_REPO_DIR/data/database_backup.sql"; then
+    rm -rf -- "$BACKUP_REPO_DIR" ||
+        log_failure "이전 기준의 로컬 백업 저장소를 정리할 수 없습니다."
+fi
+
+if [ ! -d "$BACKUP_REPO_DIR/.git" ]; then
+    mkdir -p "$BACKUP_REPO_DIR" ||
+        log_failure "로컬 백업 저장소를 만들 수 없습니다."
+    git -C "$BACKUP_REPO_DIR" init --initial-branch=backup > /dev/null 2>&1 ||
+        log_failure "로컬 백업 Git 저장소 초기화에 실패했습니다."
+fi
+
+rm -rf -- "$BACKUP_REPO_DIR/data" &&
+    mkdir -p "$BACKUP_REPO_DIR/data" ||
+    log_failure "로컬 백업 데이터 폴더를 준비할 수 없습니다."
+cp "$DATA_DIR/database_backup.sql" "$BACKUP_REPO_DIR/data/" ||
+    log_failure "로컬 백업 저장소로 SQL 파일을 복사할 수 없습니다."
+if [ -d "$DELTA_DIR" ]; then
+    cp -R "$DELTA_DIR" "$BACKUP_REPO_DIR/data/" ||
+        log_failure "로컬 백업 저장소로 변경분을 복사할 수 없습니다."
+fi
+cd "$BACKUP_REPO_DIR" ||
+    log_failure "로컬 백업 저장소에 접근할 수 없습니다."
+
+git add -A . ||
     log_failure "원격 백업 커밋 준비에 실패했습니다."
-git commit -m "Auto-backup: User Data Update [$TIMESTAMP]" \
-    > /dev/null 2>&1 ||
-    log_failure "원격 백업 커밋 생성에 실패했습니다."
+if git rev-parse --verify -q HEAD > /dev/null &&
+   git diff --cached --quiet; then
+    # 직전 push가 실패했던 커밋은 변경분이 없어도 다시 올립니다.
+    if [ "$(git rev-parse HEAD)" = \
+         "$(git rev-parse --verify -q refs/pushed/db-backup)" ]; then
+        echo "[$TIMESTAMP] ✅ 마지막 업로드 이후 변경분이 없어 업로드를 건너뜁니다." \
+            >> "$LOG_FILE"
+        exit 0
+    fi
+else
+    git commit -m "Auto-backup: User Data Update [$TIMESTAMP]" \
+        > /dev/null 2>&1 ||
+        log_failure "원격 백업 커밋 생성에 실패했습니다."
+fi
 
 # 원격의 db-backup 브랜치로 강제 밀어넣기 (--force)
+# 같은 기준 위의 커밋은 빨리 감기 push가 되어 새 변경분만 전송하고, rebase 뒤의
+# 새 단일 커밋은 원격 이력을 교체합니다.
 if git push --force "$REMOTE_URL" backup:db-backup; then
+    git update-ref refs/pushed/db-backup HEAD
     echo "[$TIMESTAMP] ☁️ 업로드 완료 (db-backup 브랜치 강제 푸시)." \
         >> "$LOG_FILE"
 else
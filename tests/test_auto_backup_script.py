@@ -12,7 +12,7 @@ def test_backup_generation_failure_stops_before_archiving() -> None:
     """새 덤프 생성 실패 시 이전 파일을 새 백업처럼 업로드하면 안 됩니다."""
     script = read_backup_script()
 
-    assert 'if ! "$BOT_DIR/bot_env/bin/python" -c "' in script
+    assert 'if ! BACKUP_OUTCOME="$("$BOT_DIR/bot_env/bin/python" -c "' in script
     assert "새 SQL 백업 생성에 실패했습니다" in script
     assert script.index("새 SQL 백업 생성에 실패했습니다") < script.index(
         "ARCHIVE_DIR="
@@ -41,3 +41,37 @@ def test_backup_uses_required_private_remote_instead_of_code_origin() -> None:
     assert "git config --get remote.origin.url" not in script
     assert 'REMOTE_URL="https://github.com/lgw323/Bot.git"' not in script
     assert "백업 원격 저장소 주소가 없습니다" in script
+
+
+def test_incremental_deltas_are_archived_and_uploaded_with_the_base() -> None:
+    """기준 스냅샷만 올리면 변경분 없이 복구되어 최근 데이터가 사라집니다."""
+    script = read_backup_script()
+    upload_section = script.split("# 4. 로컬 백업 저장소에서 db-backup 브랜치 갱신", 1)[1]
+
+    assert 'DELTA_DIR="$DATA_DIR/database_backup.deltas"' in script
+    assert ".deltas.tar" in script
+    assert 'cp -R "$DELTA_DIR" "$BACKUP_REPO_DIR/data/"' in upload_section
+    # 기준 스냅샷이 바뀌면 이전 이력을 버려 브랜치가 계속 커지지 않아야 합니다.
+    assert 'rm -rf -- "$BACKUP_REPO_DIR"' in upload_section
+    assert upload_section.index('cmp -s "$DATA_DIR/database_backup.sql"') < (
+        upload_section.index("init --initial-branch=backup")
+    )
+    assert "refs/pushed/db-backup" in upload_section
+
+
+def test_unchanged_database_skips_archive_and_remote_push() -> None:
+    """변경이 없으면 보관본과 원격 push를 반복하지 않아야 합니다."""
+    script = read_backup_script()
+
+    assert "run_scheduled_backup()" in script
+    assert "database_manager.BACKUP_FAILED" in script
+    archive_section = script.split("# 3. 로컬 7일 보관 및 크기 검증", 1)[1].split(
+        "# 4. 로컬 백업 저장소에서 db-backup 브랜치 갱신",
+        1,
+    )[0]
+    assert 'if [ "$BACKUP_OUTCOME" = "unchanged" ]; then' in archive_section
+    assert archive_section.index('"$BACKUP_OUTCOME" = "unchanged"') < (
+        archive_section.index('cp "$DATA_DIR/database_backup.sql"')
+    )
+    upload_section = script.split("# 원격의 db-backup 브랜치로 강제 밀어넣기", 1)[0]
+    assert "업로드를 건너뜁니다" in upload_section
@@ -2,7 +2,10 @@ import pytest
 import sqlite3
 import os
 import asyncio
-from unittest.mock import MagicMock, patch
+import logging
+import threading
+import zlib
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from cryptography.fernet import Fernet
 
@@ -17,6 +20,27 @@ def assert_no_backup_temp_files(backup_path):
     assert list(backup_path.parent.glob(temp_pattern)) == []
 
 
+def decrypt_compressed_backup(content):
+    """V4 봉투의 청크를 복호화하고 압축을 풀어 SQL 원문을 돌려줍니다."""
+    cipher = Fernet(TEST_ENCRYPTION_KEY.encode("ascii"))
+    compressed = b"".join(
+        cipher.decrypt(frame[4:])[database_manager._CHUNK_META.size:]
+        for frame in split_backup_chunks(content)
+    )
+    return zlib.decompress(compressed)
+
+
+def split_backup_chunks(content):
+    """V3 백업 봉투를 (길이 + 토큰) 프레임 목록으로 나눕니다."""
+    body = content[len(database_manager.BACKUP_SNAPSHOT_HEADER):]
+    frames = []
+    while body:
+        token_length = int.from_bytes(body[:4], "big")
+        frames.append(body[:4 + token_length])
+        body = body[4 + token_length:]
+    return frames
+
+
 @pytest.fixture
 def temp_db_path(tmp_path):
     """임시 데이터베이스 경로를 생성하는 픽스처"""
@@ -63,6 +87,7 @@ class TestDatabaseManager:
         backup_sql = b"BEGIN TRANSACTION;\nCOMMIT;\n"
         fetch_result = MagicMock(stdout=b"")
         show_result = MagicMock(stdout=backup_sql)
+        delta_listing = MagicMock(stdout=b"")
 
         with patch("database_manager.DB_PATH", db_path), \
              patch("database_manager.DATA_DIR", tmp_path), \
@@ -71,10 +96,13 @@ class TestDatabaseManager:
                  os.environ,
                  {"DB_BACKUP_REMOTE_URL": PRIVATE_BACKUP_REMOTE},
              ), \
-             patch("subprocess.run", side_effect=[fetch_result, show_result]) as mock_run:
+             patch(
+                 "subprocess.run",
+                 side_effect=[fetch_result, show_result, delta_listing],
+             ) as mock_run:
             database_manager.init_db()
 
-        assert mock_run.call_count == 2
+        assert mock_run.call_count == 3
         assert mock_run.call_args_list[0].args[0] == [
             "git",
             "fetch",
@@ -85,6 +113,14 @@ class TestDatabaseManager:
         assert mock_run.call_args_list[1].args[0] == [
             "git", "show", "FETCH_HEAD:data/database_backup.sql"
         ]
+        assert mock_run.call_args_list[2].args[0] == [
+            "git",
+            "ls-tree",
+            "-r",
+            "--name-only",
+            "FETCH_HEAD",
+            "data/database_backup.deltas",
+        ]
         assert backup_path.read_bytes() == backup_sql
         assert db_path.exists()
 
@@ -141,6 +177,7 @@ class TestDatabaseManager:
         show_result = MagicMock(
             stdout=b"BEGIN TRANSACTION;\nNOT VALID SQL;\nCOMMIT;\n"
         )
+        delta_listing = MagicMock(stdout=b"")
 
         with patch("database_manager.DB_PATH", db_path), \
              patch("database_manager.DATA_DIR", tmp_path), \
@@ -151,7 +188,7 @@ class TestDatabaseManager:
              ), \
              patch(
                  "subprocess.run",
-                 side_effect=[fetch_result, show_result],
+                 side_effect=[fetch_result, show_result, delta_listing],
              ):
             with pytest.raises(RuntimeError, match="Failed to restore DB"):
                 database_manager.init_db()
@@ -289,6 +326,274 @@ class TestDatabaseManager:
             {"url": url, "title": "Shared Favorite"}
         ]
 
+    @pytest.mark.asyncio
+    async def test_user_favorites_are_cached_until_changed(self, setup_database):
+        """사용자별 즐겨찾기는 한 번만 읽고, 추가·삭제 뒤에는 다시 읽어야 합니다."""
+        await database_manager.add_favorite(1, "https://youtu.be/a", "A")
+        await database_manager.add_favorite(1, "https://youtu.be/b", "B")
+        await database_manager.add_favorite(2, "https://youtu.be/other", "Other")
+        database_manager.clear_query_caches()
+        real_run_read = database_manager._run_read
+
+        with patch(
+            "database_manager._run_read",
+            side_effect=real_run_read,
+        ) as mock_read:
+            first = await database_manager.get_user_favorites(1)
+            second = await database_manager.get_user_favorites(1)
+            assert await database_manager.is_favorite(1, "https://youtu.be/b")
+            assert not await database_manager.is_favorite(1, "https://youtu.be/other")
+            assert mock_read.call_count == 1
+
+            await database_manager.remove_favorites(1, ["https://youtu.be/a"])
+            after_remove = await database_manager.get_user_favorites(1)
+            await database_manager.add_favorite(1, "https://youtu.be/c", "C")
+            after_add = await database_manager.get_user_favorites(1)
+            assert mock_read.call_count == 3
+
+        assert first == second == [
+            {"url": "https://youtu.be/a", "title": "A"},
+            {"url": "https://youtu.be/b", "title": "B"},
+        ]
+        assert after_remove == [{"url": "https://youtu.be/b", "title": "B"}]
+        assert [fav["url"] for fav in after_add] == ["https://youtu.be/b", "https://youtu.be/c"]
+        assert await database_manager.get_user_favorites(3) == []
+        assert await database_manager.is_favorite(3, "https://youtu.be/a") is False
+
+    @pytest.mark.asyncio
+    async def test_bulk_favorite_removal_and_play_count_trim(self, setup_database):
+        """여러 곡 삭제와 상위 50곡 정리는 한 문장으로 같은 결과를 내야 합니다."""
+        for index in range(10):
+            await database_manager.add_favorite(8, f"https://youtu.be/f{index}", f"F{index}")
+        await database_manager.add_favorite(9, "https://youtu.be/f1", "Other user")
+
+        deleted = await database_manager.remove_favorites(
+            8,
+            ["https://youtu.be/f1", "https://youtu.be/f1", "https://youtu.be/f3", "https://youtu.be/missing"],
+        )
+        assert deleted == 2
+        assert await database_manager.remove_favorites(8, []) == 0
+        remaining = [fav["url"] for fav in await database_manager.get_user_favorites(8)]
+        assert len(remaining) == 8 and "https://youtu.be/f1" not in remaining
+        assert await database_manager.is_favorite(9, "https://youtu.be/f1")
+
+        with database_manager._connect_database() as conn:
+            conn.executemany(
+                "INSERT INTO music_play_counts (guild_id, url, title, play_count) VALUES (?, ?, ?, ?)",
+                [(1, f"https://youtu.be/p{index}", "P", index + 10) for index in range(60)]
+                + [(2, "https://youtu.be/other", "Other guild", 1)],
+            )
+        conn.close()
+        await database_manager.increment_play_count_db(1, "https://youtu.be/p0", "P")
+
+        with database_manager._connect_database() as conn:
+            kept = {row[0] for row in conn.execute("SELECT play_count FROM music_play_counts WHERE guild_id = 1")}
+            other = conn.execute("SELECT COUNT(*) FROM music_play_counts WHERE guild_id = 2").fetchone()
+        conn.close()
+        assert kept == set(range(20, 70))
+        assert other == (1,)
+
+    @pytest.mark.asyncio
+    async def test_guild_music_queries_are_cached_until_changed(self, setup_database):
+        """재생 UI 갱신은 설정·인기곡을 DB에서 다시 읽지 않고, 변경 뒤에만 다시 읽습니다."""
+        guild_id = 321
+        await database_manager.update_music_volume(guild_id, 0.3)
+        await database_manager.increment_play_count_db(guild_id, "https://youtu.be/a", "A")
+        database_manager.clear_query_caches()
+        real_run_read = database_manager._run_read
+
+        with patch(
+            "database_manager._run_read",
+            side_effect=real_run_read,
+        ) as mock_read:
+            for _ in range(3):
+                assert await database_manager.get_guild_music_settings(guild_id) == {"volume": 0.3}
+                top = await database_manager.get_top_played_songs_db(guild_id)
+            assert await database_manager.get_guild_music_settings(999) == {}
+            assert mock_read.call_count == 3
+            assert top == [{"url": "https://youtu.be/a", "title": "A", "count": 1}]
+
+            await database_manager.update_music_volume(guild_id, 0.8)
+            assert await database_manager.get_guild_music_settings(guild_id) == {"volume": 0.8}
+
+            await database_manager.increment_play_count_db(guild_id, "https://youtu.be/b", "B")
+            await database_manager.increment_play_count_db(guild_id, "https://youtu.be/b", "B")
+            top = await database_manager.get_top_played_songs_db(guild_id)
+            assert [song["url"] for song in top] == ["https://youtu.be/b", "https://youtu.be/a"]
+
+            database_manager.buffer_play_count(guild_id, "https://youtu.be/a", "A")
+            database_manager.buffer_play_count(guild_id, "https://youtu.be/a", "A")
+            await database_manager.flush_write_behind()
+            top = await database_manager.get_top_played_songs_db(guild_id)
+            assert top[0] == {"url": "https://youtu.be/a", "title": "A", "count": 3}
+            assert mock_read.call_count == 6
+
+    @pytest.mark.asyncio
+    async def test_transaction_groups_writes_into_one_commit(self, setup_database):
+        """transaction() 안의 쓰기는 쓰기 잠금 한 번으로 모아 함께 커밋해야 합니다."""
+        await database_manager.add_favorite(1, "https://youtu.be/old", "Old")
+        assert len(await database_manager.get_user_favorites(1)) == 1
+        database_manager.reset_lock_wait_stats()
+
+        async with database_manager.transaction("batch") as unit:
+            await database_manager.add_favorite(1, "https://youtu.be/new", "New")
+            row = await database_manager.add_user_xp(1, 2, 40)
+            await database_manager.update_user_level(1, 2, 3)
+            # 커밋 전에는 읽기 연결과 캐시 모두 이전 값을 봅니다.
+            assert len(await database_manager.get_user_favorites(1)) == 1
+
+        assert row["xp"] == 40
+        assert unit.operations == 3
+        stats = database_manager.get_lock_wait_stats()
+        assert stats["batch"]["calls"] == 1
+        assert "add_favorite" not in stats and "add_user_xp" not in stats
+        assert len(await database_manager.get_user_favorites(1)) == 2
+        assert (await database_manager.get_user_data(1, 2))["level"] == 3
+
+    @pytest.mark.asyncio
+    async def test_transaction_rolls_back_every_write_on_error(self, setup_database):
+        """블록에서 예외가 나면 앞선 쓰기까지 모두 취소되어야 합니다."""
+        with pytest.raises(RuntimeError, match="boom"):
+            async with database_manager.transaction("failing_batch"):
+                await database_manager.add_favorite(7, "https://youtu.be/x", "X")
+                await database_manager.update_music_volume(7, 0.9)
+                raise RuntimeError("boom")
+
+        assert await database_manager.get_user_favorites(7) == []
+        assert await database_manager.get_guild_music_settings(7) == {}
+
+        # 잠금과 연결이 반환되어 다음 쓰기가 바로 진행되어야 합니다.
+        await asyncio.wait_for(database_manager.add_favorite(7, "https://youtu.be/y", "Y"), 5)
+        assert await database_manager.is_favorite(7, "https://youtu.be/y")
+
+    @pytest.mark.asyncio
+    async def test_transaction_is_joined_by_tasks_started_inside_it(self, setup_database):
+        """블록 안에서 만든 작업의 쓰기는 교착 없이 블록에 합류해 함께 커밋·롤백되어야 합니다."""
+        async def grouped_writes():
+            async with database_manager.transaction("child_tasks") as unit:
+                await asyncio.wait_for(database_manager.add_favorite(8, "https://youtu.be/a", "A"), 5)
+                await asyncio.gather(
+                    database_manager.add_favorite(8, "https://youtu.be/b", "B"),
+                    database_manager.update_music_volume(8, 0.4),
+                )
+                return unit
+
+        unit = await asyncio.wait_for(grouped_writes(), 5)
+        assert unit.operations == 3
+        assert len(await database_manager.get_user_favorites(8)) == 2
+        assert await database_manager.get_guild_music_settings(8) == {"volume": 0.4}
+
+        async def failing_writes():
+            async with database_manager.transaction("child_tasks_failing"):
+                await asyncio.create_task(database_manager.add_favorite(9, "https://youtu.be/c", "C"))
+                raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError, match="boom"):
+            await asyncio.wait_for(failing_writes(), 5)
+        assert await database_manager.get_user_favorites(9) == []
+
+    def test_histogram_percentiles_use_bucket_upper_bounds(self):
+        """백분위는 버킷 상한으로 근사하되 관측 최댓값을 넘지 않아야 합니다."""
+        histogram = database_manager.Histogram(database_manager._LATENCY_BUCKETS_MS)
+        assert histogram.percentile(99) == 0.0
+        for value in [0.3] * 90 + [5.0] * 9 + [70.0]:
+            histogram.record(value)
+
+        assert histogram.count == 100
+        assert histogram.percentile(50) == pytest.approx(0.4)
+        assert histogram.percentile(95) == pytest.approx(6.4)
+        assert histogram.percentile(100) == 70.0
+        assert histogram.max == 70.0
+
+    @pytest.mark.asyncio
+    async def test_latency_stats_record_exec_time_and_rows(self, setup_database):
+        """호출 지점마다 대기 시간, 실행 시간, 처리한 행 수가 누적되어야 합니다."""
+        database_manager.reset_lock_wait_stats()
+        await database_manager.add_favorite(3, "https://youtu.be/a", "A")
+        await database_manager.add_favorite(3, "https://youtu.be/b", "B")
+        assert await database_manager.remove_favorites(3, ["https://youtu.be/a", "https://youtu.be/b"]) == 2
+        await database_manager.add_favorite(3, "https://youtu.be/c", "C")
+        assert len(await database_manager.get_user_favorites(3)) == 1
+
+        stats = database_manager.get_db_latency_stats()
+        assert stats["add_favorite"]["mode"] == "write"
+        assert stats["add_favorite"]["calls"] == 3
+        # 첫 호출은 users 행도 함께 만듭니다.
+        assert stats["add_favorite"]["rows"]["p50"] == 1
+        assert stats["add_favorite"]["rows"]["max"] == 2
+        assert stats["remove_favorites"]["rows"]["p50"] == 2
+        assert stats["get_user_favorites"]["mode"] == "read"
+        assert stats["get_user_favorites"]["rows"]["p99"] == 1
+        assert stats["add_favorite"]["exec_ms"]["p99"] > 0
+        assert database_manager.get_lock_wait_stats()["add_favorite"]["calls"] == 3
+
+    @pytest.mark.asyncio
+    async def test_slow_calls_are_logged_with_their_sql(self, setup_database, caplog):
+        """임계값을 넘은 호출은 실행한 SQL과 함께 느린 쿼리 로그에 남아야 합니다."""
+        database_manager.reset_lock_wait_stats()
+        caplog.set_level(logging.WARNING, logger=database_manager.SLOW_QUERY_LOGGER_NAME)
+        with patch("database_manager.DB_SLOW_QUERY_MS", 0.001):
+            await database_manager.add_favorite(4, "https://youtu.be/slow", "Slow")
+
+        records = [
+            record for record in caplog.records
+            if record.name == database_manager.SLOW_QUERY_LOGGER_NAME
+        ]
+        assert len(records) == 1
+        message = records[0].getMessage()
+        assert message.startswith("add_favorite (write)")
+        assert "rows=2" in message
+        assert "INSERT OR REPLACE INTO favorites" in message
+        # 로그에는 사용자 데이터 대신 자리표시자만 남습니다.
+        assert "youtu.be/slow" not in message
+        assert database_manager.get_db_latency_stats()["add_favorite"]["slow_calls"] == 1
+
+        caplog.clear()
+        with patch("database_manager.DB_SLOW_QUERY_MS", 0.0):
+            await database_manager.add_favorite(4, "https://youtu.be/fast", "Fast")
+        assert not [
+            record for record in caplog.records
+            if record.name == database_manager.SLOW_QUERY_LOGGER_NAME
+        ]
+
+    @pytest.mark.asyncio
+    async def test_write_behind_flush_inside_transaction_runs_after_it(self, setup_database):
+        """트랜잭션 안에서 요청한 쓰기 지연 반영은 블록이 끝난 뒤 따로 커밋됩니다."""
+        database_manager.buffer_user_xp(5, 6, 25)
+        # 백그라운드 반영이 쓰기 잠금을 기다리므로 이 이벤트 루프 전용 잠금을 씁니다.
+        with patch("database_manager._write_lock", asyncio.Lock()):
+            async with database_manager.transaction("flush_inside"):
+                assert await database_manager.flush_write_behind() == 0
+                background = database_manager.write_buffer._flush_task
+                assert background is not None and not background.done()
+            assert await background == 1
+        assert (await database_manager.get_user_data(5, 6))["xp"] == 25
+
+    @pytest.mark.asyncio
+    async def test_favorites_cache_drops_reads_that_raced_a_write(self, setup_database):
+        """추가 전에 시작된 조회 결과가 무효화 뒤 캐시에 남으면 안 됩니다."""
+        database_manager.clear_query_caches()
+        invalidations = database_manager.get_query_cache_stats()["favorites"]["invalidations"]
+        read_started = asyncio.Event()
+        release_read = asyncio.Event()
+
+        async def stale_loader():
+            read_started.set()
+            await release_read.wait()
+            return ()
+
+        pending = asyncio.create_task(database_manager._favorites_cache.load(5, stale_loader))
+        await read_started.wait()
+        await database_manager.add_favorite(5, "https://youtu.be/new", "New")
+        release_read.set()
+        assert await pending == ()
+
+        assert await database_manager.get_user_favorites(5) == [
+            {"url": "https://youtu.be/new", "title": "New"}
+        ]
+        stats = database_manager.get_query_cache_stats()["favorites"]
+        assert stats["invalidations"] == invalidations + 1
+
     @pytest.mark.asyncio
     async def test_backup_database_to_sql(self, setup_database, temp_backup_path):
         """백업 파일 전체가 암호화되고 올바른 키로만 원문을 확인할 수 있어야 합니다."""
@@ -311,22 +616,19 @@ class TestDatabaseManager:
         with patch.dict(os.environ, {"DB_ENCRYPTION_KEY": TEST_ENCRYPTION_KEY}):
             database_manager._cipher_suite = None 
             
-            success = await database_manager.backup_database_to_sql()
+            success = await database_manager.backup_database_to_sql(mode="sql")
             assert success is True
             assert temp_backup_path.exists()
 
             content = temp_backup_path.read_bytes()
-            assert content.startswith(b"DISCORDBOT_BACKUP_V2\n")
+            assert content.startswith(b"DISCORDBOT_BACKUP_V4\n")
             assert b"CREATE TABLE" not in content
             assert b'Super Secret Test Song' not in content
             assert b'youtube.com/watch' not in content
             assert session_id.encode("utf-8") not in content
             assert b'INSERT INTO "favorites" VALUES(999' not in content
 
-            encrypted_payload = content.split(b"\n", 1)[1]
-            decrypted_sql = Fernet(
-                TEST_ENCRYPTION_KEY.encode("ascii")
-            ).decrypt(encrypted_payload)
+            decrypted_sql = decrypt_compressed_backup(content)
             assert b"CREATE TABLE" in decrypted_sql
             assert title.encode("utf-8") in decrypted_sql
             assert session_id.encode("utf-8") in decrypted_sql
@@ -367,7 +669,7 @@ class TestDatabaseManager:
         with patch.dict(os.environ, {"DB_ENCRYPTION_KEY": TEST_ENCRYPTION_KEY}), \
              patch("database_manager._connect_database", return_value=connection):
             database_manager._cipher_suite = None
-            success = await database_manager.backup_database_to_sql()
+            success = await database_manager.backup_database_to_sql(mode="sql")
 
         assert success is False
         assert temp_backup_path.read_text(encoding="utf-8") == previous_backup
@@ -390,14 +692,36 @@ class TestDatabaseManager:
         with patch.dict(os.environ, {"DB_ENCRYPTION_KEY": TEST_ENCRYPTION_KEY}), \
              patch("database_manager._connect_database", return_value=connection):
             database_manager._cipher_suite = None
-            success = await database_manager.backup_database_to_sql()
+            success = await database_manager.backup_database_to_sql(mode="sql")
 
         assert success is False
         assert temp_backup_path.read_text(encoding="utf-8") == previous_backup
         assert_no_backup_temp_files(temp_backup_path)
 
+    def test_sql_dump_validation_streams_into_scratch_file(self, tmp_path):
+        """덤프 검증은 작은 블록으로 읽어 임시 DB 파일에 재생하고 경계 누락을 거부해야 합니다."""
+        dump_path = tmp_path / "dump.sql"
+        scratch_path = tmp_path / "scratch.db"
+        dump_path.write_text(
+            "BEGIN TRANSACTION;\n"
+            "CREATE TABLE t (v TEXT);\n"
+            "INSERT INTO \"t\" VALUES('line one\nline two');\n"
+            "COMMIT;\n",
+            encoding="utf-8",
+        )
+        with patch("database_manager.DB_BACKUP_CHUNK_BYTES", 7):
+            database_manager._validate_sql_backup(dump_path, scratch_path)
+        with sqlite3.connect(scratch_path) as conn:
+            assert conn.execute("SELECT v FROM t").fetchone() == ("line one\nline two",)
+
+        scratch_path.unlink()
+        dump_path.write_text("CREATE TABLE t (v TEXT);\n", encoding="utf-8")
+        with pytest.raises(ValueError, match="transaction boundaries"):
+            database_manager._validate_sql_backup(dump_path, scratch_path)
+
     @pytest.mark.asyncio
-    async def test_restore_from_encrypted_backup(self, setup_database, temp_db_path, temp_backup_path):
+    @pytest.mark.parametrize("backup_mode", ["snapshot", "sql"])
+    async def test_restore_from_encrypted_backup(self, setup_database, temp_db_path, temp_backup_path, backup_mode):
         """암호화되어 저장된 SQL 덤프 파일로부터 DB가 원문으로 정상 복구되는지 통합 검증"""
         user_id = 777
         guild_id = 555
@@ -410,7 +734,7 @@ class TestDatabaseManager:
         
         with patch.dict(os.environ, {"DB_ENCRYPTION_KEY": TEST_ENCRYPTION_KEY}):
             database_manager._cipher_suite = None
-            await database_manager.backup_database_to_sql()
+            await database_manager.backup_database_to_sql(mode=backup_mode)
         
         # 2. 메인 DB 고의 삭제 (서버 포맷 시뮬레이션)
         # 윈도우 환경 특성상 SQLite connection close가 test 환경에서 즉각 반영되지 않아
@@ -477,6 +801,397 @@ class TestDatabaseManager:
 
         assert not restore_db_path.exists()
 
+    @pytest.mark.asyncio
+    async def test_snapshot_backup_streams_authenticated_chunks(
+        self,
+        setup_database,
+        temp_db_path,
+        temp_backup_path,
+    ):
+        """온라인 백업 스냅샷은 여러 암호화 청크로 나뉘고 init_db 복구로 읽혀야 합니다."""
+        title = "Chunked Snapshot Song"
+        for index in range(300):
+            await database_manager.add_favorite(
+                index,
+                f"https://youtu.be/chunk{index}",
+                f"{title} {index}",
+            )
+
+        with patch.dict(os.environ, {"DB_ENCRYPTION_KEY": TEST_ENCRYPTION_KEY}), \
+             patch("database_manager.DB_BACKUP_CHUNK_BYTES", 4096), \
+             patch("database_manager.DB_BACKUP_PAGES_PER_STEP", 2):
+            database_manager._cipher_suite = None
+            assert await database_manager.backup_database_to_sql() is True
+
+        content = temp_backup_path.read_bytes()
+        assert content.startswith(database_manager.BACKUP_SNAPSHOT_HEADER)
+        assert title.encode("utf-8") not in content
+        assert b"SQLite format 3" not in content
+        frames = split_backup_chunks(content)
+        assert len(frames) > 2
+        assert_no_backup_temp_files(temp_backup_path)
+
+        restore_db_path = temp_db_path.with_name("snapshot_restore.db")
+        with patch("database_manager.DB_PATH", restore_db_path), \
+             patch.dict(os.environ, {"DB_ENCRYPTION_KEY": TEST_ENCRYPTION_KEY}):
+            database_manager._cipher_suite = None
+            database_manager.init_db()
+
+            favs = await database_manager.get_favorites()
+        database_manager.close_connection_pool()
+
+        assert len(favs) == 300
+        assert favs["7"][0]["title"] == f"{title} 7"
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "tamper",
+        ["swap", "truncate", "drop_middle", "flip_byte", "trailing"],
+    )
+    async def test_snapshot_restore_rejects_tampered_chunks(
+        self,
+        setup_database,
+        temp_db_path,
+        temp_backup_path,
+        tamper,
+    ):
+        """청크 순서 변경, 잘림, 변조가 있으면 복구한 DB를 게시하면 안 됩니다."""
+        for index in range(100):
+            await database_manager.add_favorite(
+                index,
+                f"https://youtu.be/tamper{index}",
+                f"Tamper Song {index}",
+            )
+
+        with patch.dict(os.environ, {"DB_ENCRYPTION_KEY": TEST_ENCRYPTION_KEY}), \
+             patch("database_manager.DB_BACKUP_CHUNK_BYTES", 4096):
+            database_manager._cipher_suite = None
+            assert await database_manager.backup_database_to_sql() is True
+
+        header = database_manager.BACKUP_SNAPSHOT_HEADER
+        frames = split_backup_chunks(temp_backup_path.read_bytes())
+        assert len(frames) >= 3
+        if tamper == "swap":
+            frames[0], frames[1] = frames[1], frames[0]
+        elif tamper == "truncate":
+            frames = frames[:-1]
+        elif tamper == "drop_middle":
+            del frames[1]
+        elif tamper == "flip_byte":
+            corrupted = bytearray(frames[1])
+            corrupted[-10] ^= 0x01
+            frames[1] = bytes(corrupted)
+        else:
+            frames.append(b"garbage")
+        temp_backup_path.write_bytes(header + b"".join(frames))
+
+        restore_db_path = temp_db_path.with_name("tampered_restore.db")
+        with patch("database_manager.DB_PATH", restore_db_path), \
+             patch.dict(os.environ, {"DB_ENCRYPTION_KEY": TEST_ENCRYPTION_KEY}):
+            database_manager._cipher_suite = None
+            with pytest.raises(RuntimeError, match="Failed to restore DB"):
+                database_manager.init_db()
+
+        assert not restore_db_path.exists()
+        assert list(restore_db_path.parent.glob(f".{restore_db_path.stem}.restore.*")) == []
+
+    @pytest.mark.asyncio
+    async def test_incremental_backup_replays_deltas_in_order(
+        self,
+        setup_database,
+        temp_db_path,
+        temp_backup_path,
+    ):
+        """기준 스냅샷 뒤 변경분만 쌓고, 복구 시 순서대로 재생해 같은 DB가 되어야 합니다."""
+        for index in range(50):
+            await database_manager.add_favorite(
+                index,
+                f"https://youtu.be/base{index}",
+                f"Base Song {index}",
+            )
+        await database_manager.add_user_xp(1, 10, 100)
+
+        delta_dir = temp_backup_path.parent / f"{temp_backup_path.stem}.deltas"
+        with patch.dict(os.environ, {"DB_ENCRYPTION_KEY": TEST_ENCRYPTION_KEY}):
+            database_manager._cipher_suite = None
+            assert await database_manager.backup_database_to_sql() is True
+            base_bytes = temp_backup_path.read_bytes()
+
+            # 변경이 없으면 변경분 파일을 만들지 않습니다.
+            assert await database_manager.backup_database_to_sql() is True
+            assert list(delta_dir.glob("*.delta")) == []
+
+            await database_manager.remove_favorites(3, ["https://youtu.be/base3"])
+            await database_manager.add_favorite(99, "https://youtu.be/new", "New Song")
+            await database_manager.add_user_xp(1, 10, 50)
+            await database_manager.update_music_volume(10, 0.25)
+            assert await database_manager.backup_database_to_sql() is True
+
+            await database_manager.add_favorite(3, "https://youtu.be/base3", "Back Again")
+            await database_manager.remove_favorites(99, ["https://youtu.be/new"])
+            await database_manager.add_watch_session("delta-session", 10, 1)
+            await database_manager.add_to_watch_playlist(
+                "delta-session", "https://youtu.be/w", "Watch", "tester"
+            )
+            assert await database_manager.backup_database_to_sql() is True
+
+        assert temp_backup_path.read_bytes() == base_bytes
+        deltas = sorted(delta_dir.glob("*.delta"))
+        assert [path.name for path in deltas] == ["000001.delta", "000002.delta"]
+        assert sum(path.stat().st_size for path in deltas) < len(base_bytes)
+        assert b"Back Again" not in deltas[1].read_bytes()
+        assert_no_backup_temp_files(temp_backup_path)
+
+        restore_db_path = temp_db_path.with_name("incremental_restore.db")
+        with patch("database_manager.DB_PATH", restore_db_path), \
+             patch.dict(os.environ, {"DB_ENCRYPTION_KEY": TEST_ENCRYPTION_KEY}):
+            database_manager._cipher_suite = None
+            database_manager.init_db()
+        database_manager.close_connection_pool()
+
+        with sqlite3.connect(temp_db_path) as live, \
+             sqlite3.connect(restore_db_path) as restored:
+            assert sorted(restored.iterdump()) == sorted(live.iterdump())
+
+    @pytest.mark.asyncio
+    async def test_incremental_backup_rebases_after_limit(
+        self,
+        setup_database,
+        temp_backup_path,
+    ):
+        """변경분이 기준 개수에 도달하면 새 기준 스냅샷으로 다시 시작해야 합니다."""
+        delta_dir = temp_backup_path.parent / f"{temp_backup_path.stem}.deltas"
+        with patch.dict(os.environ, {"DB_ENCRYPTION_KEY": TEST_ENCRYPTION_KEY}), \
+             patch("database_manager.DB_BACKUP_REBASE_EVERY", 2), \
+             patch("database_manager.DB_BACKUP_REBASE_RATIO", 100.0):
+            database_manager._cipher_suite = None
+            assert await database_manager.backup_database_to_sql() is True
+            first_base = temp_backup_path.read_bytes()
+
+            for index in range(2):
+                await database_manager.add_favorite(index, f"https://youtu.be/r{index}", "R")
+                assert await database_manager.backup_database_to_sql() is True
+            assert len(list(delta_dir.glob("*.delta"))) == 2
+            assert temp_backup_path.read_bytes() == first_base
+
+            await database_manager.add_favorite(7, "https://youtu.be/r7", "R")
+            assert await database_manager.backup_database_to_sql() is True
+
+        assert temp_backup_path.read_bytes() != first_base
+        assert list(delta_dir.glob("*.delta")) == []
+
+    def test_delta_statements_are_applied_from_small_blocks(self):
+        """변경분은 작은 블록에서 구문 단위로 꺼내 한 트랜잭션으로 적용되어야 합니다."""
+        change_set = (
+            b'{"base_id": "x", "sequence": 1}\n'
+            b"INSERT INTO t VALUES(1, 'a;\nb');\n"
+            b"DELETE FROM t WHERE v IS 1; INSERT INTO t (v, s) VALUES(2, 'c');\n"
+        )
+        blocks = (change_set[i:i + 5] for i in range(0, len(change_set), 5))
+        header, rest = database_manager._split_first_line(blocks)
+        assert header == b'{"base_id": "x", "sequence": 1}'
+
+        conn = sqlite3.connect(":memory:")
+        conn.execute("CREATE TABLE t (v INTEGER, s TEXT)")
+        database_manager._apply_delta_statements(conn, database_manager._iter_sql_statements(rest))
+        assert conn.execute("SELECT v, s FROM t").fetchall() == [(2, "c")]
+
+        # 중간 구문이 실패하면 앞서 적용한 구문까지 되돌립니다.
+        with pytest.raises(sqlite3.OperationalError):
+            database_manager._apply_delta_statements(
+                conn,
+                ["DELETE FROM t;\n", "INSERT INTO missing VALUES(1);\n"],
+            )
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone() == (1,)
+        conn.close()
+
+    @pytest.mark.asyncio
+    async def test_restore_rejects_missing_backup_delta(
+        self,
+        setup_database,
+        temp_db_path,
+        temp_backup_path,
+    ):
+        """중간 변경분이 빠진 백업을 복구하면 일부만 반영된 DB를 게시하면 안 됩니다."""
+        delta_dir = temp_backup_path.parent / f"{temp_backup_path.stem}.deltas"
+        with patch.dict(os.environ, {"DB_ENCRYPTION_KEY": TEST_ENCRYPTION_KEY}):
+            database_manager._cipher_suite = None
+            assert await database_manager.backup_database_to_sql() is True
+            for index in range(2):
+                await database_manager.add_favorite(index, f"https://youtu.be/m{index}", "M")
+                assert await database_manager.backup_database_to_sql() is True
+
+        (delta_dir / "000001.delta").unlink()
+
+        restore_db_path = temp_db_path.with_name("missing_delta_restore.db")
+        with patch("database_manager.DB_PATH", restore_db_path), \
+             patch.dict(os.environ, {"DB_ENCRYPTION_KEY": TEST_ENCRYPTION_KEY}):
+            database_manager._cipher_suite = None
+            with pytest.raises(RuntimeError, match="Failed to restore DB"):
+                database_manager.init_db()
+
+        assert not restore_db_path.exists()
+
+    @pytest.mark.asyncio
+    async def test_scheduled_backup_skips_unchanged_database(
+        self,
+        setup_database,
+        temp_db_path,
+        temp_backup_path,
+    ):
+        """마지막 백업 이후 DB가 그대로면 스냅샷 없이 unchanged를 알려야 합니다."""
+        await database_manager.add_favorite(1, "https://youtu.be/same", "Same Song")
+
+        with patch.dict(os.environ, {"DB_ENCRYPTION_KEY": TEST_ENCRYPTION_KEY}):
+            database_manager._cipher_suite = None
+            assert await database_manager.run_scheduled_backup() == "created"
+
+            with patch(
+                "database_manager._create_atomic_database_backup",
+                side_effect=AssertionError("backup should be skipped"),
+            ):
+                # 파일 정보가 같으면 내용 확인도 하지 않습니다.
+                with patch(
+                    "database_manager._database_content_fingerprint",
+                    side_effect=AssertionError("content scan should be skipped"),
+                ):
+                    assert await database_manager.run_scheduled_backup() == "unchanged"
+
+                # 체크포인트처럼 파일만 바뀌고 행은 같으면 여전히 unchanged입니다.
+                stat = temp_db_path.stat()
+                os.utime(temp_db_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+                assert await database_manager.run_scheduled_backup() == "unchanged"
+                assert await database_manager.backup_database_to_sql() is True
+
+            await database_manager.update_music_volume(1, 0.3)
+            assert await database_manager.run_scheduled_backup() == "created"
+            # 방식이 바뀌거나 백업 파일이 없어지면 지문이 같아도 다시 만듭니다.
+            assert await database_manager.run_scheduled_backup(mode="sql") == "created"
+            temp_backup_path.unlink()
+            assert await database_manager.run_scheduled_backup(mode="sql") == "created"
+            assert temp_backup_path.exists()
+
+    @pytest.mark.asyncio
+    async def test_content_fingerprint_is_aggregated_in_sqlite(self, setup_database):
+        """지문은 테이블마다 집계 쿼리 한 번으로 구하고 실제 쓰기 경로의 변경을 모두 잡아야 합니다."""
+        user_id = 123456789012345678
+        await database_manager.increment_play_count_db(1, "https://youtu.be/a", "Song A")
+        await database_manager.add_user_xp(user_id, 1, 10)
+        first = database_manager._database_content_fingerprint()
+        assert database_manager._database_content_fingerprint() == first
+
+        with database_manager._pooled_connection() as conn:
+            query = database_manager._table_checksum_query(conn, "users")
+            statements = []
+            conn.set_trace_callback(statements.append)
+            conn.execute(query).fetchone()
+            conn.set_trace_callback(None)
+        assert len(statements) == 1 and statements[0].startswith("SELECT count(*), total(")
+
+        # 같은 길이의 제목으로 다시 기록해도 재생 횟수가 함께 바뀝니다.
+        await database_manager.increment_play_count_db(1, "https://youtu.be/a", "Song B")
+        second = database_manager._database_content_fingerprint()
+        assert second["tables"]["music_play_counts"] != first["tables"]["music_play_counts"]
+        assert second["tables"]["users"] == first["tables"]["users"]
+
+        # 큰 ID가 1만 바뀌어도 나머지 합으로 잡힙니다.
+        with database_manager._pooled_connection() as conn:
+            conn.execute("UPDATE users SET user_id = user_id + 1")
+        third = database_manager._database_content_fingerprint()
+        assert third["tables"]["users"] != first["tables"]["users"]
+
+        # 즐겨찾기 제목 교체(INSERT OR REPLACE)는 rowid 합으로 잡힙니다.
+        await database_manager.add_favorite(user_id, "https://youtu.be/a", "Song A")
+        before_replace = database_manager._database_content_fingerprint()
+        await database_manager.add_favorite(user_id, "https://youtu.be/a", "Song B")
+        after_replace = database_manager._database_content_fingerprint()
+        assert after_replace["tables"]["favorites"] != before_replace["tables"]["favorites"]
+
+    @pytest.mark.asyncio
+    async def test_failed_backup_is_not_recorded_as_unchanged(
+        self,
+        setup_database,
+        temp_backup_path,
+    ):
+        """실패한 백업의 지문을 저장하면 다음 실행이 변경을 놓치게 됩니다."""
+        temp_backup_path.write_text("LAST KNOWN GOOD BACKUP\n", encoding="utf-8")
+        with patch.dict(os.environ, {"DB_ENCRYPTION_KEY": TEST_ENCRYPTION_KEY}):
+            database_manager._cipher_suite = None
+            with patch(
+                "database_manager._write_database_snapshot",
+                side_effect=RuntimeError("snapshot failed"),
+            ):
+                assert await database_manager.run_scheduled_backup() == "failed"
+            assert await database_manager.run_scheduled_backup() == "created"
+
+    @pytest.mark.asyncio
+    async def test_compressed_sql_backup_is_smaller_and_streams_on_restore(
+        self,
+        setup_database,
+        temp_db_path,
+        temp_backup_path,
+    ):
+        """반복되는 INSERT 덤프는 압축되어야 하고, 여러 줄 문자열도 그대로 복구되어야 합니다."""
+        multiline_title = "First line\nSecond line; with semicolon\n'quoted'"
+        await database_manager.add_favorite(1, "https://youtu.be/multi", multiline_title)
+        for index in range(2000):
+            await database_manager.increment_play_count_db(
+                index % 3,
+                f"https://youtu.be/compress{index}",
+                f"Compressible Song {index}",
+            )
+
+        with patch.dict(os.environ, {"DB_ENCRYPTION_KEY": TEST_ENCRYPTION_KEY}), \
+             patch("database_manager.DB_BACKUP_CHUNK_BYTES", 4096):
+            database_manager._cipher_suite = None
+            assert await database_manager.backup_database_to_sql(mode="sql") is True
+
+        content = temp_backup_path.read_bytes()
+        plain_sql = decrypt_compressed_backup(content)
+        assert len(content) * 3 < len(plain_sql)
+
+        restore_db_path = temp_db_path.with_name("compressed_restore.db")
+        with patch("database_manager.DB_PATH", restore_db_path), \
+             patch.dict(os.environ, {"DB_ENCRYPTION_KEY": TEST_ENCRYPTION_KEY}):
+            database_manager._cipher_suite = None
+            database_manager.init_db()
+        database_manager.close_connection_pool()
+
+        with sqlite3.connect(restore_db_path) as conn:
+            assert conn.execute(
+                "SELECT title FROM favorites WHERE user_id = 1"
+            ).fetchone() == (multiline_title,)
+            assert conn.execute(
+                "SELECT COUNT(*) FROM music_play_counts"
+            ).fetchone() == (150,)
+
+    def test_restore_supports_v2_whole_file_envelope(self, tmp_path):
+        """압축 형식 도입 전의 V2 봉투 백업도 계속 복구할 수 있어야 합니다."""
+        db_path = tmp_path / "v2_restored.db"
+        backup_path = tmp_path / "v2_backup.sql"
+        sql = (
+            "BEGIN TRANSACTION;\n"
+            "CREATE TABLE favorites (user_id INTEGER, url TEXT, title TEXT, "
+            "PRIMARY KEY(user_id, url));\n"
+            "INSERT INTO \"favorites\" VALUES(5,'https://youtu.be/v2','V2 Song');\n"
+            "COMMIT;\n"
+        )
+        cipher = Fernet(TEST_ENCRYPTION_KEY.encode("ascii"))
+        backup_path.write_bytes(
+            b"DISCORDBOT_BACKUP_V2\n" + cipher.encrypt(sql.encode("utf-8"))
+        )
+
+        with patch("database_manager.DB_PATH", db_path), \
+             patch("database_manager.DATA_DIR", tmp_path), \
+             patch("database_manager.SQL_BACKUP_PATH", backup_path), \
+             patch.dict(os.environ, {"DB_ENCRYPTION_KEY": TEST_ENCRYPTION_KEY}):
+            database_manager._cipher_suite = None
+            database_manager.init_db()
+
+        with database_manager._connect_database(db_path) as conn:
+            row = conn.execute("SELECT title FROM favorites WHERE user_id = 5").fetchone()
+        assert row == ("V2 Song",)
+
     def test_restore_supports_legacy_field_encrypted_sql_backup(
         self,
         tmp_path,
@@ -519,3 +1234,454 @@ class TestDatabaseManager:
 
         assert row == (url, title)
 
+    def test_legacy_restore_batches_rows_with_one_parser(self, tmp_path, caplog):
+        """대량 덤프는 파서 하나와 executemany 배치로 넣고 진행률을 남겨야 합니다."""
+        db_path = tmp_path / "bulk_restored.db"
+        backup_path = tmp_path / "bulk_backup.sql"
+        cipher = Fernet(TEST_ENCRYPTION_KEY.encode("ascii"))
+        multiline_title = "첫 줄\n둘째 줄; 'quoted'"
+        lines = [
+            "BEGIN TRANSACTION;\n",
+            "CREATE TABLE favorites (user_id INTEGER, url TEXT, title TEXT, "
+            "PRIMARY KEY(user_id, url));\n",
+            "CREATE TABLE users (user_id INTEGER, guild_id INTEGER, xp INTEGER, "
+            "PRIMARY KEY(user_id, guild_id));\n",
+        ]
+        for index in range(30):
+            encrypted_url = cipher.encrypt(f"https://youtu.be/bulk{index}".encode()).decode()
+            title = multiline_title if index == 0 else f"Song {index}"
+            escaped_title = title.replace("'", "''")
+            lines.append(
+                f'INSERT INTO "favorites" VALUES({index},\'{encrypted_url}\',\'{escaped_title}\');\n'
+            )
+            lines.append(f'INSERT INTO "users" VALUES({index},1,{index * 10});\n')
+        lines.append("COMMIT;\n")
+        backup_path.write_text("".join(lines), encoding="utf-8")
+
+        real_connect = sqlite3.connect
+        with patch("database_manager.DB_PATH", db_path), \
+             patch("database_manager.DATA_DIR", tmp_path), \
+             patch("database_manager.SQL_BACKUP_PATH", backup_path), \
+             patch("database_manager.DB_RESTORE_BATCH_ROWS", 7), \
+             patch("database_manager.DB_RESTORE_PROGRESS_SECONDS", 0), \
+             patch("database_manager.sqlite3.connect", side_effect=real_connect) as mock_connect, \
+             patch.dict(os.environ, {"DB_ENCRYPTION_KEY": TEST_ENCRYPTION_KEY}), \
+             caplog.at_level(logging.INFO, logger=database_manager.logger.name):
+            database_manager._cipher_suite = None
+            database_manager._restore_database_from_sql()
+
+        parser_connects = [
+            call for call in mock_connect.call_args_list if call.args[:1] == (":memory:",)
+        ]
+        assert len(parser_connects) == 1
+        assert "Restored 60 rows" in caplog.text
+        assert "Restoring backup:" in caplog.text and "%" in caplog.text
+
+        with sqlite3.connect(db_path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM favorites").fetchone() == (30,)
+            assert conn.execute(
+                "SELECT url, title FROM favorites WHERE user_id = 0"
+            ).fetchone() == ("https://youtu.be/bulk0", multiline_title)
+            assert conn.execute("SELECT SUM(xp) FROM users").fetchone() == (4350,)
+
+    def test_restore_rejects_dump_without_commit(self, tmp_path):
+        """COMMIT 없이 잘린 덤프는 일부만 복구된 DB로 게시되면 안 됩니다."""
+        db_path = tmp_path / "truncated_restored.db"
+        backup_path = tmp_path / "truncated_backup.sql"
+        backup_path.write_text(
+            "BEGIN TRANSACTION;\n"
+            "CREATE TABLE users (user_id INTEGER, guild_id INTEGER);\n"
+            'INSERT INTO "users" VALUES(1,2);\n',
+            encoding="utf-8",
+        )
+
+        with patch("database_manager.DB_PATH", db_path), \
+             patch("database_manager.DATA_DIR", tmp_path), \
+             patch("database_manager.SQL_BACKUP_PATH", backup_path):
+            with pytest.raises(RuntimeError, match="Failed to restore DB"):
+                database_manager._restore_database_from_sql()
+
+        assert not db_path.exists()
+        assert not list(tmp_path.glob(".truncated_restored.restore.*"))
+
+
+    @pytest.mark.asyncio
+    async def test_async_helpers_reuse_pooled_connections(self, setup_database):
+        """메시지마다 새 연결을 열지 않고 설정된 연결을 재사용해야 합니다."""
+        database_manager.close_connection_pool()
+        real_connect = database_manager._connect_database
+
+        with patch(
+            "database_manager._connect_database",
+            side_effect=real_connect,
+        ) as mock_connect:
+            for _ in range(5):
+                await database_manager.update_user_xp(1, 2, xp_added=3)
+                await database_manager.get_user_data(1, 2)
+
+        # 쓰기 연결 하나와 읽기 전용 연결 하나만 열려야 합니다.
+        assert mock_connect.call_count == 2
+        data = await database_manager.get_user_data(1, 2)
+        assert data["xp"] == 15
+
+    def test_close_connection_pool_closes_idle_connections(self, setup_database):
+        """봇 종료 훅은 풀에 남은 연결을 실제로 닫아야 합니다."""
+        database_manager.open_connection_pool()
+        pool = database_manager._get_pool()
+        conn = pool.acquire()
+        pool.release(conn)
+
+        database_manager.close_connection_pool()
+
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+        assert database_manager._pools == {}
+
+    def test_read_only_connection_rejects_writes(self, setup_database):
+        """읽기 풀의 연결은 WAL 스냅샷만 읽고 쓰기는 거부해야 합니다."""
+        with database_manager._pooled_connection(read_only=True) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM users").fetchone()[0] == 0
+            with pytest.raises(sqlite3.OperationalError):
+                conn.execute("INSERT INTO users (user_id, guild_id) VALUES (1, 1)")
+
+    @pytest.mark.asyncio
+    async def test_reads_do_not_wait_for_writer_lock(self, setup_database):
+        """쓰기 잠금을 쥐고 있어도 조회는 읽기 전용 연결로 진행되어야 합니다."""
+        await database_manager.update_user_xp(1, 2, xp_added=7)
+        database_manager.reset_lock_wait_stats()
+
+        async with database_manager._write_lock:
+            data = await asyncio.wait_for(
+                database_manager.get_user_data(1, 2),
+                timeout=5,
+            )
+
+        assert data["xp"] == 7
+        stats = database_manager.get_lock_wait_stats()
+        assert stats["get_user_data"]["mode"] == "read"
+        assert stats["get_user_data"]["calls"] == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_writes_are_serialized_and_measured(self, setup_database):
+        """동시 쓰기는 하나씩 실행되고 호출 지점별 대기 시간이 기록되어야 합니다."""
+        database_manager.reset_lock_wait_stats()
+
+        await asyncio.gather(
+            *(database_manager.update_user_xp(1, 2, xp_added=1) for _ in range(20))
+        )
+
+        data = await database_manager.get_user_data(1, 2)
+        assert data["xp"] == 20
+        stats = database_manager.get_lock_wait_stats()["update_user_xp"]
+        assert stats["mode"] == "write"
+        assert stats["calls"] == 20
+        assert stats["max_wait_ms"] > 0
+
+
+    @pytest.mark.asyncio
+    async def test_write_behind_buffer_coalesces_deltas(self, setup_database):
+        """같은 키의 XP·재생 횟수는 합쳐진 뒤 한 번의 트랜잭션으로 반영되어야 합니다."""
+        buffer = database_manager.WriteBehindBuffer(flush_interval=60, max_pending=100)
+        buffer.level_resolver = lambda xp, vc_seconds: 1 + (xp + vc_seconds // 60) // 100
+
+        for _ in range(10):
+            buffer.add_xp(1, 2, 12)
+        buffer.add_xp(3, 2, 0, vc_sec_added=120)
+        buffer.add_play(2, "https://youtu.be/a", "Old title")
+        buffer.add_play(2, "https://youtu.be/a", "New title")
+
+        assert buffer.stats()["pending_rows"] == 3
+        assert await buffer.flush() == 3
+        assert buffer.stats() == {
+            "pending_rows": 0,
+            "pending_xp_rows": 0,
+            "pending_play_rows": 0,
+            "flushed_rows": 3,
+            "flush_count": 1,
+            "failed_flushes": 0,
+        }
+
+        user = await database_manager.get_user_data(1, 2)
+        assert user["xp"] == 120
+        assert user["level"] == 2
+        voice_user = await database_manager.get_user_data(3, 2)
+        assert voice_user["total_vc_seconds"] == 120
+        assert voice_user["level"] == 1
+        top_songs = await database_manager.get_top_played_songs_db(2)
+        assert top_songs == [
+            {"url": "https://youtu.be/a", "title": "New title", "count": 2}
+        ]
+
+    @pytest.mark.asyncio
+    async def test_write_behind_buffer_flushes_on_size_threshold(self, setup_database):
+        """대기 행이 임계값에 닿으면 타이머를 기다리지 않고 반영해야 합니다."""
+        buffer = database_manager.WriteBehindBuffer(flush_interval=60, max_pending=2)
+
+        buffer.add_xp(1, 2, 5)
+        buffer.add_xp(4, 2, 5)
+        await buffer._flush_task
+
+        assert buffer.pending_rows == 0
+        assert buffer.flushed_rows == 2
+        assert (await database_manager.get_user_data(4, 2))["xp"] == 5
+
+    @pytest.mark.asyncio
+    async def test_write_behind_buffer_keeps_deltas_when_flush_fails(self, setup_database):
+        """반영에 실패한 배치는 버리지 않고 다음 반영을 위해 다시 쌓여야 합니다."""
+        buffer = database_manager.WriteBehindBuffer(flush_interval=60, max_pending=100)
+        buffer.add_xp(1, 2, 5)
+
+        with patch(
+            "database_manager._run_write",
+            new_callable=AsyncMock,
+            side_effect=sqlite3.OperationalError("disk I/O error"),
+        ):
+            assert await buffer.flush() == 0
+
+        buffer.add_xp(1, 2, 5)
+        assert buffer.stats()["failed_flushes"] == 1
+        assert await buffer.flush() == 1
+        assert (await database_manager.get_user_data(1, 2))["xp"] == 10
+        buffer._cancel_timer()
+
+    @pytest.mark.asyncio
+    async def test_write_behind_flush_survives_caller_cancellation(self, setup_database):
+        """반영 도중 호출자가 취소되어도 꺼낸 값은 커밋되어야 합니다."""
+        buffer = database_manager.WriteBehindBuffer(flush_interval=60, max_pending=100)
+        buffer.add_xp(1, 2, 5)
+        write_started = threading.Event()
+        release_write = threading.Event()
+        real_flush = database_manager._flush_pending_writes
+
+        def slow_flush(conn, *args):
+            write_started.set()
+            release_write.wait(5)
+            return real_flush(conn, *args)
+
+        with patch("database_manager._flush_pending_writes", slow_flush):
+            flush = asyncio.create_task(buffer.flush())
+            await asyncio.to_thread(write_started.wait, 5)
+            flush.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await flush
+            release_write.set()
+            assert await buffer._write_task == 1
+
+        assert buffer.pending_rows == 0
+        assert buffer.flushed_rows == 1
+        assert (await database_manager.get_user_data(1, 2))["xp"] == 5
+
+    @pytest.mark.asyncio
+    async def test_write_behind_rearms_timer_after_slow_flush(self, setup_database):
+        """반영 중 타이머가 만료되어도 그 사이 쌓인 값은 다음 반영으로 이어져야 합니다."""
+        buffer = database_manager.WriteBehindBuffer(flush_interval=0.01, max_pending=100)
+        write_started = threading.Event()
+        release_write = threading.Event()
+        real_flush = database_manager._flush_pending_writes
+
+        def slow_flush(conn, *args):
+            write_started.set()
+            release_write.wait(5)
+            return real_flush(conn, *args)
+
+        with patch("database_manager._flush_pending_writes", slow_flush):
+            buffer.add_xp(1, 2, 5)
+            await asyncio.to_thread(write_started.wait, 5)
+            buffer.add_xp(3, 2, 5)
+            # 첫 반영이 끝나지 않은 동안 두 번째 타이머가 만료됩니다.
+            await asyncio.sleep(0.05)
+            assert buffer.pending_rows == 1
+            release_write.set()
+            for _ in range(100):
+                if buffer.flushed_rows == 2:
+                    break
+                await asyncio.sleep(0.02)
+
+        assert buffer.pending_rows == 0
+        assert buffer.flush_count == 2
+        assert (await database_manager.get_user_data(3, 2))["xp"] == 5
+
+    @pytest.mark.asyncio
+    async def test_add_user_xp_returns_new_totals(self, setup_database):
+        """XP 반영과 누적치 조회가 하나의 구문으로 처리되어야 합니다."""
+        first = await database_manager.add_user_xp(1, 2, 30)
+        second = await database_manager.add_user_xp(1, 2, 5, vc_sec_added=90)
+
+        assert first == {"xp": 30, "level": 1, "total_vc_seconds": 0}
+        assert second == {"xp": 35, "level": 1, "total_vc_seconds": 90}
+
+        await database_manager.update_user_level(1, 2, 3)
+        assert (await database_manager.get_user_data(1, 2))["level"] == 3
+
+    @pytest.mark.asyncio
+    async def test_leaderboard_pages_and_user_rank(self, setup_database):
+        """총 경험치 인덱스로 페이지 단위 랭킹과 개인 순위를 조회해야 합니다."""
+        guild_id = 5
+        for user_id in range(1, 26):
+            await database_manager.add_user_xp(user_id, guild_id, user_id * 10, vc_sec_added=60)
+        await database_manager.add_user_xp(99, guild_id + 1, 10_000)
+
+        first = await database_manager.get_leaderboard_page(guild_id, page=0, page_size=10)
+        last = await database_manager.get_leaderboard_page(guild_id, page=2, page_size=10)
+
+        assert first["total_users"] == 25
+        assert [row["user_id"] for row in first["rows"]] == list(range(25, 15, -1))
+        assert first["rows"][0]["total_xp"] == 250 + database_manager.VC_XP_PER_MIN
+        assert [row["user_id"] for row in last["rows"]] == list(range(5, 0, -1))
+
+        assert await database_manager.get_user_rank(25, guild_id) == {
+            "rank": 1,
+            "total_xp": 255,
+            "ranked_users": 25,
+        }
+        assert (await database_manager.get_user_rank(1, guild_id))["rank"] == 25
+        assert await database_manager.get_user_rank(1, guild_id + 2) is None
+
+    @pytest.mark.asyncio
+    async def test_leaderboard_ties_keep_pages_and_rank_consistent(self, setup_database):
+        """동점자는 페이지 사이에 중복·누락되지 않고 개인 순위도 페이지 위치와 같아야 합니다."""
+        guild_id = 6
+        for user_id in (30, 10, 20, 40):
+            await database_manager.add_user_xp(user_id, guild_id, 100)
+        await database_manager.add_user_xp(50, guild_id, 500)
+
+        pages = [
+            await database_manager.get_leaderboard_page(guild_id, page=page, page_size=2)
+            for page in range(3)
+        ]
+        ordered = [row["user_id"] for page in pages for row in page["rows"]]
+        assert ordered == [50, 10, 20, 30, 40]
+        for position, user_id in enumerate(ordered, start=1):
+            assert (await database_manager.get_user_rank(user_id, guild_id))["rank"] == position
+
+    @pytest.mark.asyncio
+    async def test_period_leaderboard_reads_daily_rollups(self, setup_database):
+        """XP 반영 시 KST 날짜 버킷에도 집계되어 기간별 랭킹과 보존 정리에 쓰여야 합니다."""
+        guild_id = 7
+        today = database_manager.datetime.now(database_manager.XP_ROLLUP_TZ).date()
+        old_day = (today - database_manager.timedelta(days=400)).isoformat()
+
+        await database_manager.add_user_xp(1, guild_id, 50)
+        await database_manager.add_user_xp(2, guild_id, 10, vc_sec_added=600)
+        buffer = database_manager.WriteBehindBuffer(flush_interval=60, max_pending=100)
+        buffer.add_xp(1, guild_id, 5)
+        await buffer.flush()
+
+        with database_manager._pooled_connection() as conn:
+            conn.execute(
+                "INSERT INTO xp_daily (guild_id, day, user_id, xp, vc_seconds) VALUES (?, ?, ?, ?, ?)",
+                (guild_id, old_day, 3, 9999, 0),
+            )
+
+        page = await database_manager.get_period_leaderboard_page(guild_id, "daily")
+        assert page["total_users"] == 2
+        assert [(row["user_id"], row["total_xp"]) for row in page["rows"]] == [
+            (2, 10 + 10 * database_manager.VC_XP_PER_MIN),
+            (1, 55),
+        ]
+
+        assert await database_manager.prune_xp_rollups() == 1
+        monthly = await database_manager.get_period_leaderboard_page(guild_id, "monthly")
+        assert {row["user_id"] for row in monthly["rows"]} == {1, 2}
+
+    def test_period_start_days(self):
+        """주간은 월요일, 월간은 1일부터 집계해야 합니다."""
+        wednesday = database_manager.date(2024, 6, 12)
+        assert database_manager._period_start_day("daily", wednesday) == "2024-06-12"
+        assert database_manager._period_start_day("weekly", wednesday) == "2024-06-10"
+        assert database_manager._period_start_day("monthly", wednesday) == "2024-06-01"
+        with pytest.raises(ValueError):
+            database_manager._period_start_day("yearly", wednesday)
+
+    def test_schema_migrations_apply_once_and_record_version(self, setup_database):
+        """마이그레이션은 user_version까지 한 번만 적용되고 재기동 시 다시 실행되지 않아야 합니다."""
+        with database_manager._connect_database() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+        assert version == database_manager.SCHEMA_VERSION
+
+        failing = MagicMock(side_effect=AssertionError("migration re-ran"))
+        with patch.object(
+            database_manager,
+            "SCHEMA_MIGRATIONS",
+            [failing] * database_manager.SCHEMA_VERSION,
+        ):
+            database_manager._prepare_database_schema()
+        failing.assert_not_called()
+
+    def test_schema_migrations_upgrade_legacy_database(self, tmp_path):
+        """user_version이 없던 예전 DB도 컬럼 추가와 인덱스 생성까지 올라가야 합니다."""
+        db_path = tmp_path / "legacy.db"
+        with sqlite3.connect(db_path) as legacy:
+            legacy.execute(
+                "CREATE TABLE users (user_id INTEGER, guild_id INTEGER, xp INTEGER DEFAULT 0, "
+                "level INTEGER DEFAULT 1, total_vc_seconds INTEGER DEFAULT 0, "
+                "PRIMARY KEY (user_id, guild_id))"
+            )
+            legacy.execute("INSERT INTO users (user_id, guild_id, xp, total_vc_seconds) VALUES (1, 2, 10, 120)")
+        legacy.close()
+
+        with patch("database_manager.DB_PATH", db_path):
+            database_manager._prepare_database_schema()
+
+        with sqlite3.connect(db_path) as conn:
+            assert conn.execute("PRAGMA user_version").fetchone()[0] == database_manager.SCHEMA_VERSION
+            assert conn.execute(
+                "SELECT birth_month, total_xp FROM users WHERE user_id = 1"
+            ).fetchone() == (None, 10 + 2 * database_manager.VC_XP_PER_MIN)
+            indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        conn.close()
+        assert {"idx_users_guild_rank", "idx_users_guild_birthday", "idx_play_counts_guild_count"} <= indexes
+        assert "idx_users_guild_total_xp" not in indexes
+
+    @pytest.mark.parametrize(
+        "query, params",
+        [
+            ("SELECT user_id, guild_id, xp, level, total_vc_seconds FROM users WHERE user_id = ? AND guild_id = ?", (1, 2)),
+            ("SELECT user_id, xp, level, total_vc_seconds, total_xp FROM users WHERE guild_id = ? ORDER BY total_xp DESC, user_id LIMIT ? OFFSET ?", (1, 10, 0)),
+            ("SELECT COUNT(*) FROM users WHERE guild_id = ? AND total_xp = ? AND user_id < ?", (1, 100, 5)),
+            ("SELECT user_id FROM users WHERE guild_id = ? AND birth_month = ? AND birth_day = ?", (1, 6, 11)),
+            ("SELECT user_id, birth_month as month, birth_day as day FROM users WHERE guild_id = ? AND birth_month IS NOT NULL ORDER BY birth_month, birth_day", (1,)),
+            ("SELECT url, title, play_count as count FROM music_play_counts WHERE guild_id = ? ORDER BY play_count DESC LIMIT ?", (1, 5)),
+            ("DELETE FROM music_play_counts WHERE guild_id = ? AND url IN (SELECT url FROM music_play_counts WHERE guild_id = ? ORDER BY play_count DESC LIMIT -1 OFFSET ?)", (1, 1, 50)),
+            ("SELECT 1 FROM favorites WHERE user_id = ? AND url = ?", (1, "https://youtu.be/a")),
+            ("SELECT url, title FROM favorites WHERE user_id = ? ORDER BY rowid", (1,)),
+            ("SELECT user_id, SUM(xp) FROM xp_daily WHERE guild_id = ? AND day >= ? GROUP BY user_id", (1, "2024-06-01")),
+            ("DELETE FROM xp_daily WHERE day < ?", ("2024-01-01",)),
+            ("SELECT video_url, video_title, added_by, order_index FROM watch_playlists WHERE session_id = ? ORDER BY order_index ASC", ("s",)),
+        ],
+    )
+    def test_hot_queries_use_indexes(self, setup_database, query, params):
+        """자주 실행되는 조회는 테이블 전체를 훑지 않고 인덱스를 사용해야 합니다."""
+        with database_manager._connect_database() as conn:
+            plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params)]
+
+        assert any("INDEX" in detail or "PRIMARY KEY" in detail for detail in plan), plan
+        assert not any(detail.startswith("SCAN ") for detail in plan), plan
+
+    def test_leaderboard_and_rank_read_index_ranges_without_sorting(self, setup_database):
+        """랭킹 페이지와 개인 순위는 임시 정렬 없이 (guild_id, total_xp, user_id) 인덱스 범위만 읽어야 합니다."""
+        queries = {
+            "page": (
+                "SELECT user_id, xp, level, total_vc_seconds, total_xp FROM users "
+                "WHERE guild_id = ? ORDER BY total_xp DESC, user_id LIMIT ? OFFSET ?",
+                (2, 10, 0),
+            ),
+            "rank": (
+                "SELECT (SELECT COUNT(*) FROM users WHERE guild_id = ? AND total_xp > ?) + "
+                "(SELECT COUNT(*) FROM users WHERE guild_id = ? AND total_xp = ? AND user_id < ?)",
+                (2, 10, 2, 10, 1),
+            ),
+        }
+        with database_manager._connect_database() as conn:
+            plans = {
+                name: [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params)]
+                for name, (query, params) in queries.items()
+            }
+            indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+
+        assert "idx_users_guild_rank" in indexes
+        assert "idx_users_guild_total_xp" not in indexes
+        for plan in plans.values():
+            assert not any("TEMP B-TREE" in detail for detail in plan), plan
+            assert all("idx_users_guild_rank" in detail for detail in plan if detail.startswith("SEARCH")), plan
+        assert any("total_xp=? AND user_id<?" in detail for detail in plans["rank"]), plans["rank"]
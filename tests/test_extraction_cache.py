@@ -0,0 +1,186 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+import pytest
+
+from cogs.music.extraction_cache import (
+    STREAM_URL_SAFETY_SECONDS,
+    ExtractionCache,
+    stream_url_expiry,
+)
+from cogs.music.extraction_pool import ExtractionPriority
+
+EXPIRE = 1_700_020_000
+
+
+def stream_url(video_id: str, expire: int = EXPIRE) -> str:
+    return f"https://rr1---sn-abc.googlevideo.com/videoplayback?id={video_id}&expire={expire}&ip=1.2.3.4"
+
+
+class FakeClock:
+    def __init__(self, now: float) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class RecordingExtractor:
+    def __init__(self, results: Dict[str, Optional[Dict[str, Any]]]) -> None:
+        self.results = results
+        self.calls: List[Tuple[str, bool]] = []
+        self.priorities: List[ExtractionPriority] = []
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def __call__(self, query: str, process: bool, priority: ExtractionPriority) -> Optional[Dict[str, Any]]:
+        self.calls.append((query, process))
+        self.priorities.append(priority)
+        await self.release.wait()
+        result = self.results[query]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def test_stream_url_expiry_reads_query_and_path_forms() -> None:
+    assert stream_url_expiry(stream_url("a")) == EXPIRE
+    assert stream_url_expiry(
+        f"https://manifest.googlevideo.com/api/manifest/hls/expire/{EXPIRE}/id/a/file/index.m3u8"
+    ) == EXPIRE
+    assert stream_url_expiry("https://example.com/video?expire=123") is None
+    assert stream_url_expiry(None) is None
+
+
+@pytest.mark.asyncio
+async def test_repeated_lookups_hit_the_cache_until_the_stream_url_expires() -> None:
+    url = "https://www.youtube.com/watch?v=a"
+    extractor = RecordingExtractor({url: {"webpage_url": url, "url": stream_url("a"), "title": "A"}})
+    clock = FakeClock(EXPIRE - 3600)
+    cache = ExtractionCache(extractor, clock=clock)
+
+    first = await cache.extract(url)
+    assert await cache.extract(url) is first
+    assert extractor.calls == [(url, True)]
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+    # 재생 중 재연결할 여유가 남지 않으면 새로 추출합니다.
+    clock.now = EXPIRE - STREAM_URL_SAFETY_SECONDS
+    await cache.extract(url)
+    assert len(extractor.calls) == 2
+    assert cache.stats()["expired"] == 1
+
+
+@pytest.mark.asyncio
+async def test_search_entries_are_reused_when_a_result_is_played() -> None:
+    entries = [
+        {"webpage_url": f"https://www.youtube.com/watch?v={video_id}", "url": stream_url(video_id), "title": video_id}
+        for video_id in ("a", "b")
+    ]
+    extractor = RecordingExtractor({"ytsearch3:song": {"entries": entries + [None]}})
+    cache = ExtractionCache(extractor, clock=FakeClock(EXPIRE - 3600))
+
+    await cache.extract("ytsearch3:song")
+    played = await cache.extract("https://www.youtube.com/watch?v=b")
+
+    assert played is entries[1]
+    assert extractor.calls == [("ytsearch3:song", True)]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_lookups_share_one_extraction() -> None:
+    url = "https://www.youtube.com/watch?v=a"
+    extractor = RecordingExtractor({url: {"webpage_url": url, "url": stream_url("a")}})
+    extractor.release.clear()
+    cache = ExtractionCache(extractor, clock=FakeClock(EXPIRE - 3600))
+
+    lookups = [asyncio.create_task(cache.extract(url)) for _ in range(5)]
+    await asyncio.sleep(0)
+    assert cache.stats()["inflight"] == 1
+    extractor.release.set()
+    results = await asyncio.gather(*lookups)
+
+    assert extractor.calls == [(url, True)]
+    assert all(result is results[0] for result in results)
+    assert cache.stats()["coalesced"] == 4
+
+
+@pytest.mark.asyncio
+async def test_failures_reach_every_waiter_and_are_not_cached() -> None:
+    url = "https://www.youtube.com/watch?v=gone"
+    extractor = RecordingExtractor({url: RuntimeError("Video unavailable")})
+    extractor.release.clear()
+    cache = ExtractionCache(extractor, clock=FakeClock(EXPIRE - 3600))
+
+    lookups = [asyncio.create_task(cache.extract(url)) for _ in range(2)]
+    await asyncio.sleep(0)
+    extractor.release.set()
+    results = await asyncio.gather(*lookups, return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    with pytest.raises(RuntimeError):
+        await cache.extract(url)
+    assert len(extractor.calls) == 2
+    assert cache.stats()["entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_metadata_only_results_use_the_ttl_and_can_be_invalidated() -> None:
+    extractor = RecordingExtractor({"https://www.youtube.com/playlist?list=x": {"entries": [{"id": "a"}]}})
+    clock = FakeClock(1000.0)
+    cache = ExtractionCache(extractor, metadata_ttl=60, clock=clock)
+    query = "https://www.youtube.com/playlist?list=x"
+
+    await cache.extract(query, process=False, priority=ExtractionPriority.BULK)
+    assert extractor.priorities == [ExtractionPriority.BULK]
+    clock.now += 59
+    await cache.extract(query, process=False)
+    assert len(extractor.calls) == 1
+
+    cache.invalidate(query)
+    await cache.extract(query, process=False)
+    assert extractor.calls == [(query, False), (query, False)]
+
+
+class EscalatingJob:
+    def __init__(self, result: Dict[str, Any], priority: ExtractionPriority) -> None:
+        self.result = result
+        self.priority = priority
+        self.release = asyncio.Event()
+
+    def escalate(self, priority: ExtractionPriority) -> bool:
+        self.priority = priority
+        return True
+
+    def __await__(self):
+        return self._wait().__await__()
+
+    async def _wait(self) -> Dict[str, Any]:
+        await self.release.wait()
+        return self.result
+
+
+@pytest.mark.asyncio
+async def test_higher_priority_caller_escalates_the_inflight_job() -> None:
+    url = "https://www.youtube.com/watch?v=a"
+    jobs: List[EscalatingJob] = []
+
+    def extractor(query: str, process: bool, priority: ExtractionPriority) -> EscalatingJob:
+        jobs.append(EscalatingJob({"webpage_url": query, "url": stream_url("a")}, priority))
+        return jobs[-1]
+
+    cache = ExtractionCache(extractor, clock=FakeClock(EXPIRE - 3600))
+    autoplay = asyncio.create_task(cache.extract(url, priority=ExtractionPriority.AUTOPLAY))
+    await asyncio.sleep(0)
+    prefetch = asyncio.create_task(cache.extract(url, priority=ExtractionPriority.PREFETCH))
+    interactive = asyncio.create_task(cache.extract(url))
+    bulk = asyncio.create_task(cache.extract(url, priority=ExtractionPriority.BULK))
+    await asyncio.sleep(0)
+
+    assert len(jobs) == 1
+    assert jobs[0].priority == ExtractionPriority.INTERACTIVE
+    assert cache.stats()["escalated"] == 2
+    jobs[0].release.set()
+    results = await asyncio.gather(autoplay, prefetch, interactive, bulk)
+    assert all(result is results[0] for result in results)
@@ -0,0 +1,217 @@
+import asyncio
+import itertools
+import os
+import threading
+import time
+from functools import partial
+
+import pytest
+
+from cogs.music.extraction_pool import ExtractionPool, ExtractionPriority
+
+
+class FakeYoutubeDL:
+    instances = itertools.count()
+
+    def __init__(self) -> None:
+        self.number = next(self.instances)
+
+
+def which_ydl(ydl: FakeYoutubeDL, label: str):
+    return label, id(ydl), threading.current_thread().name
+
+
+def process_ydl(ydl: dict, value: int):
+    return ydl["marker"], value * 2, os.getpid()
+
+
+@pytest.mark.asyncio
+async def test_interactive_jobs_jump_ahead_of_bulk_and_autoplay() -> None:
+    gate = threading.Event()
+    order = []
+
+    def blocking(ydl, label):
+        gate.wait(5)
+        order.append(label)
+        return label
+
+    def record(ydl, label):
+        order.append(label)
+        return label
+
+    pool = ExtractionPool(FakeYoutubeDL, workers=1, mode="thread")
+    try:
+        first = asyncio.create_task(pool.run(blocking, "busy"))
+        await asyncio.sleep(0.05)
+        jobs = [
+            asyncio.create_task(pool.run(record, "autoplay", priority=ExtractionPriority.AUTOPLAY)),
+            asyncio.create_task(pool.run(record, "bulk", priority=ExtractionPriority.BULK)),
+            asyncio.create_task(pool.run(record, "play", priority=ExtractionPriority.INTERACTIVE)),
+            asyncio.create_task(pool.run(record, "prefetch", priority=ExtractionPriority.PREFETCH)),
+        ]
+        await asyncio.sleep(0.05)
+        stats = pool.stats()
+        assert stats["queue_depth"] == 4
+        assert stats["running"] == 1
+
+        gate.set()
+        await asyncio.gather(first, *jobs)
+    finally:
+        pool.shutdown()
+
+    assert order == ["busy", "play", "prefetch", "bulk", "autoplay"]
+    stats = pool.stats()["by_priority"]
+    assert stats["interactive"]["completed"] == 2
+    assert stats["autoplay"]["wait_p95_ms"] >= stats["interactive"]["wait_p50_ms"]
+
+
+@pytest.mark.asyncio
+async def test_each_worker_owns_its_youtube_dl() -> None:
+    gate = threading.Barrier(2, timeout=5)
+
+    def meet(ydl, label):
+        # 두 작업이 서로 다른 워커에서 동시에 실행되어야 장벽을 통과합니다.
+        gate.wait()
+        return which_ydl(ydl, label)
+
+    pool = ExtractionPool(FakeYoutubeDL, workers=2, mode="thread")
+    try:
+        results = await asyncio.gather(pool.run(meet, "a"), pool.run(meet, "b"))
+        again = await asyncio.gather(*(pool.run(which_ydl, str(index)) for index in range(6)))
+    finally:
+        pool.shutdown()
+
+    assert results[0][1] != results[1][1]
+    assert results[0][2] != results[1][2]
+    # 같은 워커는 YoutubeDL을 재사용하므로 인스턴스는 워커 수만큼만 생깁니다.
+    assert len({ydl_id for _, ydl_id, _ in results + again}) == 2
+
+
+@pytest.mark.asyncio
+async def test_failures_and_cancelled_jobs_are_counted() -> None:
+    gate = threading.Event()
+
+    def blocking(ydl):
+        gate.wait(5)
+
+    def failing(ydl):
+        raise RuntimeError("Video unavailable")
+
+    pool = ExtractionPool(FakeYoutubeDL, workers=1, mode="thread")
+    try:
+        busy = asyncio.create_task(pool.run(blocking))
+        await asyncio.sleep(0.05)
+        dropped = asyncio.create_task(pool.run(which_ydl, "dropped", priority=ExtractionPriority.PREFETCH))
+        await asyncio.sleep(0)
+        dropped.cancel()
+        await asyncio.gather(dropped, return_exceptions=True)
+        await asyncio.sleep(0.01)
+        gate.set()
+        await busy
+        with pytest.raises(RuntimeError):
+            await pool.run(failing)
+    finally:
+        pool.shutdown()
+
+    stats = pool.stats()["by_priority"]
+    assert stats["prefetch"]["cancelled"] == 1
+    assert stats["prefetch"]["completed"] == 0
+    assert stats["interactive"]["failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_escalated_job_moves_ahead_while_it_waits() -> None:
+    gate = threading.Event()
+    order = []
+
+    def blocking(ydl, label):
+        gate.wait(5)
+        order.append(label)
+
+    def record(ydl, label):
+        order.append(label)
+
+    pool = ExtractionPool(FakeYoutubeDL, workers=1, mode="thread")
+    try:
+        busy = pool.submit(blocking, "busy")
+        await asyncio.sleep(0.05)
+        late = pool.submit(record, "late", priority=ExtractionPriority.AUTOPLAY)
+        prefetch = pool.submit(record, "prefetch", priority=ExtractionPriority.PREFETCH)
+        assert late.escalate(ExtractionPriority.INTERACTIVE)
+        assert not late.escalate(ExtractionPriority.BULK)
+        # 이미 실행 중인 작업은 옮길 수 없습니다.
+        assert not busy.escalate(ExtractionPriority.INTERACTIVE)
+        assert pool.stats()["queue_depth"] == 2
+
+        gate.set()
+        await asyncio.gather(busy, late, prefetch)
+        # 남아 있던 이전 항목은 다시 실행되지 않고 건너뜁니다.
+        await pool.run(record, "after")
+    finally:
+        pool.shutdown()
+
+    assert order == ["busy", "late", "prefetch", "after"]
+    stats = pool.stats()
+    assert stats["queue_depth"] == 0
+    assert stats["by_priority"]["autoplay"]["escalated"] == 1
+    assert stats["by_priority"]["interactive"]["completed"] == 3
+
+
+@pytest.mark.asyncio
+async def test_shutdown_cancels_queued_jobs_instead_of_waiting() -> None:
+    gate = threading.Event()
+    started = threading.Event()
+
+    def slow(ydl, label):
+        started.set()
+        gate.wait(5)
+        return label
+
+    pool = ExtractionPool(FakeYoutubeDL, workers=1, mode="thread")
+    try:
+        running = pool.submit(slow, "running", priority=ExtractionPriority.BULK)
+        await asyncio.to_thread(started.wait, 5)
+        queued = [pool.submit(slow, str(index), priority=ExtractionPriority.BULK) for index in range(5)]
+
+        began = time.monotonic()
+        await asyncio.to_thread(pool.shutdown, 0.2)
+        assert time.monotonic() - began < 1.0
+    finally:
+        gate.set()
+
+    for job in queued:
+        with pytest.raises(asyncio.CancelledError):
+            await job
+    assert await running == "running"
+    stats = pool.stats()
+    assert stats["queue_depth"] == 0
+    assert stats["by_priority"]["bulk"]["cancelled"] == 5
+
+
+@pytest.mark.asyncio
+async def test_pool_restarts_after_shutdown() -> None:
+    pool = ExtractionPool(FakeYoutubeDL, workers=1, mode="thread")
+    try:
+        assert (await pool.run(which_ydl, "first"))[0] == "first"
+        pool.shutdown()
+        # 음악 Cog를 다시 로드하면 첫 추출 때 워커를 새로 띄웁니다.
+        assert (await pool.run(which_ydl, "again"))[0] == "again"
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_process_mode_runs_jobs_in_worker_processes() -> None:
+    pool = ExtractionPool(partial(dict, marker="child"), workers=1, mode="process")
+    try:
+        marker, doubled, pid = await pool.run(process_ydl, 21)
+    finally:
+        pool.shutdown()
+
+    assert (marker, doubled) == ("child", 42)
+    assert pid != os.getpid()
+
+
+def test_unknown_mode_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        ExtractionPool(FakeYoutubeDL, mode="fiber")
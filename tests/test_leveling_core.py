@@ -1,8 +1,31 @@
+import random
+
 import pytest
 import discord
 from unittest.mock import AsyncMock, patch, MagicMock
 
-from cogs.leveling.leveling_core import LevelingCog, calculate_jamo_length, get_required_xp
+from cogs.leveling import leveling_core
+from cogs.leveling.leveling_core import (
+    LeaderboardView,
+    LevelingCog,
+    calculate_jamo_length,
+    calculate_level_from_xp,
+    get_required_xp,
+    required_xp_for_level,
+    resolve_cached_level,
+    VoiceSession,
+)
+
+def reference_jamo_length(text):
+    """문자 단위로 타수를 세던 기존 구현 (동치성 비교 기준)"""
+    length = 0
+    for char in text:
+        if 0xAC00 <= ord(char) <= 0xD7A3:
+            length += 3 if (ord(char) - 0xAC00) % 28 > 0 else 2
+        elif char.strip():
+            length += 1
+    return length
+
 
 class TestLevelingCore:
 
@@ -20,6 +43,20 @@ class TestLevelingCore:
         # 특수문자나 띄어쓰기는 공백만 무시하고 카운트 1개로 계산
         assert calculate_jamo_length("!@#") == 3
 
+    def test_calculate_jamo_length_matches_reference(self):
+        """무작위 메시지에서 빠른 구현과 문자 단위 구현의 타수가 항상 같아야 합니다."""
+        rng = random.Random(20240611)
+        alphabet = (
+            [chr(code) for code in (0xAC00, 0xAC01, 0xD7A3, 0xD7A4, 0xABFF)]
+            + [chr(rng.randrange(0xAC00, 0xD7A4)) for _ in range(200)]
+            + list("ㄱㅏㅎabcXYZ019!?.,😀漢字")
+            + [" ", "\t", "\n", "\r", "\x0b", "\x0c", "\x1c", "\x85", "\u00a0", "\u2003", "\u3000"]
+        )
+
+        for _ in range(500):
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randrange(0, 400)))
+            assert calculate_jamo_length(text) == reference_jamo_length(text), repr(text)
+
     def test_get_required_xp(self):
         """레벨별 필수 경험치 커브 무결성 검증"""
         assert get_required_xp(1) == int(100 * (1 ** 1.8) + 10 * (1.1 ** 1))
@@ -27,11 +64,28 @@ class TestLevelingCore:
         assert get_required_xp(10) == int(100 * (10 ** 1.8) + 10 * (1.1 ** 10))
 
 
+    def test_threshold_table_matches_level_curve(self):
+        """요구 경험치 표 기반 레벨 역산은 곡선을 한 단계씩 비교한 결과와 같아야 합니다."""
+        leveling_core._xp_thresholds.clear()
+
+        def loop_level(total_xp):
+            level = 1
+            while total_xp >= get_required_xp(level):
+                level += 1
+            return level
+
+        for level in range(1, 120):
+            threshold = get_required_xp(level)
+            assert required_xp_for_level(level) == threshold
+            for total_xp in (threshold - 1, threshold, threshold + 1):
+                assert calculate_level_from_xp(total_xp) == loop_level(total_xp)
+        assert calculate_level_from_xp(0) == 1
+        assert calculate_level_from_xp(-5) == 1
+
     @pytest.mark.asyncio
-    @patch("cogs.leveling.leveling_core.get_user_data")
-    @patch("cogs.leveling.leveling_core.update_user_xp")
-    async def test_on_message_xp_gain(self, mock_update_xp, mock_get_user):
-        """on_message 발생 시 XP 연산 및 DB 갱신 프로세스 검증"""
+    @patch("cogs.leveling.leveling_core.buffer_user_xp")
+    async def test_on_message_xp_gain(self, mock_buffer_xp):
+        """on_message 발생 시 XP를 계산해 쓰기 지연 버퍼에 적재하는지 검증"""
         mock_bot = MagicMock()
         cog = LevelingCog(mock_bot)
         
@@ -45,11 +99,96 @@ class TestLevelingCore:
         mock_message.content = "안녕하세요" # 3타+3타+2타+2타+2타 = 12
         expected_xp = 12
         
-        # 사용자가 이미 Lv.1이고 XP가 100이라고 가정 (다음 레벨 조건 충족 대기)
-        # 새로운 1레벨 요구치는 111 (100 * 1^1.8 + 10*1.1) 입니다.
-        mock_get_user.return_value = {"level": 1, "xp": 100, "total_vc_seconds": 0}
-        
         await cog.on_message(mock_message)
         
-        # XP 업데이트 함수가 올바른 추가분과 함께 불렸는지 검증 (100 + 12 = 112이므로 레벨 1구간(111)을 넘어 Lv.2가 되어야함)
-        mock_update_xp.assert_called_once_with(111, 222, xp_added=expected_xp, new_level=2)
+        mock_buffer_xp.assert_called_once_with(111, 222, expected_xp)
+
+    def test_resolve_cached_level(self):
+        """버퍼 반영 시 텍스트 XP와 음성 시간을 합산해 레벨 캐시를 계산해야 합니다."""
+        # 1레벨 요구치는 111이므로 텍스트 100 + 음성 3분(15 XP)이면 Lv.2입니다.
+        assert resolve_cached_level(100, 0) == 1
+        assert resolve_cached_level(100, 180) == 2
+
+    @pytest.mark.asyncio
+    @patch("cogs.leveling.leveling_core.update_user_level", new_callable=AsyncMock)
+    @patch("cogs.leveling.leveling_core.add_user_xp", new_callable=AsyncMock)
+    async def test_voice_leave_decides_level_up_from_returned_row(
+        self, mock_add_xp, mock_update_level
+    ):
+        """음성 퇴장 정산은 한 번의 반영 결과만으로 레벨업 여부를 결정해야 합니다."""
+        cog = LevelingCog(MagicMock())
+        member = MagicMock()
+        member.bot = False
+        member.id = 111
+        member.guild.id = 222
+        session = VoiceSession(222, True, 0.0)
+        session.valid_duration = 180.0
+        cog.voice_sessions[111] = session
+        before = MagicMock()
+        after = MagicMock()
+        after.channel = None
+        # 텍스트 100 XP + 음성 3분(15 XP) = 115 XP이므로 1레벨 요구치(111)를 넘습니다.
+        mock_add_xp.return_value = {"xp": 100, "level": 1, "total_vc_seconds": 180}
+
+        await cog.on_voice_state_update(member, before, after)
+
+        mock_add_xp.assert_awaited_once_with(111, 222, 0, 180)
+        mock_update_level.assert_awaited_once_with(111, 222, 2)
+
+    def test_voice_session_settles_only_unsettled_seconds(self):
+        """중간 정산 후 퇴장 시에는 아직 반영하지 않은 시간만 정산해야 합니다."""
+        session = VoiceSession(222, False, 0.0)
+
+        session.accumulate(30.0)
+        assert session.take_unsettled_seconds() == 0  # 1분 미만은 정산하지 않음
+
+        session.accumulate(150.0)
+        assert session.take_unsettled_seconds() == 150
+
+        session.set_muted(True, 200.0)
+        session.accumulate(500.0)  # 뮤트 상태로 보낸 시간은 제외
+        assert session.take_unsettled_seconds() == 50
+        assert session.take_unsettled_seconds() == 0
+
+    @pytest.mark.asyncio
+    @patch("cogs.leveling.leveling_core.flush_write_behind", new_callable=AsyncMock)
+    @patch("cogs.leveling.leveling_core.buffer_user_xp")
+    async def test_cog_unload_settles_sessions_in_one_batch(self, mock_buffer_xp, mock_flush):
+        """종료 시 모든 음성 세션을 버퍼에 모아 한 번의 반영으로 정산해야 합니다."""
+        cog = LevelingCog(MagicMock())
+        for member_id, valid_seconds in ((1, 120.0), (2, 30.0), (3, 600.0)):
+            session = VoiceSession(222, True, 0.0)
+            session.valid_duration = valid_seconds
+            cog.voice_sessions[member_id] = session
+
+        await cog.cog_unload()
+
+        assert mock_buffer_xp.call_args_list == [
+            ((1, 222, 0), {"vc_sec_added": 120}),
+            ((3, 222, 0), {"vc_sec_added": 600}),
+        ]
+        mock_flush.assert_awaited_once_with()
+        assert cog.voice_sessions == {}
+
+    @pytest.mark.asyncio
+    async def test_leaderboard_view_pages_through_results(self):
+        """랭킹 뷰는 요청한 페이지만 불러오고 끝 페이지에서 버튼을 비활성화해야 합니다."""
+        guild = MagicMock()
+        guild.get_member.return_value = None
+
+        async def fetch_page(page):
+            rows = [{"user_id": page * 10 + i, "total_xp": 1000 - page * 10 - i} for i in range(10 if page < 2 else 3)]
+            return {"rows": rows, "total_users": 23, "page": page, "page_size": 10}
+
+        view = LeaderboardView(1, guild, "랭킹", fetch_page)
+
+        embed = await view.load_page(0)
+        assert view.page_count == 3
+        assert view.previous_page.disabled is True
+        assert view.next_page.disabled is False
+        assert "🥇 **1위**" in embed.description
+
+        embed = await view.load_page(2)
+        assert view.next_page.disabled is True
+        assert "🏅 **21위**" in embed.description
+        assert embed.footer.text == "3 / 3 페이지 | 총 23명"
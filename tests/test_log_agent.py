@@ -8,6 +8,7 @@ from cogs.logging.log_agent import (
     DiscordLogHandler,
     LogAgentCog,
     WatchSessionControlView,
+    format_db_latency_report,
 )
 
 class TestLogAgent:
@@ -186,7 +187,25 @@ class TestLogAgent:
                 encoding="utf-8",
             )
             assert "project-info-marker" in log_text
+
+            slow_query_logger = logging.getLogger("DatabaseManager.slow_query")
+            slow_query_logger.warning("slow-query-marker")
+            for handler in slow_query_logger.handlers:
+                handler.flush()
+            slow_text = (tmp_path / "logs" / "slow_query.log").read_text(
+                encoding="utf-8",
+            )
+            assert "slow-query-marker" in slow_text
+            assert "slow-query-marker" not in (
+                tmp_path / "logs" / "system.log"
+            ).read_text(encoding="utf-8")
         finally:
+            slow_query_logger = logging.getLogger("DatabaseManager.slow_query")
+            for handler in list(slow_query_logger.handlers):
+                slow_query_logger.removeHandler(handler)
+                handler.close()
+            slow_query_logger.propagate = True
+            slow_query_logger.setLevel(logging.NOTSET)
             for handler in list(root_logger.handlers):
                 if handler not in before_handlers:
                     root_logger.removeHandler(handler)
@@ -221,3 +240,103 @@ class TestLogAgent:
             cog._send_startup_notification.assert_awaited_once_with()
         finally:
             cog.cog_unload()
+
+    @pytest.mark.asyncio
+    @patch("cogs.logging.log_agent.MASTER_USER_ID", 777)
+    async def test_db_stats_command_rejects_non_master_user(self):
+        cog = object.__new__(LogAgentCog)
+        interaction = MagicMock()
+        interaction.user.id = 999
+        interaction.response.send_message = AsyncMock()
+
+        await LogAgentCog.db_stats.callback(cog, interaction)
+
+        assert "권한" in interaction.response.send_message.call_args.args[0]
+
+    @pytest.mark.asyncio
+    @patch("cogs.logging.log_agent.MASTER_USER_ID", 777)
+    async def test_db_stats_command_reports_percentiles(self):
+        stats = {
+            f"call_site_{index}": {
+                "mode": "read",
+                "calls": index + 1,
+                "slow_calls": 0,
+                "total_exec_ms": float(index),
+                "lock_wait_ms": {"p50": 0.1, "p95": 0.2, "p99": 0.4, "max": 0.4},
+                "exec_ms": {"p50": 1.6, "p95": 3.2, "p99": 6.4, "max": 6.0},
+                "rows": {"p50": 1, "p95": 8, "p99": 8, "max": 8},
+            }
+            for index in range(40)
+        }
+        cog = object.__new__(LogAgentCog)
+        interaction = MagicMock()
+        interaction.user.id = 777
+        interaction.response.send_message = AsyncMock()
+        interaction.client.get_cog.return_value = None
+
+        with patch("cogs.logging.log_agent.get_db_latency_stats", return_value=stats):
+            await LogAgentCog.db_stats.callback(cog, interaction)
+
+        report = interaction.response.send_message.call_args.args[0]
+        assert interaction.response.send_message.call_args.kwargs["ephemeral"] is True
+        assert len(report) < 2000
+        # 누적 실행 시간이 큰 호출 지점부터 보여 줍니다.
+        assert report.index("call_site_39") < report.index("call_site_38")
+        assert "call_site_0 " not in report
+        assert "1.6/3.2/6.4" in report
+        assert "외 25개" in report
+
+    def test_db_latency_report_handles_empty_stats(self):
+        assert "없습니다" in format_db_latency_report({})
+
+    @pytest.mark.asyncio
+    @patch("cogs.logging.log_agent.MASTER_USER_ID", 777)
+    async def test_db_stats_command_adds_music_extraction_stats(self):
+        """음악 Cog가 있으면 추출 캐시 적중률, 추출 대기열·대기 시간과 서버별 곡 사이 공백을 보여야 합니다."""
+        from cogs.music.extraction_pool import ExtractionPool, ExtractionPriority
+
+        pool = ExtractionPool(dict, workers=1, mode="thread")
+        try:
+            await pool.run(lambda ydl: None, priority=ExtractionPriority.BULK)
+        finally:
+            pool.shutdown()
+        cog = object.__new__(LogAgentCog)
+        interaction = MagicMock()
+        interaction.user.id = 777
+        interaction.response.send_message = AsyncMock()
+        interaction.followup.send = AsyncMock()
+        playing, idle = MagicMock(), MagicMock()
+        playing.guild.name = "Music Guild"
+        playing.get_track_gap_stats.return_value = {
+            "count": 3, "avg_ms": 420.0, "p95_ms": 900.0, "max_ms": 900.0, "last_ms": 180.0,
+        }
+        idle.guild.name = "Idle Guild"
+        idle.get_track_gap_stats.return_value = {
+            "count": 0, "avg_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0, "last_ms": 0.0,
+        }
+        interaction.client.get_cog.return_value.music_states = {1: playing, 2: idle}
+
+        extraction_cache = MagicMock()
+        extraction_cache.stats.return_value = {
+            "entries": 4, "inflight": 0, "hits": 30, "misses": 10,
+            "coalesced": 2, "escalated": 1, "expired": 0,
+        }
+
+        with patch("cogs.logging.log_agent.get_db_latency_stats", return_value={}), \
+             patch("cogs.music.music_utils.extraction_pool", pool), \
+             patch("cogs.music.music_utils.extraction_cache", extraction_cache):
+            await LogAgentCog.db_stats.callback(cog, interaction)
+
+        # yt-dlp 추출 캐시 적중률은 DB 조회 캐시와 같은 표에 나옵니다.
+        cache_report = interaction.response.send_message.call_args.args[0]
+        assert "db.favorites" in cache_report
+        assert "ytdl.extract" in cache_report and "75.0" in cache_report
+        assert "coalesced=2" in cache_report
+
+        report = interaction.followup.send.call_args.args[0]
+        assert interaction.followup.send.call_args.kwargs["ephemeral"] is True
+        assert "queue=0" in report
+        assert "bulk" in report and "autoplay" in report
+        assert "Music Guild" in report and "900" in report
+        assert "Idle Guild" not in report
+        assert len(report) < 2000
@@ -23,12 +23,18 @@ class TestMainBot:
         assert "cogs.logging.log_agent" in bot.initial_extensions
 
     @pytest.mark.asyncio
+    @patch("database_manager.close_connection_pool")
+    @patch("database_manager.flush_write_behind", new_callable=AsyncMock)
+    @patch("database_manager.open_connection_pool")
     @patch("database_manager.init_db")
     @patch("uvicorn.Server.serve", new_callable=AsyncMock)
     async def test_setup_hook_loads_extensions(
         self,
         mock_serve,
         mock_init,
+        mock_open_pool,
+        mock_flush,
+        mock_close_pool,
     ):
         """setup_hook에서 Cog들과 DB 초기화 작업이 연결(호출)되는지 시뮬레이션"""
         bot = MyBot(command_prefix="!", intents=discord.Intents.default())
@@ -40,6 +46,7 @@ class TestMainBot:
         await bot.setup_hook()
         
         mock_init.assert_called_once_with()
+        mock_open_pool.assert_called_once_with()
         # 모든 extesnsion이 로드 시도되었는지 확인
         assert bot.load_extension.call_count == len(bot.initial_extensions)
         for ext in bot.initial_extensions:
@@ -49,8 +56,11 @@ class TestMainBot:
         await asyncio.sleep(0)
         mock_serve.assert_awaited_once()
         await bot.close()
+        mock_flush.assert_awaited_once_with()
+        mock_close_pool.assert_called_once_with()
 
     @pytest.mark.asyncio
+    @patch("database_manager.open_connection_pool")
     @patch(
         "database_manager.init_db",
         side_effect=RuntimeError("restore failed"),
@@ -58,6 +68,7 @@ class TestMainBot:
     async def test_setup_hook_stops_before_services_when_db_fails(
         self,
         mock_init,
+        mock_open_pool,
     ):
         bot = MyBot(command_prefix="!", intents=discord.Intents.default())
         bot.load_extension = AsyncMock()
@@ -66,6 +77,7 @@ class TestMainBot:
             await bot.setup_hook()
 
         mock_init.assert_called_once_with()
+        mock_open_pool.assert_not_called()
         bot.load_extension.assert_not_awaited()
         assert bot.webserver_task is None
         await bot.close()
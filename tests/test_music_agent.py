@@ -35,10 +35,12 @@ async def test_cog_unload_delegates_snapshot_and_cleanup() -> None:
     agent = MusicAgentCog(bot=bot, state_store=state_store)
     agent.music_states = {12345: state}
 
-    await agent.cog_unload()
+    with patch("cogs.music.music_agent.extraction_pool") as pool:
+        await agent.cog_unload()
 
     state_store.save.assert_awaited_once_with(agent.music_states)
     state.cleanup.assert_awaited_once_with(leave=True, update_ui=False)
+    pool.shutdown.assert_called_once_with()
 
 
 @pytest.mark.asyncio
@@ -194,6 +196,109 @@ async def test_favorites_add_path_can_cancel_autoplay_without_error() -> None:
     )
     await asyncio.sleep(0)
 
-    assert result == (0, False)
+    assert result == (0, False, [])
     assert autoplay_task.cancelled()
     await music_state.cleanup(leave=True, update_ui=False)
+
+
+@pytest.mark.asyncio
+async def test_playlist_starts_with_first_chunk_and_streams_the_rest() -> None:
+    bot = MagicMock()
+    bot.loop = asyncio.get_running_loop()
+    bot.wait_until_ready = AsyncMock()
+    bot.is_closed.return_value = False
+    guild = MagicMock()
+    guild.id = 12345
+    guild.name = "Test Guild"
+
+    from cogs.music.music_core import MusicState
+
+    music_state = MusicState(bot, MagicMock(), guild)
+    music_state.schedule_ui_update = AsyncMock()
+    music_state.voice_client = MagicMock()
+    music_state.voice_client.is_playing.return_value = False
+    music_state.voice_client.is_paused.return_value = False
+    user = MagicMock()
+    user.voice.channel = music_state.voice_client.channel
+
+    release_rest = asyncio.Event()
+
+    async def chunks(url):
+        yield [{"webpage_url": "https://youtu.be/a", "title": "A"}]
+        await release_rest.wait()
+        yield [{"webpage_url": "https://youtu.be/b", "title": "B"}, {"webpage_url": "https://youtu.be/c", "title": "C"}]
+
+    agent = MusicAgentCog(bot)
+    agent.get_music_state = AsyncMock(return_value=music_state)
+    agent._ensure_voice_connection = AsyncMock(return_value=True)
+    send = AsyncMock()
+    music_state.play_next_song = MagicMock()
+
+    with patch("cogs.music.music_agent.iter_playlist_entries", chunks), \
+         patch("cogs.music.music_agent.extract_info", AsyncMock()) as extract:
+        await agent._process_play_request(
+            guild, MagicMock(), user, "https://www.youtube.com/playlist?list=PL1", send,
+        )
+
+        assert [song.title for song in music_state.queue] == ["A"]
+        music_state.play_next_song.set.assert_called_once_with()
+        extract.assert_not_awaited()
+
+        release_rest.set()
+        await music_state.playlist_task
+
+    assert [song.title for song in music_state.queue] == ["A", "B", "C"]
+    assert music_state.playlist_task is None
+    await music_state.cleanup(leave=False, update_ui=False)
+
+
+@pytest.mark.asyncio
+async def test_favorites_batch_starts_playback_on_first_song_and_reports_failures() -> None:
+    bot = MagicMock()
+    bot.loop = asyncio.get_running_loop()
+    bot.wait_until_ready = AsyncMock()
+    bot.is_closed.return_value = False
+    guild = MagicMock()
+    guild.id = 12345
+    guild.name = "Test Guild"
+
+    from cogs.music.music_core import MusicState
+
+    music_state = MusicState(bot, MagicMock(), guild)
+    music_state.schedule_ui_update = AsyncMock()
+    music_state.voice_client = MagicMock()
+    music_state.voice_client.is_playing.return_value = False
+    music_state.voice_client.is_paused.return_value = False
+    music_state.play_next_song = MagicMock()
+
+    agent = MusicAgentCog(bot)
+    agent.get_music_state = AsyncMock(return_value=music_state)
+    agent._ensure_voice_connection = AsyncMock(return_value=True)
+    interaction = MagicMock()
+    interaction.guild.id = guild.id
+    interaction.user.voice.channel = music_state.voice_client.channel
+
+    slow_release = asyncio.Event()
+
+    async def fake_extract(url, priority):
+        if url.endswith("slow"):
+            await slow_release.wait()
+        if url.endswith("gone"):
+            raise RuntimeError("Video unavailable")
+        return {"webpage_url": url, "title": url[-4:]}
+
+    urls = ["https://youtu.be/fast", "https://youtu.be/slow", "https://youtu.be/gone", "https://youtu.be/last"]
+    with patch("cogs.music.music_utils.extract_info", fake_extract):
+        batch = asyncio.create_task(agent.handle_add_multiple_from_favorites(interaction, urls))
+        await asyncio.sleep(0.01)
+        # 두 번째 곡이 늦어도 첫 곡은 이미 재생을 시작했습니다.
+        assert [song.title for song in music_state.queue] == ["fast"]
+        music_state.play_next_song.set.assert_called_once_with()
+
+        slow_release.set()
+        count, joined, failed_urls = await batch
+
+    assert count == 3
+    assert failed_urls == ["https://youtu.be/gone"]
+    assert [song.title for song in music_state.queue] == ["fast", "slow", "last"]
+    await music_state.cleanup(leave=False, update_ui=False)
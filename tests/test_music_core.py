@@ -3,8 +3,9 @@ from typing import Any
 
 import pytest
 import discord
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 from cogs.music.music_core import MusicState
+from cogs.music.music_utils import LoopMode
 
 @pytest.fixture
 def mock_guild() -> MagicMock:
@@ -154,3 +155,114 @@ async def test_cancelled_autoplay_task_cannot_clear_new_task_reference(
     assert old_task.cancelled()
     assert state.autoplay_task is new_task
     await state.cleanup(leave=True, update_ui=False)
+
+
+def make_playing_state(mock_cog: MagicMock, mock_guild: MagicMock) -> MusicState:
+    bot = MagicMock()
+    bot.loop = asyncio.get_running_loop()
+    bot.wait_until_ready = AsyncMock()
+    bot.is_closed.return_value = False
+    state = MusicState(bot=bot, cog=mock_cog, guild=mock_guild)
+    state.voice_client = MagicMock()
+    state.voice_client.is_connected.return_value = True
+    state.voice_client.is_paused.return_value = False
+    return state
+
+
+def make_song(video_id: str) -> MagicMock:
+    song = MagicMock()
+    song.webpage_url = f"https://www.youtube.com/watch?v={video_id}"
+    song.title = video_id
+    song.duration = 180
+    return song
+
+
+@pytest.mark.asyncio
+async def test_next_song_is_resolved_while_current_song_plays(
+    mock_cog: MagicMock,
+    mock_guild: MagicMock,
+) -> None:
+    mock_cog.cleanup_channel_messages = AsyncMock()
+    state = make_playing_state(mock_cog, mock_guild)
+    state.voice_client.is_playing.return_value = False
+    first, second = make_song("a"), make_song("b")
+    state.queue.extend([first, second])
+    extract = AsyncMock(side_effect=lambda url, **_: {"url": f"stream-{url[-1]}"})
+
+    with patch("cogs.music.music_core.extract_info", extract), \
+         patch("cogs.music.music_core.buffer_play_count"), \
+         patch.object(discord, "FFmpegPCMAudio"), \
+         patch.object(discord, "PCMVolumeTransformer"):
+        state.play_next_song.set()
+        await asyncio.sleep(0.05)
+        state.voice_client.is_playing.return_value = True
+        await state.schedule_ui_update()
+        await asyncio.sleep(0.05)
+
+        # 첫 곡이 재생되는 동안 다음 곡을 이미 추출했습니다.
+        assert state.current_song is first
+        assert state.prefetch_song is second
+        assert [c.args[0] for c in extract.await_args_list] == [first.webpage_url, second.webpage_url]
+
+        state.handle_after_play(None)
+        await asyncio.sleep(0.05)
+
+    assert state.current_song is second
+    assert state.prefetch_song is None
+    assert state.get_track_gap_stats()["count"] == 1
+    await state.cleanup(leave=False, update_ui=False)
+
+
+@pytest.mark.asyncio
+async def test_reordering_the_queue_replaces_the_prefetch(
+    mock_cog: MagicMock,
+    mock_guild: MagicMock,
+) -> None:
+    state = make_playing_state(mock_cog, mock_guild)
+    state.voice_client.is_playing.return_value = True
+    state.current_song = make_song("now")
+    first, second = make_song("a"), make_song("b")
+    state.queue.extend([first, second])
+    async def never_resolves(url: str, **_: object) -> None:
+        await asyncio.sleep(3600)
+
+    extract = AsyncMock(side_effect=never_resolves)
+
+    with patch("cogs.music.music_core.extract_info", extract):
+        state.refresh_prefetch()
+        stale_task = state.prefetch_task
+        state.refresh_prefetch()
+        assert state.prefetch_task is stale_task
+
+        state.queue.rotate(-1)
+        state.refresh_prefetch()
+        await asyncio.sleep(0)
+        assert stale_task.cancelled()
+        assert state.prefetch_song is second
+
+        state.queue.clear()
+        state.refresh_prefetch()
+        assert state.prefetch_task is None
+
+        state.queue.append(first)
+        state.loop_mode = LoopMode.SONG
+        state.refresh_prefetch()
+        assert state.prefetch_task is None
+
+    await state.cleanup(leave=False, update_ui=False)
+
+
+def test_track_gap_ignores_idle_time(
+    mock_bot: MagicMock,
+    mock_cog: MagicMock,
+    mock_guild: MagicMock,
+) -> None:
+    state = MusicState(bot=mock_bot, cog=mock_cog, guild=mock_guild)
+    state._record_track_gap()
+    assert state.get_track_gap_stats()["count"] == 0
+
+    state.handle_after_play(None)
+    state._record_track_gap()
+    stats = state.get_track_gap_stats()
+    assert stats["count"] == 1
+    assert stats["max_ms"] == stats["last_ms"] >= 0
@@ -1,6 +1,6 @@
 import pytest
 import discord
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 from cogs.music.music_utils import Song, LoopMode, URL_REGEX
 
@@ -148,3 +148,118 @@ async def test_music_states_io(tmp_path) -> None:
     finally:
         # Restore original
         mu.MUSIC_STATE_FILE = original_file
+
+
+def test_flat_entry_to_song_data_defers_stream_url() -> None:
+    from cogs.music.music_utils import flat_entry_to_song_data
+
+    data = flat_entry_to_song_data({
+        "_type": "url",
+        "id": "abc",
+        "url": "https://www.youtube.com/watch?v=abc",
+        "title": "Flat Song",
+        "duration": 201.0,
+        "channel": "Artist",
+        "thumbnails": [{"url": "small"}, {"url": "large"}],
+    })
+
+    assert data == {
+        "webpage_url": "https://www.youtube.com/watch?v=abc",
+        "url": None,
+        "title": "Flat Song",
+        "duration": 201,
+        "thumbnail": "large",
+        "uploader": "Artist",
+    }
+    assert flat_entry_to_song_data({"url": "https://www.youtube.com/watch?v=x", "title": "[Private video]"}) is None
+    assert flat_entry_to_song_data({"id": "y", "url": "y", "duration": None})["webpage_url"] == "https://www.youtube.com/watch?v=y"
+
+
+@pytest.mark.asyncio
+async def test_iter_playlist_entries_streams_flat_chunks() -> None:
+    import cogs.music.music_utils as mu
+    from cogs.music.extraction_pool import ExtractionPool
+
+    calls = []
+
+    class FakeYoutubeDL:
+        def extract_info(self, url, download, process):
+            calls.append((url, process))
+            if "watch" in url:
+                return {"_type": "url", "url": "https://www.youtube.com/playlist?list=PL1"}
+            return {
+                "_type": "playlist",
+                "entries": (
+                    {"id": f"v{index}", "url": f"https://www.youtube.com/watch?v=v{index}", "title": f"Song {index}"}
+                    for index in range(7)
+                ),
+            }
+
+    pool = ExtractionPool(FakeYoutubeDL, workers=1, mode="thread")
+    try:
+        with patch.object(mu, "extraction_pool", pool), \
+             patch.object(mu, "PLAYLIST_CHUNK_SIZE", 2):
+            chunks = [chunk async for chunk in mu.iter_playlist_entries("https://www.youtube.com/watch?v=v0&list=PL1")]
+    finally:
+        pool.shutdown()
+
+    # 첫 묶음은 작게 바로 받고, 이후 구간은 두 배씩 늘려 읽습니다.
+    assert [[song["title"] for song in chunk] for chunk in chunks] == [
+        ["Song 0", "Song 1"],
+        ["Song 2", "Song 3", "Song 4", "Song 5"],
+        ["Song 6"],
+    ]
+    assert all(process is False for _, process in calls)
+    assert calls[1][0] == "https://www.youtube.com/playlist?list=PL1"
+    stats = pool.stats()["by_priority"]
+    assert stats["interactive"]["completed"] == 1
+    assert stats["bulk"]["completed"] == 2
+
+
+@pytest.mark.asyncio
+async def test_resolve_in_order_limits_concurrency_and_keeps_order() -> None:
+    import asyncio
+    import cogs.music.music_utils as mu
+
+    running = 0
+    peak = 0
+
+    async def fake_extract(query, priority):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        # 뒤의 곡일수록 먼저 끝나도 결과는 입력 순서로 나와야 합니다.
+        await asyncio.sleep(0.01 * (6 - int(query)))
+        running -= 1
+        if query == "3":
+            raise RuntimeError("Video unavailable")
+        return None if query == "4" else {"title": query}
+
+    with patch.object(mu, "extract_info", fake_extract):
+        results = [item async for item in mu.resolve_in_order(["1", "2", "3", "4", "5"], limit=2)]
+
+    assert peak == 2
+    assert [query for query, _, _ in results] == ["1", "2", "3", "4", "5"]
+    assert [info["title"] for _, info, error in results if error is None] == ["1", "2", "5"]
+    assert isinstance(results[2][2], RuntimeError)
+    assert results[3][1] is None and results[3][2] is not None
+
+
+def test_flat_playlist_slice_reads_past_processed_playlistend() -> None:
+    import cogs.music.music_utils as mu
+
+    calls = []
+    ydl = MagicMock()
+
+    def fake_extract_info(url, download, process):
+        calls.append(process)
+        entries = ({"id": f"v{i}", "url": f"https://youtu.be/v{i}", "title": f"Song {i}"} for i in range(120))
+        return {"_type": "playlist", "entries": entries}
+
+    ydl.extract_info.side_effect = fake_extract_info
+
+    # playlistend(50)는 전체 추출에만 걸리므로 평면 읽기는 50곡 뒤 구간도 읽어야 합니다.
+    songs, exhausted = mu._flat_playlist_slice(ydl, "https://www.youtube.com/playlist?list=PL1", 50, 100)
+    assert calls == [False]
+    assert [song["title"] for song in songs] == [f"Song {i}" for i in range(50, 100)]
+    assert not exhausted